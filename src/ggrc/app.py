@@ -5,9 +5,7 @@
 
 import re
 from flask import Flask
-from flask.ext.sqlalchemy import get_debug_queries
-from flask.ext.sqlalchemy import SQLAlchemy
-from tabulate import tabulate
+from ggrc.utils import startup  # noqa: imported first to time the setup
 from ggrc import contributions  # noqa: imported so it can be used with getattr
 from ggrc import db
 from ggrc import extensions
@@ -51,10 +49,16 @@ def configure_flask_login(app_):
 
 
 def configure_webassets(app_):
-  """Add basic webassets configuration."""
-  from ggrc import assets
-  app_.jinja_env.add_extension('webassets.ext.jinja2.assets')
-  app_.jinja_env.assets_environment = assets.environment
+  """Add basic webassets configuration.
+
+  Loading the asset bundles is only needed for rendering pages, so it is
+  deferred until the first request.
+  """
+  @app_.before_first_request
+  def _load_webassets():
+    from ggrc import assets
+    app_.jinja_env.add_extension('webassets.ext.jinja2.assets')
+    app_.jinja_env.assets_environment = assets.environment
 
 
 def configure_jinja(app_):
@@ -125,6 +129,12 @@ def _enable_jasmine():
         Asset("dashboard-js-specs"))
 
 
+def _enable_request_profiling():
+  """Install request profiling hooks if PROFILE_REQUESTS is set."""
+  from ggrc.utils import profiling
+  profiling.init_app(app)
+
+
 def _display_sql_queries():
   """Set up display database queries
 
@@ -132,6 +142,10 @@ def _display_sql_queries():
   enabled.
   """
   if getattr(settings, "SQLALCHEMY_RECORD_QUERIES", False):
+    from flask.ext.sqlalchemy import get_debug_queries
+    from flask.ext.sqlalchemy import SQLAlchemy
+    from tabulate import tabulate
+
     # pylint: disable=unused-variable
     @app.after_request
     def display_queries(response):  # noqa: not an unused variable
@@ -163,18 +177,20 @@ def _display_sql_queries():
       app.logger.info("Total queries: {}".format(len(queries)))
       return response
 
-init_models(app)
-configure_flask_login(app)
-configure_webassets(app)
-configure_jinja(app)
-init_services(app)
-init_views(app)
-init_extension_blueprints(app)
-init_indexer()
-init_permissions_provider()
-init_extra_listeners()
-notifications.register_notification_listeners()
+startup.run_step(init_models, app)
+startup.run_step(configure_flask_login, app)
+startup.run_step(configure_webassets, app)
+startup.run_step(configure_jinja, app)
+startup.run_step(init_services, app)
+startup.run_step(init_views, app)
+startup.run_step(init_extension_blueprints, app)
+startup.run_step(init_indexer)
+startup.run_step(init_permissions_provider)
+startup.run_step(init_extra_listeners)
+startup.run_step(notifications.register_notification_listeners)
 
 _enable_debug_toolbar()
 _enable_jasmine()
+_enable_request_profiling()
 _display_sql_queries()
+startup.log_report(app.logger)
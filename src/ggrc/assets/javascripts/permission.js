@@ -93,6 +93,27 @@
       return false;
     },
 
+    // Resource ids are sent as run-length encoded resource_ranges, a flat
+    // list of start, length pairs. The lookup object for a type is only
+    // built when the type is first checked.
+    _resource_lookup: function (type_obj) {
+      var ranges;
+      var lookup;
+      var i;
+      var j;
+      if (!type_obj._resource_lookup) {
+        ranges = type_obj.resource_ranges || [];
+        lookup = {};
+        for (i = 0; i < ranges.length; i += 2) {
+          for (j = 0; j < ranges[i + 1]; j++) {
+            lookup[ranges[i] + j] = true;
+          }
+        }
+        type_obj._resource_lookup = lookup;
+      }
+      return type_obj._resource_lookup;
+    },
+
     _resolve_permission_variable: function (value) {
       if ($.type(value) == 'string') {
         if (value[0] == '$') {
@@ -139,7 +160,7 @@
                           instance.type;
       var type_obj = action_obj[instance_type] || {};
       var conditions_by_context = type_obj.conditions || {};
-      var resources = type_obj.resources || [];
+      var resources = this._resource_lookup(type_obj);
       var context = instance.context || {id: null};
       var conditions = conditions_by_context[context.id] || [];
       var condition;
@@ -148,7 +169,7 @@
       if (checkAdmin(0) || checkAdmin(null)) {
         return true;
       }
-      if (~resources.indexOf(instance.id)) {
+      if (resources[instance.id]) {
         return true;
       }
       if (!this._is_allowed(permissions,
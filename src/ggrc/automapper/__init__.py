@@ -12,6 +12,9 @@ from ggrc.automapper.rules import rules
 from ggrc.login import get_current_user
 from ggrc.models.audit import Audit
 from ggrc.models.relationship import Relationship
+from ggrc.models.relationship_edge import RelationshipEdge
+from ggrc.models.relationship_edge import refresh_edges
+from ggrc.models.relationship_helper import clear_adjacency
 from ggrc.models.request import Request
 from ggrc.rbac.permissions import is_allowed_update
 from ggrc.services.common import Resource
@@ -49,35 +52,23 @@ class AutomapperGenerator(object):
     # results in a few steps. This drastically reduces number of queries.
     stubs = {s for rel in self.queue for s in rel}
     stubs.add(obj)
-    # Union is here to convince mysql to use two separate indices and
-    # merge te results. Just using `or` results in a full-table scan
+    # Edges store both orientations of relationships, so the neighbourhood of
+    # all stubs is a single lookup on the primary key of the edge table.
     # Manual column list avoids loading the full object which would also try to
     # load related objects
-    cols = db.session.query(
-        Relationship.source_type, Relationship.source_id,
-        Relationship.destination_type, Relationship.destination_id)
-    relationships = cols.filter(
-        tuple_(Relationship.source_type, Relationship.source_id).in_(
+    edges = db.session.query(
+        RelationshipEdge.object_type, RelationshipEdge.object_id,
+        RelationshipEdge.related_type, RelationshipEdge.related_id,
+    ).filter(
+        tuple_(RelationshipEdge.object_type, RelationshipEdge.object_id).in_(
             [(s.type, s.id) for s in stubs]
         )
-    ).union_all(
-        cols.filter(
-            tuple_(Relationship.destination_type,
-                   Relationship.destination_id).in_(
-                       [(s.type, s.id) for s in stubs]))
-    ).all()
+    ).distinct()
     batch_requests = collections.defaultdict(set)
-    for (src_type, src_id, dst_type, dst_id) in relationships:
-      src = Stub(src_type, src_id)
-      dst = Stub(dst_type, dst_id)
-      # only store a neighbor if we queried for it since this way we know
-      # we'll be storing complete neighborhood by the end of the loop
+    for (src_type, src_id, dst_type, dst_id) in edges:
       batch_requests[src_type].add(src_id)
       batch_requests[dst_type].add(dst_id)
-      if src in stubs:
-        self.cache[src].add(dst)
-      if dst in stubs:
-        self.cache[dst].add(src)
+      self.cache[Stub(src_type, src_id)].add(Stub(dst_type, dst_id))
 
     for type_, ids in batch_requests.iteritems():
       model = getattr(models.all_models, type_)
@@ -160,6 +151,12 @@ class AutomapperGenerator(object):
           "automapping_id": parent_relationship.id}
           for src, dst in self.auto_mappings
           if (src, dst) != original]))  # (src, dst) is sorted
+      # The insert bypasses the session, so the flush hook does not see the
+      # new relationships.
+      created = db.session.query(Relationship.id).filter(
+          Relationship.automapping_id == parent_relationship.id)
+      refresh_edges(db.session, [id_ for id_, in created])
+      clear_adjacency()
 
   def _step(self, src, dst):
     explicit, implicit = rules[src.type, dst.type]
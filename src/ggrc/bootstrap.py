@@ -18,8 +18,8 @@ def set_appengine_packages_path():
 
 def get_db():
   """Get modified db object."""
-  from flask.ext.sqlalchemy import SQLAlchemy
-  db = SQLAlchemy()
+  from ggrc.utils.replica import RoutingSQLAlchemy
+  db = RoutingSQLAlchemy()
 
   class String(db.String):
     """Simple subclass of sqlalchemy.orm.String which provides a default
@@ -20,11 +20,13 @@ import ggrc.builder
 import ggrc.models
 import ggrc.services
 from ggrc import db
+from ggrc.builder import stubs
 from ggrc.login import get_current_user_id
 from ggrc.models.reflection import AttributeInfo
 from ggrc.models.types import JsonType
 from ggrc.utils import url_for
 from ggrc.utils import view_url_for
+from ggrc.utils.encoders import publish_value
 
 
 def get_json_builder(obj):
@@ -55,10 +57,12 @@ def publish_base_properties(obj):
   return ret
 
 
-def publish(obj, inclusions=(), inclusion_filter=None):
+def publish(obj, inclusions=(), inclusion_filter=None, fields=None):
   """Translate ``obj`` into a valid JSON value. Objects with properties are
   translated into a ``dict`` object representing a JSON object while simple
   values are returned unchanged or specially formatted if needed.
+
+  If ``fields`` is given, only the listed attributes of ``obj`` are published.
   """
   if inclusion_filter is None:
     def inclusion_filter(_):
@@ -66,8 +70,10 @@ def publish(obj, inclusions=(), inclusion_filter=None):
   publisher = get_json_builder(obj)
   if publisher and getattr(publisher, '_publish_attrs', []):
     ret = publish_base_properties(obj)
+    if fields is not None:
+      ret = {key: value for key, value in ret.items() if key in fields}
     ret.update(publisher.publish_contribution(
-        obj, inclusions, inclusion_filter))
+        obj, inclusions, inclusion_filter, fields))
     return ret
   # Otherwise, just return the value itself by default
   return obj
@@ -337,17 +343,7 @@ def build_type_query(type, result_spec):
   mapper = model._sa_class_manager.mapper
   columns = []
   columns_indexes = {}
-  if len(list(mapper.self_and_descendants)) == 1:
-    type_column = sqlalchemy.literal(mapper.class_.__name__)
-  else:
-    # Handle polymorphic types with CASE
-    type_column = sqlalchemy.case(
-        value=mapper.polymorphic_on,
-        whens={
-            val: mapper.class_.__name__
-            for val, mapper in mapper.polymorphic_map.items()
-        })
-  columns.append(type_column)
+  columns.append(stubs.get_type_column(mapper))
   columns_indexes['type'] = 0
   columns.append(model.id)
   columns_indexes['id'] = 1
@@ -430,14 +426,10 @@ def build_stub_union_query(queries):
 
 
 def _render_stub_from_match(match, type_columns):
-  type_ = match[type_columns['type']]
-  id = match[type_columns['id']]
-  return {
-      'type': type_,
-      'id': id,
-      'context_id': match[type_columns['context_id']],
-      'href': url_for(type_, id=id),
-  }
+  return stubs.render(
+      match[type_columns['type']],
+      match[type_columns['id']],
+      match[type_columns['context_id']])
 
 
 class LazyStubRepresentation(object):
@@ -449,6 +441,13 @@ class LazyStubRepresentation(object):
     self.conditions = conditions
     self.condition_key, self.condition_val = zip(*sorted(conditions.items()))
 
+  @property
+  def stub_key(self):
+    """(type, id) of the represented object or None for other conditions."""
+    if self.condition_key == ('id',):
+      return self.type, self.condition_val[0]
+    return None
+
   def get_matches(self, results):
     return results\
         .get(self.type, {})\
@@ -504,11 +503,23 @@ def reify_representation(resource, results, type_columns):
 
 
 def publish_representation(resource):
-  queries = gather_queries(resource)
+  """Replace lazy stubs in a published resource with actual stubs.
 
-  if len(queries) == 0:
+  Stubs of objects referenced by id are loaded by the stub service, other
+  conditions are resolved with a union query over all referenced types.
+  """
+  lazy_stubs = [(val, key, obj)
+                for val, key, obj in walk_representation(resource)
+                if isinstance(val, LazyStubRepresentation)]
+  if not lazy_stubs:
     return resource
-  else:
+
+  stubs_by_key = stubs.get_stubs(
+      val.stub_key for val, _, _ in lazy_stubs if val.stub_key)
+
+  queries = [(val.type, val.conditions)
+             for val, _, _ in lazy_stubs if not val.stub_key]
+  if queries:
     results, type_columns, query = build_stub_union_query(queries)
     rows = query.all()
     for row in rows:
@@ -518,11 +529,30 @@ def publish_representation(resource):
         if vals in matches:
           matches[vals].append(row)
 
-    return reify_representation(resource, results, type_columns)
+  for val, key, obj in lazy_stubs:
+    if val.stub_key:
+      stub = stubs_by_key.get(val.stub_key)
+      obj[key] = dict(stub) if stub else None
+    else:
+      obj[key] = val.render(results, type_columns)
+  return resource
 
 
 class Builder(AttributeInfo):
-  """JSON Dictionary builder for ggrc.models.* objects and their mixins."""
+  """JSON Dictionary builder for ggrc.models.* objects and their mixins.
+
+  The publisher method of every published attribute is looked up once, when
+  the builder of a class is created, and kept in ``_publishers``.
+  """
+
+  def __init__(self, tgt_class):
+    super(Builder, self).__init__(tgt_class)
+    self._tgt_class = tgt_class
+    self._publishers = {}
+    for attr in self._publish_attrs | self._stub_attrs:
+      attr_name = getattr(attr, "attr_name", attr)
+      if hasattr(tgt_class, attr_name):
+        self._get_publisher(attr_name)
 
   def generate_link_object_for_foreign_key(self, id, type, context_id=None):
     """Generate a link object for this object reference."""
@@ -645,52 +675,79 @@ class Builder(AttributeInfo):
       else:
         return None
 
-  def publish_attr(
-          self, obj, attr_name, inclusions, include, inclusion_filter):
-    class_attr = getattr(obj.__class__, attr_name)
-    if isinstance(class_attr, AssociationProxy):
-      if getattr(class_attr, 'publish_raw', False):
-        published_attr = getattr(obj, attr_name)
-        if hasattr(published_attr, "copy"):
-          return published_attr.copy()
+  def publish_raw(
+          self, obj, attr_name, class_attr, inclusions, include,
+          inclusion_filter):
+    published_attr = getattr(obj, attr_name)
+    if hasattr(published_attr, "copy"):
+      return published_attr.copy()
+    else:
+      return published_attr
+
+  def publish_property(
+          self, obj, attr_name, class_attr, inclusions, include,
+          inclusion_filter):
+    if not inclusions or include:
+      if getattr(obj, '{0}_id'.format(attr_name)):
+        return LazyStubRepresentation(
+            getattr(obj, '{0}_type'.format(attr_name)),
+            getattr(obj, '{0}_id'.format(attr_name)))
+    else:
+      return self.publish_link(
+          obj, attr_name, inclusions, include, inclusion_filter)
+
+  def publish_plain_value(
+          self, obj, attr_name, class_attr, inclusions, include,
+          inclusion_filter):
+    return publish_value(getattr(obj, attr_name))
+
+  def _get_publisher(self, attr_name):
+    """Get the publisher method and the class attribute for ``attr_name``."""
+    if attr_name not in self._publishers:
+      class_attr = getattr(self._tgt_class, attr_name)
+      if isinstance(class_attr, AssociationProxy):
+        if getattr(class_attr, 'publish_raw', False):
+          method = Builder.publish_raw
         else:
-          return published_attr
+          method = Builder.publish_association_proxy
+      elif isinstance(class_attr, InstrumentedAttribute) and \
+              isinstance(class_attr.property, RelationshipProperty):
+        method = Builder.publish_relationship
+      elif class_attr.__class__.__name__ == 'property':
+        method = Builder.publish_property
       else:
-        return self.publish_association_proxy(
-            obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif isinstance(class_attr, InstrumentedAttribute) and \
-            isinstance(class_attr.property, RelationshipProperty):
-      return self.publish_relationship(
-          obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif class_attr.__class__.__name__ == 'property':
-      if not inclusions or include:
-        if getattr(obj, '{0}_id'.format(attr_name)):
-          return LazyStubRepresentation(
-              getattr(obj, '{0}_type'.format(attr_name)),
-              getattr(obj, '{0}_id'.format(attr_name)))
-      else:
-        return self.publish_link(
-            obj, attr_name, inclusions, include, inclusion_filter)
+        method = Builder.publish_plain_value
+      self._publishers[attr_name] = (method, class_attr)
+    return self._publishers[attr_name]
+
+  def publish_attr(
+          self, obj, attr_name, inclusions, include, inclusion_filter):
+    if obj.__class__ is self._tgt_class:
+      builder = self
     else:
-      return getattr(obj, attr_name)
+      builder = get_json_builder(obj)
+    method, class_attr = builder._get_publisher(attr_name)
+    return method(
+        self, obj, attr_name, class_attr, inclusions, include,
+        inclusion_filter)
 
   def _publish_attrs_for(
-          self, obj, attrs, json_obj, inclusions=[], inclusion_filter=None):
+          self, obj, attrs, json_obj, inclusions=(), inclusion_filter=None,
+          fields=None):
+    local_inclusions = {}
+    for inclusion in inclusions:
+      local_inclusions.setdefault(inclusion[0], inclusion)
     for attr in attrs:
-      if hasattr(attr, '__call__'):
-        attr_name = attr.attr_name
-      else:
-        attr_name = attr
-      local_inclusion = ()
-      for inclusion in inclusions:
-        if inclusion[0] == attr_name:
-          local_inclusion = inclusion
-          break
+      attr_name = getattr(attr, "attr_name", attr)
+      if fields is not None and attr_name not in fields:
+        continue
+      local_inclusion = local_inclusions.get(attr_name, ())
       json_obj[attr_name] = self.publish_attr(
           obj, attr_name, local_inclusion[1:], len(local_inclusion) > 0,
           inclusion_filter)
 
-  def publish_attrs(self, obj, json_obj, extra_inclusions, inclusion_filter):
+  def publish_attrs(self, obj, json_obj, extra_inclusions, inclusion_filter,
+                    fields=None):
     """Translate the state represented by ``obj`` into the JSON dictionary
     ``json_obj``.
 
@@ -705,11 +762,14 @@ class Builder(AttributeInfo):
       ('directives')
       [('directives'),('cycles')]
       [('directives', ('audit_frequency','organization')),('cycles')]
+
+    If ``fields`` is given, attributes that are not listed in it are skipped.
     """
     inclusions = tuple((attr,) for attr in self._include_links)
     inclusions = tuple(set(inclusions).union(set(extra_inclusions)))
     return self._publish_attrs_for(
-        obj, self._publish_attrs, json_obj, inclusions, inclusion_filter)
+        obj, self._publish_attrs, json_obj, inclusions, inclusion_filter,
+        fields)
 
   @classmethod
   def do_update_attrs(cls, obj, json_obj, attrs):
@@ -732,10 +792,11 @@ class Builder(AttributeInfo):
     """
     self.do_update_attrs(obj, json_obj, self._create_attrs)
 
-  def publish_contribution(self, obj, inclusions, inclusion_filter):
+  def publish_contribution(self, obj, inclusions, inclusion_filter,
+                           fields=None):
     """Translate the state represented by ``obj`` into a JSON dictionary"""
     json_obj = {}
-    self.publish_attrs(obj, json_obj, inclusions, inclusion_filter)
+    self.publish_attrs(obj, json_obj, inclusions, inclusion_filter, fields)
     return json_obj
 
   def publish_stubs(self, obj, inclusions, inclusion_filter):
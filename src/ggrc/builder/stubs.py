@@ -0,0 +1,149 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Stub representations of objects.
+
+A stub only holds the type, id, context id and href of an object. Links in
+published objects and `__stubs_only` collections need stubs for thousands of
+objects at once, so stubs are loaded here with one projection of the id,
+type and context id columns per table, and href templates are computed once
+per type.
+
+With MEMCACHE_MECHANISM enabled, stubs are cached by table and id. Cached
+stubs are removed by the same write paths that remove cached objects, see
+`ggrc.services.common.memcache_mark_for_deletion`.
+"""
+
+import collections
+
+import sqlalchemy
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.inflector import get_model
+from ggrc.utils import service_for
+
+# Maximum number of ids in a single IN clause.
+QUERY_CHUNK_SIZE = 1000
+
+_href_templates = {}
+
+
+def get_type_column(mapper):
+  """Get a column with the class names of objects of a mapped class."""
+  if len(list(mapper.self_and_descendants)) == 1:
+    return sqlalchemy.literal(mapper.class_.__name__)
+  # Handle polymorphic types with CASE
+  return sqlalchemy.case(
+      value=mapper.polymorphic_on,
+      whens={
+          val: sub_mapper.class_.__name__
+          for val, sub_mapper in mapper.polymorphic_map.items()
+      })
+
+
+def href_template(type_):
+  """Get the format string for hrefs of objects of the given type."""
+  if type_ not in _href_templates:
+    service = service_for(type_)
+    if service is None or not hasattr(service, "base_url_for"):
+      _href_templates[type_] = None
+    else:
+      _href_templates[type_] = service.base_url_for() + "/{}"
+  return _href_templates[type_]
+
+
+def render(type_, id_, context_id):
+  """Get the stub of an object."""
+  template = href_template(type_)
+  return {
+      "type": type_,
+      "id": id_,
+      "context_id": context_id,
+      "href": template.format(id_) if template else None,
+  }
+
+
+def get_cache_key(model, id_):
+  """Get the memcache key of a stub, `model` can also be a model instance."""
+  return "stub:{}:{}".format(model.__table__.name, id_)
+
+
+def _get_memcache_client():
+  # pylint: disable=protected-access
+  if not getattr(settings, "MEMCACHE_MECHANISM", False):
+    return None
+  from ggrc.services.common import _get_cache_manager
+  return _get_cache_manager().cache_object.memcache_client
+
+
+def _get_cached_stubs(client, model, ids):
+  keys = {get_cache_key(model, id_): id_ for id_ in ids}
+  cached = client.get_multi(keys.keys())
+  return {keys[key]: stub for key, stub in cached.iteritems()}
+
+
+def _add_stubs_to_cache(client, model, stubs):
+  """Add stubs to cache if they are not blocked by DeleteOp entries.
+
+  Stubs expire like cached collections, so stubs missed by invalidation do
+  not stay stale forever.
+  """
+  from ggrc.services.common import CACHE_EXPIRY_COLLECTION
+  entries = {get_cache_key(model, id_): stub
+             for id_, stub in stubs.iteritems()}
+  blockers = client.get_multi(["DeleteOp:" + key for key in entries])
+  client.add_multi({key: stub for key, stub in entries.iteritems()
+                    if "DeleteOp:" + key not in blockers},
+                   CACHE_EXPIRY_COLLECTION)
+
+
+def _query_stubs(model, ids):
+  """Load stubs of objects of one model from the database."""
+  mapper = model._sa_class_manager.mapper  # pylint: disable=protected-access
+  if hasattr(mapper.c, "context_id"):
+    context_column = mapper.c.context_id
+  else:
+    context_column = sqlalchemy.literal(None)
+  query = db.session.query(
+      get_type_column(mapper), mapper.primary_key[0], context_column)
+  ids = sorted(ids)
+  stubs = {}
+  for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+    chunk = ids[i:i + QUERY_CHUNK_SIZE]
+    for type_, id_, context_id in query.filter(
+            mapper.primary_key[0].in_(chunk)):
+      stubs[id_] = render(type_, id_, context_id)
+  return stubs
+
+
+def get_stubs(type_ids):
+  """Get stubs of objects.
+
+  Args:
+    type_ids: iterable of (type, id) pairs. The type can be the name of a
+      polymorphic base class, stubs always have the type of the object.
+
+  Returns:
+    dict with stubs for the given (type, id) pairs. Pairs of objects that do
+    not exist are left out.
+  """
+  ids_by_type = collections.defaultdict(set)
+  for type_, id_ in type_ids:
+    ids_by_type[type_].add(id_)
+  client = _get_memcache_client()
+  stubs = {}
+  for type_, ids in ids_by_type.iteritems():
+    model = get_model(type_)
+    if model is None:
+      continue
+    type_stubs = _get_cached_stubs(client, model, ids) if client else {}
+    missing = ids.difference(type_stubs)
+    if missing:
+      loaded = _query_stubs(model, missing)
+      if client and loaded:
+        _add_stubs_to_cache(client, model, loaded)
+      type_stubs.update(loaded)
+    for id_, stub in type_stubs.iteritems():
+      stubs[type_, id_] = stub
+  return stubs
@@ -8,6 +8,8 @@ from cache import all_cache_entries
 from collections import OrderedDict
 from copy import deepcopy
 
+from ggrc.utils import profiling
+
 """
     Memcache implements the remote AppEngine Memcache mechanism
 
@@ -20,7 +22,8 @@ class MemCache(Cache):
     for cache_entry in all_cache_entries():
       if cache_entry.cache_type is self.name:
         self.supported_resources[cache_entry.model_plural]=cache_entry.class_name
-        self.memcache_client = memcache.Client()
+        self.memcache_client = profiling.wrap_memcache_client(
+            memcache.Client())
 
   def get_name(self):
     return self.name
@@ -3,13 +3,15 @@
 
 """Lists of ggrc contributions."""
 
+from ggrc.models import relationship_edge
 from ggrc.notifications import common
 from ggrc.notifications import notification_handlers
 from ggrc.notifications import data_handlers
 
 
 CONTRIBUTED_CRON_JOBS = [
-    common.send_daily_digest_notifications
+    common.send_daily_digest_notifications,
+    relationship_edge.check_relationship_edges,
 ]
 
 NOTIFICATION_LISTENERS = [
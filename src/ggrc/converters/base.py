@@ -50,10 +50,30 @@ class Converter(object):
       "task_type",
   ]
 
+  IMPORT_PHASES = [
+      "objects",
+      "secondary_objects",
+  ]
+
   def __init__(self, **kwargs):
+    """Initialize a converter.
+
+    Keyword Args:
+      dry_run: if True, imported data is validated but not saved.
+      csv_data: 2D array with the content of the imported csv file.
+      ids_by_type: list of object queries with ids of exported objects.
+      chunk_size: number of rows saved with a single commit.
+      checkpoint: the last checkpoint of an interrupted import of the same
+        data. Rows saved before the checkpoint are not saved again.
+      checkpoint_callback: function called with the new checkpoint, the number
+        of saved rows and the number of all rows after each commit.
+    """
     self.dry_run = kwargs.get("dry_run", True)
     self.csv_data = kwargs.get("csv_data", [])
     self.ids_by_type = kwargs.get("ids_by_type", [])
+    self.chunk_size = kwargs.get("chunk_size") or settings.IMPORT_CHUNK_SIZE
+    self.checkpoint = kwargs.get("checkpoint")
+    self.checkpoint_callback = kwargs.get("checkpoint_callback")
     self.block_converters = []
     self.new_objects = defaultdict(structures.CaseInsensitiveDict)
     self.shared_state = {}
@@ -142,6 +162,47 @@ class Converter(object):
     order.update({c: i for i, c in enumerate(self.CLASS_ORDER)})
     order["Person"] = -1
     self.block_converters.sort(key=lambda x: order[x.name])
+    for index, block_converter in enumerate(self.block_converters):
+      block_converter.block_index = index
+
+  def _position(self, checkpoint):
+    """Get a comparable position of rows described by a checkpoint."""
+    return (
+        self.IMPORT_PHASES.index(checkpoint["phase"]),
+        checkpoint["block"],
+        checkpoint["row"],
+    )
+
+  def is_saved(self, phase, block_index, row_index):
+    """Check if rows up to row_index were saved before the last checkpoint.
+
+    Args:
+      phase: import phase, one of IMPORT_PHASES.
+      block_index: index of the block converter.
+      row_index: index of the first row after the checked rows.
+    """
+    if not self.checkpoint:
+      return False
+    checkpoint = {"phase": phase, "block": block_index, "row": row_index}
+    return self._position(checkpoint) <= self._position(self.checkpoint)
+
+  def save_checkpoint(self, phase, block_index, row_index):
+    """Record that all rows up to row_index have been committed.
+
+    Args:
+      phase: import phase, one of IMPORT_PHASES.
+      block_index: index of the block converter.
+      row_index: index of the first row after the committed rows.
+    """
+    self.checkpoint = {"phase": phase, "block": block_index, "row": row_index}
+    if self.checkpoint_callback is None:
+      return
+    block_sizes = [len(block.row_converters)
+                   for block in self.block_converters]
+    total = len(self.IMPORT_PHASES) * sum(block_sizes)
+    done = (self.IMPORT_PHASES.index(phase) * sum(block_sizes) +
+            sum(block_sizes[:block_index]) + row_index)
+    self.checkpoint_callback(self.checkpoint, done, total)
 
   def import_objects(self):
     for converter in self.block_converters:
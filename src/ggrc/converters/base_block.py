@@ -16,17 +16,19 @@ from sqlalchemy import exc
 
 from ggrc import db
 from ggrc.utils import structures
-from sqlalchemy import or_
-from sqlalchemy import and_
+from sqlalchemy import sql
 
 from ggrc import models
 from ggrc.utils import benchmark
+from ggrc.utils import html_cleaner
 from ggrc.converters import errors
 from ggrc.converters import get_shared_unique_rules
 from ggrc.converters import pre_commit_checks
 from ggrc.converters.base_row import RowConverter
 from ggrc.converters.import_helper import get_column_order
 from ggrc.converters.import_helper import get_object_column_definitions
+from ggrc.models.reflection import SanitizeHtmlInfo
+from ggrc.models.relationship_edge import RelationshipEdge
 from ggrc.services.common import get_modified_objects
 from ggrc.services.common import update_index
 from ggrc.services.common import update_memcache_after_commit
@@ -89,7 +91,9 @@ class BlockConverter(object):
     # The protected access is a false warning for inflector access.
     self._mapping_cache = None
     self._ca_definitions_cache = None
+    self._checked_unique_keys = set()
     self.converter = converter
+    self.block_index = 0
     self.offset = options.get("offset", 0)
     self.object_class = options.get("object_class")
     self.rows = options.get("rows", [])
@@ -132,42 +136,53 @@ class BlockConverter(object):
       self._ca_definitions_cache = self._create_ca_definitions_cache()
     return self._ca_definitions_cache
 
+  @staticmethod
+  def _get_identifiers(object_type, ids):
+    """Get slugs or emails of objects of one type.
+
+    Returns:
+      dict with (type, id) of each existing object as keys and its slug,
+      email or None as values.
+    """
+    model = getattr(models.all_models, object_type, None)
+    if model is None:
+      # Some relationships point to types that no longer exist. These
+      # relationships are ignored everywhere and should eventually be purged
+      # from the db
+      current_app.logger.error("Failed adding objects of unknown type %s to "
+                               "relationship cache.", object_type)
+      return {}
+    identifier = getattr(model, "slug", getattr(model, "email", None))
+    if identifier is None:
+      identifier = sql.null()
+    rows = db.session.query(model.id, identifier).filter(model.id.in_(ids))
+    return {(object_type, id_): value for id_, value in rows}
+
   def _create_mapping_cache(self):
     """Create mapping cache for object in the current block."""
-    def identifier(obj):
-      return getattr(obj, "slug", getattr(obj, "email", None))
-
-    relationship = models.Relationship
+    edge = RelationshipEdge
 
     with benchmark("cache for: {}".format(self.object_class.__name__)):
       with benchmark("cache query"):
-        relationships = relationship.eager_query().filter(or_(
-            and_(
-                relationship.source_type == self.object_class.__name__,
-                relationship.source_id.in_(self.object_ids),
-            ),
-            and_(
-                relationship.destination_type == self.object_class.__name__,
-                relationship.destination_id.in_(self.object_ids),
-            )
-        )).all()
+        edges = db.session.query(
+            edge.object_id, edge.related_type, edge.related_id,
+        ).filter(
+            edge.object_type == self.object_class.__name__,
+            edge.object_id.in_(self.object_ids),
+        ).distinct().all()
       with benchmark("building cache"):
+        related_ids = defaultdict(set)
+        for _, related_type, related_id in edges:
+          related_ids[related_type].add(related_id)
+        identifiers = {}
+        for related_type, ids in related_ids.items():
+          identifiers.update(self._get_identifiers(related_type, ids))
         cache = defaultdict(lambda: defaultdict(list))
-        for rel in relationships:
-          try:
-            if rel.source_type == self.object_class.__name__:
-              if rel.destination:
-                cache[rel.source_id][rel.destination_type].append(
-                    identifier(rel.destination))
-            elif rel.source:
-              cache[rel.destination_id][rel.source_type].append(
-                  identifier(rel.source))
-          except AttributeError:
-            # Some relationships have an invalid state in the database and make
-            # rel.source or rel.destination fail. These relationships are
-            # ignored everywhere and should eventually be purged from the db
-            current_app.logger.error("Failed adding object to relationship "
-                                     "cache. Rel id: %s", rel.id)
+        for object_id, related_type, related_id in edges:
+          # Relationships of deleted objects are skipped.
+          if (related_type, related_id) in identifiers:
+            cache[object_id][related_type].append(
+                identifiers[related_type, related_id])
       return cache
 
   def get_mapping_cache(self):
@@ -289,12 +304,78 @@ class BlockConverter(object):
     """
     if self.ignore:
       return
+    if field_list is None:
+      self._preload_custom_attribute_values()
     for row_converter in self.row_converters:
       row_converter.handle_row_data(field_list)
+    self.check_unique_consistency()
     if field_list is None:
       self.check_mandatory_fields()
       self.check_unique_columns()
 
+  def _preload_custom_attribute_values(self):
+    """Load custom attribute values of all existing row objects at once."""
+    if not issubclass(self.object_class, models.mixins.CustomAttributable):
+      return
+    objects = [row_converter.obj for row_converter in self.row_converters
+               if row_converter.obj is not None]
+    self.object_class.preload_custom_attribute_values(objects)
+
+  def check_unique_consistency(self):
+    """Check new values of unique columns against existing objects.
+
+    Each unique column is checked once, right after the rows got its values,
+    with a single query for all values in the block. The query runs on the
+    whole table, so that classes sharing a table, as listed in
+    get_shared_unique_rules, also share the unique values.
+    """
+    for key, header in self.object_headers.items():
+      if not header["unique"] or key in self._checked_unique_keys:
+        continue
+      handlers = [row_converter.attrs.get(key)
+                  for row_converter in self.row_converters]
+      handlers = [handler for handler in handlers if handler is not None]
+      if not handlers:
+        continue
+      self._checked_unique_keys.add(key)
+      values = {handler.value for handler in handlers
+                if handler.value and handler.row_converter.obj}
+      existing_values = self._get_existing_unique_values(key, values)
+      for handler in handlers:
+        handler.check_unique_consistency(existing_values)
+
+  def _get_existing_unique_values(self, key, values):
+    """Get ids of existing objects with the given unique values.
+
+    Returns:
+      dict with lowercase values as keys and lists of object ids as values.
+    """
+    existing_values = defaultdict(list)
+    if not values:
+      return existing_values
+    table = self.object_class.__table__
+    column = table.c[key]
+    query = db.session.query(table.c.id, column).filter(column.in_(values))
+    for id_, value in query:
+      existing_values[unicode(value).lower()].append(id_)
+    return existing_values
+
+  def _clean_html_values(self):
+    """Clean values of all rows for each html sanitized attribute at once.
+
+    The cleaned values are cached, so setting them on the row objects does
+    not clean them again.
+    """
+    # pylint: disable=protected-access
+    sanitized_attrs = SanitizeHtmlInfo(self.object_class)._sanitize_html
+    for attr_name in sanitized_attrs:
+      values = [row_converter.attrs[attr_name].value
+                for row_converter in self.row_converters
+                if attr_name in row_converter.attrs and
+                not row_converter.ignore]
+      html_cleaner.clean_all(value for value in values
+                             if isinstance(value, basestring))
+
   def check_mandatory_fields(self):
     for row_converter in self.row_converters:
       row_converter.check_mandatory_fields()
@@ -335,26 +416,53 @@ class BlockConverter(object):
       row_converter.setup_secondary_objects(slugs_dict)
 
     if not self.converter.dry_run:
-      for row_converter in self.row_converters:
-        try:
-          row_converter.insert_secondary_objects()
-        except exc.SQLAlchemyError as err:
-          db.session.rollback()
-          current_app.logger.error(
-              "Import failed with: {}".format(err.message))
-          row_converter.add_error(errors.UNKNOWN_ERROR)
-      self.save_import()
+      for end, chunk in self._unsaved_chunks("secondary_objects"):
+        for row_converter in chunk:
+          try:
+            row_converter.insert_secondary_objects()
+          except exc.SQLAlchemyError as err:
+            db.session.rollback()
+            current_app.logger.error(
+                "Import failed with: {}".format(err.message))
+            row_converter.add_error(errors.UNKNOWN_ERROR)
+        self.save_import()
+        self.converter.save_checkpoint(
+            "secondary_objects", self.block_index, end)
+
+  def _unsaved_chunks(self, phase):
+    """Split row converters into chunks that get committed together.
+
+    Chunks committed before the converter checkpoint are skipped, so that an
+    interrupted import can be resumed. A block without rows still yields one
+    empty chunk, so that pending changes get committed.
+
+    Args:
+      phase: import phase, one of Converter.IMPORT_PHASES.
+
+    Yields:
+      tuples with the index of the first row after the chunk and the list of
+      row converters in the chunk.
+    """
+    size = self.converter.chunk_size
+    rows_count = len(self.row_converters)
+    for start in range(0, rows_count or 1, size):
+      end = min(start + size, rows_count)
+      if not self.converter.is_saved(phase, self.block_index, end):
+        yield end, self.row_converters[start:end]
 
   def import_objects(self):
     """Add all objects to the database.
 
     This function flushes all objects to the database and if the dry_run flag
-    is not set, the session gets committed and all signals for the imported
-    objects get sent.
+    is not set, the session gets committed in chunks of rows and all signals
+    for the imported objects get sent.
     """
     if self.ignore:
       return
 
+    with benchmark("Clean html values"):
+      self._clean_html_values()
+
     for row_converter in self.row_converters:
       row_converter.setup_object()
 
@@ -362,19 +470,21 @@ class BlockConverter(object):
       self._check_object(row_converter)
 
     if not self.converter.dry_run:
-      for row_converter in self.row_converters:
-        row_converter.send_pre_commit_signals()
-        try:
-          row_converter.insert_object()
-          db.session.flush()
-        except exc.SQLAlchemyError as err:
-          db.session.rollback()
-          current_app.logger.error(
-              "Import failed with: {}".format(err.message))
-          row_converter.add_error(errors.UNKNOWN_ERROR)
-      self.save_import()
-      for row_converter in self.row_converters:
-        row_converter.send_post_commit_signals()
+      for end, chunk in self._unsaved_chunks("objects"):
+        for row_converter in chunk:
+          row_converter.send_pre_commit_signals()
+          try:
+            row_converter.insert_object()
+            db.session.flush()
+          except exc.SQLAlchemyError as err:
+            db.session.rollback()
+            current_app.logger.error(
+                "Import failed with: {}".format(err.message))
+            row_converter.add_error(errors.UNKNOWN_ERROR)
+        self.save_import()
+        for row_converter in chunk:
+          row_converter.send_post_commit_signals()
+        self.converter.save_checkpoint("objects", self.block_index, end)
 
   def save_import(self):
     """Commit all changes in the session and update memcache."""
@@ -59,19 +59,21 @@ class ColumnHandler(object):
     if options.get("parse"):
       self.set_value()
 
-  def check_unique_consistency(self):
-    """Returns true if no object exists with the same unique field."""
+  def check_unique_consistency(self, existing_values):
+    """Add an error if another existing object has the same unique value.
+
+    Args:
+      existing_values: dict with lowercase values of this column as keys and
+        lists of ids of existing objects with that value as values.
+    """
     if not self.unique:
       return
     if not self.value:
       return
     if not self.row_converter.obj:
       return
-    nr_duplicates = self.row_converter.object_class.query.filter(and_(
-        getattr(self.row_converter.object_class, self.key) == self.value,
-        self.row_converter.object_class.id != self.row_converter.obj.id
-    )).count()
-    if nr_duplicates > 0:
+    ids = existing_values.get(unicode(self.value).lower(), [])
+    if any(id_ != self.row_converter.obj.id for id_ in ids):
       self.add_error(errors.DUPLICATE_VALUE,
                      column_name=self.key,
                      value=self.value)
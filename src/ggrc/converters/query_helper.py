@@ -14,6 +14,7 @@ from sqlalchemy import case
 from sqlalchemy import not_
 from sqlalchemy import or_
 from sqlalchemy import orm
+from sqlalchemy import sql
 
 from ggrc.rbac import permissions
 from ggrc import models
@@ -21,6 +22,7 @@ from ggrc.models.custom_attribute_value import CustomAttributeValue
 from ggrc.models.reflection import AttributeInfo
 from ggrc.models.relationship_helper import RelationshipHelper
 from ggrc.converters import get_exportables
+from ggrc.utils import as_json
 
 
 class BadQueryException(Exception):
@@ -83,6 +85,9 @@ class QueryHelper(object):
   The result fields may or may not be present in the resulting query depending
   on the attributes of `get` method.
 
+  Identical object queries in one request are evaluated only once, and so are
+  identical relevant filters. A relevant filter on "__previous__" reuses the
+  ids computed for the referenced object query instead of rebuilding them.
   """
 
   def __init__(self, query, ca_disabled=False):
@@ -91,6 +96,9 @@ class QueryHelper(object):
     self.query = self._clean_query(query)
     self.ca_disabled = ca_disabled
     self._set_attr_name_map()
+    self._objects_cache = {}
+    self._related_ids_cache = {}
+    self._result_ids = {}
 
   def _set_attr_name_map(self):
     """ build a map for attributes names and display names
@@ -234,17 +242,89 @@ class QueryHelper(object):
     Returns:
       list of dicts: same query as the input with all ids that match the filter
     """
-    for object_query in self.query:
+    for index, object_query in enumerate(self.query):
       objects = self._get_objects(object_query)
       objects = self._apply_limit(
           objects,
           limit=object_query.get("limit"),
       )
-      object_query["ids"] = [o.id for o in objects]
+      object_query["ids"] = self._set_result_ids(index, objects)
     return self.query
 
+  def _set_result_ids(self, index, objects):
+    """Remember ids of the objects returned for the object query at index.
+
+    The stored ids are used by relevant filters on "__previous__" objects.
+
+    Returns:
+      list of ids of the given objects.
+    """
+    self._result_ids[index] = [o.id for o in objects]
+    return self._result_ids[index]
+
+  def _get_previous_ids(self, index):
+    """Get ids returned by an already evaluated object query."""
+    if index not in self._result_ids:
+      raise BadQueryException("Relevant filter references object query {} "
+                              "that has not been evaluated yet".format(index))
+    return self._result_ids[index]
+
+  def _query_key(self, object_query):
+    """Get a key identifying the set of objects an object query selects.
+
+    References to previous object queries are replaced with the ids returned
+    by the referenced queries, so that equal subexpressions get equal keys no
+    matter where in the query list they appear.
+    """
+    def resolve(exp):
+      """Replace "__previous__" references in exp with resulting ids."""
+      if not isinstance(exp, dict):
+        return exp
+      exp = dict(exp)
+      if exp.get("object_name") == "__previous__":
+        index = exp["ids"][0]
+        exp["object_name"] = self.query[index]["object_name"]
+        exp["ids"] = self._get_previous_ids(index)
+      for side in ("left", "right"):
+        if side in exp:
+          exp[side] = resolve(exp[side])
+      return exp
+
+    filters = object_query.get("filters", {})
+    return as_json({
+        "object_name": object_query["object_name"],
+        "expression": resolve(filters.get("expression")),
+        "order_by": object_query.get("order_by"),
+        "permissions": object_query.get("permissions", "read"),
+        "fields": object_query.get("fields"),
+    }, sort_keys=True)
+
   def _get_objects(self, object_query):
-    """Get a set of objects described in the filters."""
+    """Get a set of objects described in the filters.
+
+    The result is shared between all equal object queries in self.query.
+    """
+    key = self._query_key(object_query)
+    if key not in self._objects_cache:
+      self._objects_cache[key] = self._query_objects(object_query)
+    return self._objects_cache[key]
+
+  def _get_related_ids(self, object_type, related_type, related_ids):
+    """Get ids of object_type objects related to the given objects.
+
+    The ids are fetched once per distinct set of arguments.
+    """
+    key = (object_type, related_type, tuple(sorted(set(related_ids))))
+    if key not in self._related_ids_cache:
+      self._related_ids_cache[key] = list(RelationshipHelper.get_related_ids(
+          object_type,
+          related_type,
+          related_ids,
+      ))
+    return self._related_ids_cache[key]
+
+  def _query_objects(self, object_query):
+    """Query the database for objects described in the filters."""
     object_name = object_query["object_name"]
     expression = object_query.get("filters", {}).get("expression")
 
@@ -268,9 +348,9 @@ class QueryHelper(object):
       )
     requested_permissions = object_query.get("permissions", "read")
     if requested_permissions == "update":
-      objs = [o for o in query if permissions.is_allowed_update_for(o)]
+      objs = permissions.filter_allowed_update_for(query)
     else:
-      objs = [o for o in query if permissions.is_allowed_read_for(o)]
+      objs = permissions.filter_allowed_read_for(query)
 
     return objs
 
@@ -416,15 +496,21 @@ class QueryHelper(object):
 
     def relevant():
       """Filter by relevant object."""
-      query = (self.query[exp["ids"][0]]
-               if exp["object_name"] == "__previous__" else exp)
-      return object_class.id.in_(
-          RelationshipHelper.get_ids_related_to(
-              object_class.__name__,
-              query["object_name"],
-              query["ids"],
-          )
+      if exp["object_name"] == "__previous__":
+        index = exp["ids"][0]
+        related_type = self.query[index]["object_name"]
+        related_ids = self._get_previous_ids(index)
+      else:
+        related_type = exp["object_name"]
+        related_ids = exp["ids"]
+      ids = self._get_related_ids(
+          object_class.__name__,
+          related_type,
+          related_ids,
       )
+      if not ids:
+        return sql.false()
+      return object_class.id.in_(ids)
 
     def similar():
       """Filter by relationships similarity."""
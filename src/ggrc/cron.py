@@ -0,0 +1,114 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Nightly cron jobs.
+
+Extensions contribute jobs through CONTRIBUTED_CRON_JOBS and the nightly cron
+endpoint starts all of them, see `ggrc.views.cron`. Each job gets a run record
+for the day in `cron_job_runs`, so a job that succeeded is not run again and a
+job that failed is retried the next time the endpoint is called on that day.
+
+Jobs that process a lot of data can be marked as `batched`. A batched job is
+called with the cursor returned by its previous call, None for the first
+call, and returns the cursor of its next batch or None when it is done. Each
+batch commits its own work. The cursor is stored after each batch, so a run
+that failed or used up its time budget continues with the next batch.
+
+Contributed jobs must not depend on each other, since they can run
+concurrently as separate background tasks.
+"""
+
+import collections
+import datetime
+import time
+import traceback
+
+from sqlalchemy.exc import IntegrityError
+
+from ggrc import db
+from ggrc import extensions
+from ggrc.models.cron_job_run import CronJobRun
+
+
+def batched(job):
+  """Mark a cron job as batched."""
+  job.batched = True
+  return job
+
+
+def get_job_name(job):
+  return "{}.{}".format(job.__module__, job.__name__)
+
+
+def get_jobs():
+  """Get all contributed cron jobs by their names, in contribution order."""
+  return collections.OrderedDict(
+      (get_job_name(job), job)
+      for job in extensions.get_module_contributions("CONTRIBUTED_CRON_JOBS"))
+
+
+def get_run(name, run_date):
+  """Get the run record of a job for a day, creating it if needed."""
+  run = CronJobRun.query.filter_by(name=name, run_date=run_date).first()
+  if run is not None:
+    return run
+  db.session.add(CronJobRun(name=name, run_date=run_date, status="Pending",
+                            attempts=0))
+  try:
+    db.session.commit()
+  except IntegrityError:
+    # Another request has created the record in the meantime.
+    db.session.rollback()
+  return CronJobRun.query.filter_by(name=name, run_date=run_date).one()
+
+
+def _update_run(run, **values):
+  for key, value in values.items():
+    setattr(run, key, value)
+  db.session.add(run)
+  db.session.commit()
+
+
+def _get_cursor(run):
+  return run.cursor["value"] if run.cursor else None
+
+
+def run_job(job, run, time_budget=None):
+  """Run a job and record the outcome in its run record.
+
+  Args:
+    job: contributed cron job.
+    run: run record of the job.
+    time_budget: number of seconds after which a batched job stops before
+      its next batch, or None to run until the job is done.
+
+  Returns:
+    True if the job is done, False if it stopped because of the time budget.
+
+  Raises:
+    any exception raised by the job, after the failure is recorded.
+  """
+  deadline = time.time() + time_budget if time_budget is not None else None
+  # Continuing a paused run is not a new attempt.
+  attempts = run.attempts + int(run.status != "Paused")
+  _update_run(run, status="Running", attempts=attempts,
+              started_at=datetime.datetime.utcnow(), error=None)
+  try:
+    if getattr(job, "batched", False):
+      cursor = job(_get_cursor(run))
+      while cursor is not None:
+        _update_run(run, cursor={"value": cursor})
+        if deadline is not None and time.time() >= deadline:
+          _update_run(run, status="Paused")
+          return False
+        cursor = job(cursor)
+    else:
+      job()
+  except Exception:
+    db.session.rollback()
+    _update_run(run, status="Failure", error=traceback.format_exc(),
+                finished_at=datetime.datetime.utcnow())
+    raise
+  _update_run(run, status="Success", cursor=None,
+              finished_at=datetime.datetime.utcnow())
+  return True
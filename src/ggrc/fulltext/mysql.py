@@ -26,6 +26,7 @@ from ggrc_basic_permissions import objects_via_assignable_query
 from ggrc_basic_permissions import program_relationship_query
 from ggrc_basic_permissions import backlog_workflows
 from ggrc.rbac import permissions, context_query_filter
+from ggrc.rbac.grants import in_grants
 from .sql import SqlIndexer
 
 
@@ -106,7 +107,7 @@ class MysqlIndexer(SqlIndexer):
         if resources:
           resource_sql = and_(
               MysqlRecordProperty.type == model_name,
-              MysqlRecordProperty.key.in_(resources))
+              in_grants(MysqlRecordProperty.key, resources))
         else:
           resource_sql = false()
 
@@ -19,7 +19,14 @@ class SqlIndexer(Indexer):
       db.session.commit()
 
   def update_record(self, record, commit=True):
-    self.delete_record(record.key, record.type, commit=False)
+    # Only replace the properties of this record. Custom attribute values are
+    # indexed as properties of their parent object and must survive updates
+    # of the parent and of its other custom attribute values.
+    db.session.query(self.record_type).filter(
+        self.record_type.key == record.key,
+        self.record_type.type == record.type,
+        self.record_type.property.in_(record.properties.keys()),
+    ).delete(synchronize_session=False)
     self.create_record(record, commit=commit)
 
   def delete_record(self, key, type, commit=True):
@@ -0,0 +1,43 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add local task queue columns to background tasks
+
+Create Date: 2016-09-05 10:15:30.512349
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5ce97d85f308'
+down_revision = '173b800a28f3'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.add_column('background_tasks',
+                sa.Column('progress', sa.Integer(), nullable=True))
+  op.add_column('background_tasks',
+                sa.Column('queued_request', sa.Text(), nullable=True))
+  op.add_column('background_tasks',
+                sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+  op.add_column('background_tasks',
+                sa.Column('attempts', sa.Integer(), nullable=False,
+                          server_default="0"))
+  op.create_index('ix_background_tasks_status_lease', 'background_tasks',
+                  ['status', 'lease_expires_at'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_index('ix_background_tasks_status_lease', 'background_tasks')
+  op.drop_column('background_tasks', 'attempts')
+  op.drop_column('background_tasks', 'lease_expires_at')
+  op.drop_column('background_tasks', 'queued_request')
+  op.drop_column('background_tasks', 'progress')
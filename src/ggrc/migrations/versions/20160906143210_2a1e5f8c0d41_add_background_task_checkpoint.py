@@ -0,0 +1,30 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add checkpoint to background tasks
+
+Create Date: 2016-09-06 14:32:10.274136
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2a1e5f8c0d41'
+down_revision = '5ce97d85f308'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.add_column('background_tasks',
+                sa.Column('checkpoint', sa.Text(), nullable=True))
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_column('background_tasks', 'checkpoint')
@@ -0,0 +1,43 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add cron job runs
+
+Create Date: 2016-09-09 08:15:22.641097
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7b2c9d1f38'
+down_revision = '2a1e5f8c0d41'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'cron_job_runs',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('name', sa.String(length=250), nullable=False),
+      sa.Column('run_date', sa.Date(), nullable=False),
+      sa.Column('status', sa.String(length=250), nullable=False),
+      sa.Column('cursor', sa.Text(), nullable=True),
+      sa.Column('attempts', sa.Integer(), nullable=False),
+      sa.Column('started_at', sa.DateTime(), nullable=True),
+      sa.Column('finished_at', sa.DateTime(), nullable=True),
+      sa.Column('error', sa.Text(), nullable=True),
+      sa.PrimaryKeyConstraint('id'),
+      sa.UniqueConstraint('name', 'run_date',
+                          name='uq_cron_job_runs_name_run_date'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('cron_job_runs')
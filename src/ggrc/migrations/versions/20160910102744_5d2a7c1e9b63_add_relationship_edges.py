@@ -0,0 +1,54 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add relationship edges
+
+Create Date: 2016-09-10 10:27:44.318620
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a7c1e9b63'
+down_revision = '4e7b2c9d1f38'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'relationship_edges',
+      sa.Column('object_type', sa.String(length=250), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('related_type', sa.String(length=250), nullable=False),
+      sa.Column('related_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('relationship_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.ForeignKeyConstraint(['relationship_id'], ['relationships.id'],
+                              ondelete='CASCADE'),
+      sa.PrimaryKeyConstraint('object_type', 'object_id', 'related_type',
+                              'related_id', 'relationship_id'),
+  )
+  op.create_index('ix_relationship_edges_relationship',
+                  'relationship_edges', ['relationship_id'])
+  op.execute("""
+      INSERT INTO relationship_edges
+          (relationship_id, object_type, object_id, related_type, related_id)
+      SELECT id, source_type, source_id, destination_type, destination_id
+      FROM relationships
+      UNION
+      SELECT id, destination_type, destination_id, source_type, source_id
+      FROM relationships
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('relationship_edges')
@@ -0,0 +1,37 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add permission grants
+
+Create Date: 2016-09-11 09:35:16.482913
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7f4c1b8e2d05'
+down_revision = '5d2a7c1e9b63'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'permission_grants',
+      sa.Column('connection_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('grant_key', sa.String(length=40), nullable=False),
+      sa.Column('resource_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.PrimaryKeyConstraint('connection_id', 'grant_key', 'resource_id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('permission_grants')
@@ -0,0 +1,66 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Store permission grants per user
+
+Create Date: 2016-09-12 08:10:42.318204
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e5f0d1a67'
+down_revision = '7f4c1b8e2d05'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.drop_table('permission_grants')
+  op.create_table(
+      'permission_grant_generations',
+      sa.Column('user_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('generation', sa.String(length=40), nullable=False),
+      sa.PrimaryKeyConstraint('user_id'),
+  )
+  op.create_table(
+      'permission_grant_sources',
+      sa.Column('user_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('action', sa.String(length=250), nullable=False),
+      sa.Column('resource_type', sa.String(length=250), nullable=False),
+      sa.Column('kind', sa.String(length=20), nullable=False),
+      sa.Column('list_key', sa.String(length=40), nullable=False),
+      sa.PrimaryKeyConstraint('user_id', 'action', 'resource_type', 'kind'),
+  )
+  op.create_table(
+      'permission_grant_ids',
+      sa.Column('user_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('list_key', sa.String(length=40), nullable=False),
+      sa.Column('grant_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.PrimaryKeyConstraint('user_id', 'list_key', 'grant_id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('permission_grant_ids')
+  op.drop_table('permission_grant_sources')
+  op.drop_table('permission_grant_generations')
+  op.create_table(
+      'permission_grants',
+      sa.Column('connection_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('grant_key', sa.String(length=40), nullable=False),
+      sa.Column('resource_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.PrimaryKeyConstraint('connection_id', 'grant_key', 'resource_id'),
+  )
@@ -9,6 +9,7 @@ from ggrc import settings
 from ggrc.models.reflection import SanitizeHtmlInfo
 from ggrc.models.all_models import *  # noqa
 from ggrc.utils import html_cleaner
+from ggrc.utils import startup
 
 """All gGRC model objects and associated utilities."""
 
@@ -154,9 +155,9 @@ def init_sanitization_hooks():
 
 
 def init_app(app):
-  init_all_models(app)
-  init_lazy_mixins()
-  init_session_monitor_cache()
-  init_sanitization_hooks()
+  startup.run_step(init_all_models, app)
+  startup.run_step(init_lazy_mixins)
+  startup.run_step(init_session_monitor_cache)
+  startup.run_step(init_sanitization_hooks)
 
 from ggrc.models.inflector import get_model  # noqa
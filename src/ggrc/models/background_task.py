@@ -3,16 +3,19 @@
 
 from functools import wraps
 from time import time
+from flask import has_request_context
 from flask import request
 from flask.wrappers import Response
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.datastructures import Headers
 from ggrc import db
 from ggrc import settings
-from ggrc.login import get_current_user
+from ggrc.login import get_current_user_id
 from ggrc.models.mixins import Base
 from ggrc.models.deferred import deferred
 from ggrc.models.mixins import Stateful
 from ggrc.models.types import CompressedType
+from ggrc.models.types import JsonType
 
 
 class BackgroundTask(Base, Stateful, db.Model):
@@ -27,12 +30,28 @@ class BackgroundTask(Base, Stateful, db.Model):
   name = deferred(db.Column(db.String), 'BackgroundTask')
   parameters = deferred(db.Column(CompressedType), 'BackgroundTask')
   result = deferred(db.Column(CompressedType), 'BackgroundTask')
+  progress = deferred(db.Column(db.Integer), 'BackgroundTask')
+  checkpoint = deferred(db.Column(JsonType), 'BackgroundTask')
+
+  # Local task queue state, see ggrc.task_runner
+  queued_request = deferred(db.Column(JsonType), 'BackgroundTask')
+  lease_expires_at = deferred(db.Column(db.DateTime), 'BackgroundTask')
+  attempts = deferred(
+      db.Column(db.Integer, nullable=False, default=0), 'BackgroundTask')
 
   _publish_attrs = [
       'name',
-      'result'
+      'result',
+      'progress',
   ]
 
+  @staticmethod
+  def _extra_table_args(_):
+    return (
+        db.Index('ix_background_tasks_status_lease',
+                 'status', 'lease_expires_at'),
+    )
+
   def start(self):
     self.status = "Running"
     db.session.add(self)
@@ -54,6 +73,27 @@ class BackgroundTask(Base, Stateful, db.Model):
     db.session.add(self)
     db.session.commit()
 
+  def update_progress(self, done, total, checkpoint=None):
+    """Store the percentage of work done by this task.
+
+    The value is written on a separate connection, so that polling clients
+    can see it before the task commits its own changes.
+
+    Args:
+      done: amount of finished work.
+      total: amount of all work.
+      checkpoint: optional JSON serializable state from which a retried task
+        can continue its work.
+    """
+    values = {"progress": 100 * done // total if total else 100}
+    if checkpoint is not None:
+      values["checkpoint"] = checkpoint
+    table = self.__table__
+    db.engine.execute(
+        table.update().where(table.c.id == self.id).values(**values))
+    for key, value in values.items():
+      set_committed_value(self, key, value)
+
   def make_response(self, default=None):
     if self.result is None:
       return default
@@ -63,6 +103,46 @@ class BackgroundTask(Base, Stateful, db.Model):
                               self.result['headers']))
 
 
+def uses_task_queue():
+  """Check if background tasks are executed outside of the request."""
+  return (getattr(settings, 'APP_ENGINE', False) or
+          getattr(settings, 'LOCAL_TASK_QUEUE', False))
+
+
+# Headers of the original request that are not stored with queued requests.
+# Cookies and credentials are dropped, the task runner logs in as the user
+# that created the task instead. Control headers such as
+# X-GGRC-BackgroundTask and If-Match are kept, since the replayed request
+# needs them.
+SKIPPED_QUEUED_REQUEST_HEADERS = frozenset((
+    'authorization',
+    'content-length',
+    'cookie',
+    'proxy-authorization',
+))
+
+
+def _queue_locally(task, url):
+  """Store the request that runs the task for the local task runner.
+
+  The task request is replayed by ggrc.task_runner the same way the App Engine
+  task queue does it: with the original headers, task id and task name, as
+  the user that created the task.
+  """
+  headers = [(key, value) for key, value in request.headers.items()
+             if key.lower() not in SKIPPED_QUEUED_REQUEST_HEADERS]
+  headers.append(('X-Appengine-Taskname', task.name))
+  headers.append(('x-task-id', str(task.id)))
+  task.queued_request = {
+      'url': url,
+      'method': request.method,
+      'headers': headers,
+      'user_id': task.modified_by_id,
+  }
+  db.session.add(task)
+  db.session.commit()
+
+
 def create_task(name, url, queued_callback=None, parameters=None):
 
   # task name must be unique
@@ -70,7 +150,8 @@ def create_task(name, url, queued_callback=None, parameters=None):
     parameters = {}
   task = BackgroundTask(name=name + str(int(time())))
   task.parameters = parameters
-  task.modified_by = get_current_user()
+  # Cron requests create tasks without a logged in user.
+  task.modified_by_id = get_current_user_id()
   db.session.add(task)
   db.session.commit()
 
@@ -86,11 +167,23 @@ def create_task(name, url, queued_callback=None, parameters=None):
         params={'task_id': task.id},
         method=request.method,
         headers=headers)
+  elif getattr(settings, 'LOCAL_TASK_QUEUE', False):
+    _queue_locally(task, url)
   elif queued_callback:
     queued_callback(task)
   return task
 
 
+def get_request_task():
+  """Get the background task run by the current request, if any."""
+  if not has_request_context():
+    return None
+  task_id = request.headers.get('x-task-id')
+  if task_id is None:
+    return None
+  return BackgroundTask.query.get(int(task_id))
+
+
 def make_task_response(id_):
   task = BackgroundTask.query.get(id_)
   return task.make_response()
@@ -0,0 +1,35 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Module containing run records of nightly cron jobs."""
+
+from ggrc import db
+from ggrc.models.types import JsonType
+
+
+class CronJobRun(db.Model):
+  """State of a cron job for one nightly run.
+
+  Batched jobs store the cursor of their next batch, so that a run that used
+  up its time budget or failed can continue where it stopped. This table is
+  maintained by `ggrc.cron`, it is not exposed through the api.
+  """
+  __tablename__ = 'cron_job_runs'
+  __table_args__ = (
+      db.UniqueConstraint('name', 'run_date',
+                          name='uq_cron_job_runs_name_run_date'),
+  )
+
+  # Paused runs used up their time budget and wait for the task that
+  # continues them.
+  VALID_STATES = ("Pending", "Running", "Paused", "Success", "Failure")
+
+  id = db.Column(db.Integer, primary_key=True)
+  name = db.Column(db.String(length=250), nullable=False)
+  run_date = db.Column(db.Date, nullable=False)
+  status = db.Column(db.String(length=250), nullable=False, default="Pending")
+  cursor = db.Column(JsonType, nullable=True)
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  started_at = db.Column(db.DateTime, nullable=True)
+  finished_at = db.Column(db.DateTime, nullable=True)
+  error = db.Column(db.Text, nullable=True)
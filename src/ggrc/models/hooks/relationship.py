@@ -0,0 +1,36 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""A module with Relationship flush hooks"""
+
+import itertools
+
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+
+from ggrc.models.relationship import Relationship
+from ggrc.models.relationship_edge import refresh_edges
+from ggrc.models.relationship_helper import clear_adjacency
+
+
+def init_hook():
+  """Initialize all hooks"""
+
+  # pylint: disable=unused-variable
+  @event.listens_for(Session, "after_flush")
+  def update_relationship_edges(session, flush_context):
+    """Rebuild edges and drop cached edges of changed relationships.
+
+    Args:
+      session: the session that has been flushed.
+      flush_context: internal unit of work state of the flush.
+    Returns:
+      None
+    """
+    # pylint: disable=unused-argument
+    changed = [obj for obj in itertools.chain(session.new, session.dirty,
+                                              session.deleted)
+               if isinstance(obj, Relationship)]
+    if changed:
+      refresh_edges(session, [obj.id for obj in changed])
+      clear_adjacency()
@@ -7,16 +7,22 @@ import collections
 
 from flask import current_app
 from sqlalchemy import and_
+from sqlalchemy import case
+from sqlalchemy import func
+from sqlalchemy import inspect
 from sqlalchemy import orm
 from sqlalchemy import or_
+from sqlalchemy import select
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import foreign
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.exceptions import BadRequest
 
 from ggrc import db
 from ggrc import utils
+from ggrc.login import get_current_user_id
 from ggrc.models.computed_property import computed_property
 from ggrc.models.reflection import AttributeInfo
 
@@ -165,9 +171,13 @@ class CustomAttributable(object):
                                         None)
       attr = self._values_map.get(value.get("custom_attribute_id"))
       if attr:
-        attr.attributable = self
-        attr.attribute_value = value.get("attribute_value")
-        attr.attribute_object_id = value.get("attribute_object_id")
+        # Only touch attributes that change, so that unchanged values are not
+        # flushed, validated and indexed again.
+        if attr.attributable is not self:
+          attr.attributable = self
+        for name in ("attribute_value", "attribute_object_id"):
+          if getattr(attr, name) != value.get(name):
+            setattr(attr, name, value.get(name))
       elif "custom_attribute_id" in value:
         # this is automatically appended to self._custom_attribute_values
         # on attributable=self
@@ -228,14 +238,223 @@ class CustomAttributable(object):
         continue
       self.insert_definition(definition)
 
+  def _split_legacy_values(self, attributes):
+    """Split values into the kept ones and the ones that should be removed.
+
+    Imports could have saved multiple values for the same definition, in
+    which case only the chronologically last one is kept.
+
+    Args:
+      attributes: dict with definition ids as string keys.
+
+    Returns:
+      dict with the kept values for string definition ids and list of values
+      that are not in the legacy custom attributes dict.
+    """
+    from ggrc.fulltext.mysql import MysqlRecordProperty
+
+    old_values = collections.defaultdict(list)
+    for value in self.custom_attribute_values:
+      old_values[value.custom_attribute_id].append(value)
+    last_values = {}
+    removed_values = []
+    for definition_id, values in old_values.iteritems():
+      values.sort(key=lambda value: value.created_at)
+      last_values[str(definition_id)] = values.pop()
+      removed_values.extend(values)
+    for key in last_values.keys():
+      if key not in attributes:
+        removed_values.append(last_values.pop(key))
+
+    # Fulltext record properties of values are keyed by the parent object, so
+    # they are not removed by the indexer.
+    ftrp_properties = ["attribute_value_{id}".format(id=value.id)
+                       for value in removed_values if value.id is not None]
+    if ftrp_properties:
+      db.session.query(MysqlRecordProperty)\
+          .filter(
+              and_(
+                  MysqlRecordProperty.type == self.__class__.__name__,
+                  MysqlRecordProperty.property.in_(ftrp_properties)))\
+          .delete(synchronize_session=False)
+    return last_values, removed_values
+
+  def _diff_legacy_values(self, attributes, last_values):
+    """Get new and changed values of legacy custom attributes.
+
+    Args:
+      attributes: dict with definition ids as string keys.
+      last_values: dict with the kept values for string definition ids.
+
+    Returns:
+      list of new values and list of changed values. Each of them is a dict
+      with the column values of the custom attribute value. Changed values
+      also hold the kept value object in "value" and its previous attribute
+      value in "old".
+    """
+    # pylint: disable=not-an-iterable
+    definitions = {d.id: d for d in self.get_custom_attribute_definitions()}
+    inserts = []
+    updates = []
+    for ad_id, raw_value in attributes.iteritems():
+      change = {
+          "custom_attribute_id": int(ad_id),
+          "attribute_value": raw_value,
+          "attribute_object_id": None,
+          "type": self.__class__.__name__,
+          "id": self.id,
+      }
+      if definitions[int(ad_id)].attribute_type.startswith("Map:"):
+        obj_type, obj_id = raw_value.split(":")
+        change.update({
+            "attribute_value": obj_type,
+            "attribute_object_id": long(obj_id),
+            "type": obj_type,
+            "id": obj_id,
+        })
+      # TODO: We are ignoring contexts for now
+      previous = last_values.get(ad_id)
+      if previous is None:
+        inserts.append(change)
+        continue
+      change["value"] = previous
+      change["old"] = previous.attribute_value
+      change["write"] = (
+          previous.attribute_value != change["attribute_value"] or
+          previous.attribute_object_id != change["attribute_object_id"])
+      change["notify"] = previous.attribute_value != raw_value
+      if change["write"] or change["notify"]:
+        updates.append(change)
+    return inserts, updates
+
+  def _apply_legacy_values(self, inserts, updates, removed_values):
+    """Apply changes of legacy custom attribute values through the ORM.
+
+    This is used when the object or some of its values are not stored yet,
+    since rows written directly could not refer to them.
+    """
+    from ggrc.models.custom_attribute_value import CustomAttributeValue
+
+    for value in removed_values:
+      # delete-orphan cascade deletes the value on flush
+      self._custom_attribute_values.remove(value)
+    modified_by_id = get_current_user_id()
+    for change in updates:
+      for name in ("attribute_value", "attribute_object_id"):
+        if getattr(change["value"], name) != change[name]:
+          setattr(change["value"], name, change[name])
+          change["value"].modified_by_id = modified_by_id
+    for change in inserts:
+      change["value"] = CustomAttributeValue(
+          custom_attribute_id=change["custom_attribute_id"],
+          attributable=self,
+          attribute_value=change["attribute_value"],
+          attribute_object_id=change["attribute_object_id"],
+          modified_by_id=modified_by_id,
+          context_id=getattr(self, "context_id", None),
+      )
+
+  @staticmethod
+  def _delete_legacy_values(table, cache, removed_values):
+    """Delete values with one statement."""
+    if cache is not None:
+      for value in removed_values:
+        cache.deleted[value] = value.log_json()
+    db.session.execute(table.delete().where(
+        table.c.id.in_([value.id for value in removed_values])))
+
+  @staticmethod
+  def _update_legacy_values(table, cache, now, updates):
+    """Update values with one statement."""
+    modified_by_id = get_current_user_id()
+    db.session.execute(table.update().where(
+        table.c.id.in_([change["value"].id for change in updates])
+    ).values(
+        attribute_value=case([
+            (change["value"].id, change["attribute_value"])
+            for change in updates
+        ], value=table.c.id),
+        attribute_object_id=case([
+            (change["value"].id, change["attribute_object_id"])
+            for change in updates
+        ], value=table.c.id),
+        modified_by_id=modified_by_id,
+        updated_at=now,
+    ))
+    for change in updates:
+      value = change["value"]
+      for name in ("attribute_value", "attribute_object_id"):
+        set_committed_value(value, name, change[name])
+      set_committed_value(value, "modified_by_id", modified_by_id)
+      set_committed_value(value, "updated_at", now)
+      if cache is not None:
+        cache.dirty[value] = value.log_json()
+
+  def _insert_legacy_values(self, table, cache, now, inserts):
+    """Insert values with one multi-row statement and load them.
+
+    Returns:
+      list of the inserted value objects.
+    """
+    from ggrc.models.custom_attribute_value import CustomAttributeValue
+
+    db.session.execute(table.insert(), [{
+        "custom_attribute_id": change["custom_attribute_id"],
+        "attributable_id": self.id,
+        "attributable_type": self.__class__.__name__,
+        "attribute_value": change["attribute_value"],
+        "attribute_object_id": change["attribute_object_id"],
+        "modified_by_id": get_current_user_id(),
+        "context_id": getattr(self, "context_id", None),
+        "created_at": now,
+        "updated_at": now,
+    } for change in inserts])
+    new_values = {value.custom_attribute_id: value
+                  for value in CustomAttributeValue.query.filter(
+                      table.c.attributable_type == self.__class__.__name__,
+                      table.c.attributable_id == self.id,
+                      table.c.custom_attribute_id.in_(
+                          [change["custom_attribute_id"]
+                           for change in inserts]))}
+    for change in inserts:
+      value = change["value"] = new_values[change["custom_attribute_id"]]
+      set_committed_value(value, value.attributable_attr, self)
+      if cache is not None:
+        cache.new[value] = value.log_json()
+    return [change["value"] for change in inserts]
+
+  def _write_legacy_values(self, inserts, updates, removed_values):
+    """Write changes of legacy custom attribute values in batches.
+
+    Removed values are deleted with one statement, changed values are updated
+    with one statement and new values are inserted with one multi-row
+    statement. The written values are added to the request cache, so they get
+    revisions, fulltext records and memcache updates as if they were flushed
+    by the ORM.
+    """
+    from ggrc.models.custom_attribute_value import CustomAttributeValue
+    from ggrc.services.common import get_cache
+
+    table = CustomAttributeValue.__table__
+    cache = get_cache()
+    now = db.session.execute(select([func.now()])).scalar()
+    values = list(self._custom_attribute_values)
+    if removed_values:
+      self._delete_legacy_values(table, cache, removed_values)
+      values = [value for value in values if value not in removed_values]
+    written = [change for change in updates if change["write"]]
+    if written:
+      self._update_legacy_values(table, cache, now, written)
+    if inserts:
+      values.extend(self._insert_legacy_values(table, cache, now, inserts))
+    set_committed_value(self, "_custom_attribute_values", values)
+
   def custom_attributes(self, src):
     """Legacy setter for custom attribute values and definitions.
 
     This code should only be used for custom attribute definitions until
     setter for that is updated.
     """
-    from ggrc.fulltext.mysql import MysqlRecordProperty
-    from ggrc.models.custom_attribute_value import CustomAttributeValue
     from ggrc.services import signals
 
     ca_values = src.get("custom_attribute_values")
@@ -254,93 +473,78 @@ class CustomAttributable(object):
     if not attributes:
       return
 
-    old_values = collections.defaultdict(list)
-    last_values = dict()
-
     # attributes looks like this:
     #    [ {<id of attribute definition> : attribute value, ... }, ... ]
-
-    # 1) Get all custom attribute values for the CustomAttributable instance
-    attr_values = db.session.query(CustomAttributeValue).filter(and_(
-        CustomAttributeValue.attributable_type == self.__class__.__name__,
-        CustomAttributeValue.attributable_id == self.id)).all()
-
-    attr_value_ids = [value.id for value in attr_values]
-    ftrp_properties = [
-        "attribute_value_{id}".format(id=_id) for _id in attr_value_ids]
-
-    # Save previous value of custom attribute. This is a bit complicated by
-    # the fact that imports can save multiple values at the time of writing.
-    # old_values holds all previous values of attribute, last_values holds
-    # chronologically last value.
-    for value in attr_values:
-      old_values[value.custom_attribute_id].append(
-          (value.created_at, value.attribute_value))
-
-    last_values = {str(key): max(old_vals,
-                                 key=lambda (created_at, _): created_at)
-                   for key, old_vals in old_values.iteritems()}
-
-    # 2) Delete all fulltext_record_properties for the list of values
-    if len(attr_value_ids) > 0:
-      db.session.query(MysqlRecordProperty)\
-          .filter(
-              and_(
-                  MysqlRecordProperty.type == self.__class__.__name__,
-                  MysqlRecordProperty.property.in_(ftrp_properties)))\
-          .delete(synchronize_session='fetch')
-
-      # 3) Delete the list of custom attribute values
-      db.session.query(CustomAttributeValue)\
-          .filter(CustomAttributeValue.id.in_(attr_value_ids))\
-          .delete(synchronize_session='fetch')
-
-      db.session.commit()
-
-    # 4) Instantiate custom attribute values for each of the definitions
-    #    passed in (keys)
-    # pylint: disable=not-an-iterable
-    definitions = {d.id: d for d in self.get_custom_attribute_definitions()}
-    for ad_id in attributes.keys():
-      obj_type = self.__class__.__name__
-      obj_id = self.id
-      new_value = CustomAttributeValue(
-          custom_attribute_id=ad_id,
-          attributable=self,
-          attribute_value=attributes[ad_id],
-      )
-      if definitions[int(ad_id)].attribute_type.startswith("Map:"):
-        obj_type, obj_id = new_value.attribute_value.split(":")
-        new_value.attribute_value = obj_type
-        new_value.attribute_object_id = long(obj_id)
-      # 5) Set the context_id for each custom attribute value to the context id
-      #    of the custom attributable.
-      # TODO: We are ignoring contexts for now
-      # new_value.context_id = cls.context_id
-      self.custom_attribute_values.append(new_value)
-      if ad_id in last_values:
-        _, previous_value = last_values[ad_id]
-        if previous_value != attributes[ad_id]:
-          signals.Signals.custom_attribute_changed.send(
-              self.__class__,
-              obj=self,
-              src={
-                  "type": obj_type,
-                  "id": obj_id,
-                  "operation": "UPDATE",
-                  "value": new_value,
-                  "old": previous_value
-              }, service=self.__class__.__name__)
-      else:
+    attributes = {str(key): value for key, value in attributes.items()}
+
+    # 1) Find values that are not set anymore and the values that can be
+    #    updated in place.
+    last_values, removed_values = self._split_legacy_values(attributes)
+
+    # 2) Diff the values, so that unchanged values produce no writes,
+    #    revisions or index updates.
+    inserts, updates = self._diff_legacy_values(attributes, last_values)
+
+    # 3) Write the changes of a stored object with one statement per kind of
+    #    change.
+    if self.id is None or any(value.id is None
+                              for value in self._custom_attribute_values):
+      self._apply_legacy_values(inserts, updates, removed_values)
+    elif inserts or updates or removed_values:
+      self._write_legacy_values(inserts, updates, removed_values)
+
+    for change in updates:
+      if change["notify"]:
         signals.Signals.custom_attribute_changed.send(
             self.__class__,
             obj=self,
             src={
-                "type": obj_type,
-                "id": obj_id,
-                "operation": "INSERT",
-                "value": new_value,
+                "type": change["type"],
+                "id": change["id"],
+                "operation": "UPDATE",
+                "value": change["value"],
+                "old": change["old"],
             }, service=self.__class__.__name__)
+    for change in inserts:
+      signals.Signals.custom_attribute_changed.send(
+          self.__class__,
+          obj=self,
+          src={
+              "type": change["type"],
+              "id": change["id"],
+              "operation": "INSERT",
+              "value": change["value"],
+          }, service=self.__class__.__name__)
+
+  @classmethod
+  def preload_custom_attribute_values(cls, objects):
+    """Load custom attribute values of many objects with a single query.
+
+    Objects whose values are already loaded are skipped, so this is safe to
+    call with any list of objects, for instance all objects of an import
+    block, before their values get diffed one by one.
+
+    Args:
+      objects: list of custom attributable model instances.
+    """
+    from ggrc.models.custom_attribute_value import CustomAttributeValue
+
+    pending = collections.defaultdict(dict)
+    for obj in objects:
+      state = inspect(obj)
+      if obj.id is not None and "_custom_attribute_values" in state.unloaded:
+        pending[obj.__class__.__name__][obj.id] = obj
+    for type_, objects_by_id in pending.iteritems():
+      values = collections.defaultdict(list)
+      query = CustomAttributeValue.query.filter(
+          CustomAttributeValue.attributable_type == type_,
+          CustomAttributeValue.attributable_id.in_(objects_by_id.keys()))
+      for value in query:
+        values[value.attributable_id].append(value)
+      for id_, obj in objects_by_id.iteritems():
+        for value in values[id_]:
+          set_committed_value(value, value.attributable_attr, obj)
+        set_committed_value(obj, "_custom_attribute_values", values[id_])
 
   @classmethod
   def get_custom_attribute_definitions(cls):
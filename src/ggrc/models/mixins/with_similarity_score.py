@@ -14,7 +14,7 @@ from sqlalchemy.orm import aliased
 from sqlalchemy.sql import func
 
 from ggrc import db
-from ggrc.models.relationship import Relationship
+from ggrc.models.relationship_edge import RelationshipEdge
 
 
 class WithSimilarityScore(object):
@@ -60,48 +60,26 @@ class WithSimilarityScore(object):
     # naming: self is "object", the object mapped to it is "related",
     # the object mapped to "related" is "similar"
 
-    # get all Relationships for self
-    object_to_related = db.session.query(Relationship).filter(
-        or_(and_(Relationship.source_type == cls.__name__,
-                 Relationship.source_id == id_),
-            and_(Relationship.destination_type == cls.__name__,
-                 Relationship.destination_id == id_))).subquery()
-
-    # define how to get id and type of "related" objects
-    related_id_case = (case([(and_(object_to_related.c.source_id == id_,
-                                   object_to_related.c.source_type ==
-                                   cls.__name__),
-                              object_to_related.c.destination_id)],
-                            else_=object_to_related.c.source_id)
-                       .label("related_id"))
-    related_type_case = (case([(and_(object_to_related.c.source_id == id_,
-                                     object_to_related.c.source_type ==
-                                     cls.__name__),
-                                object_to_related.c.destination_type)],
-                              else_=object_to_related.c.source_type)
-                         .label("related_type"))
-
-    related_to_similar = aliased(Relationship, name="related_to_similar")
-
-    # self-join Relationships to get "similar" id and type; save "related" type
-    # to get the weight of this relationship later
+    # edges store both orientations of relationships, so the objects related
+    # to self and the objects related to them are two lookups on the primary
+    # key of the edge table
+    object_to_related = aliased(RelationshipEdge, name="object_to_related")
+    related_to_similar = aliased(RelationshipEdge, name="related_to_similar")
+
+    # join edges to get "similar" id and type; save "related" type to get the
+    # weight of this relationship later
     joined = db.session.query(
-        related_type_case,
-        related_to_similar.destination_id.label("similar_id"),
-        related_to_similar.destination_type.label("similar_type"),
-    ).join(
-        related_to_similar,
-        and_(related_id_case == related_to_similar.source_id,
-             related_type_case == related_to_similar.source_type),
-    ).union(db.session.query(
-        related_type_case,
-        related_to_similar.source_id.label("similar_id"),
-        related_to_similar.source_type.label("similar_type"),
+        object_to_related.related_type.label("related_type"),
+        related_to_similar.related_id.label("similar_id"),
+        related_to_similar.related_type.label("similar_type"),
     ).join(
         related_to_similar,
-        and_(related_id_case == related_to_similar.destination_id,
-             related_type_case == related_to_similar.destination_type),
-    )).subquery()
+        and_(object_to_related.related_type == related_to_similar.object_type,
+             object_to_related.related_id == related_to_similar.object_id),
+    ).filter(
+        object_to_related.object_type == cls.__name__,
+        object_to_related.object_id == id_,
+    ).distinct().subquery()
 
     # define weights for every "related" object type with values from
     # relevant_types dict
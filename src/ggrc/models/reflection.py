@@ -161,12 +161,24 @@ class AttributeInfo(object):
         if attr in tgt_class.__dict__:
           yield getattr(tgt_class, attr, None)
 
+  # Gathered attributes by class and attribute names. Class definitions do
+  # not change at runtime, so every class is only walked once.
+  _gathered = {}
+
   @classmethod
   def gather_attr_dicts(cls, tgt_class, src_attr):
     """ Gather dictionaries from target class parets """
+    key = (tgt_class, src_attr)
+    if key not in AttributeInfo._gathered:
+      AttributeInfo._gathered[key] = cls._gather_attr_dicts(tgt_class,
+                                                            src_attr)
+    return dict(AttributeInfo._gathered[key])
+
+  @classmethod
+  def _gather_attr_dicts(cls, tgt_class, src_attr):
     result = {}
     for base_class in tgt_class.__bases__:
-      base_result = cls.gather_attr_dicts(base_class, src_attr)
+      base_result = cls._gather_attr_dicts(base_class, src_attr)
       result.update(base_result)
     attrs = getattr(tgt_class, src_attr, {})
     result.update(attrs)
@@ -182,6 +194,13 @@ class AttributeInfo(object):
     Inheritance of some attributes can be circumvented through use of the
     ``DontPropoagate`` decorator class.
     """
+    if accumulator is None and main_class is None:
+      src_attrs = src_attrs if type(src_attrs) is list else [src_attrs]
+      key = (tgt_class, tuple(src_attrs))
+      if key not in AttributeInfo._gathered:
+        AttributeInfo._gathered[key] = cls.gather_attrs(
+            tgt_class, src_attrs, set(), tgt_class)
+      return set(AttributeInfo._gathered[key])
     if main_class is None:
       main_class = tgt_class
     src_attrs = src_attrs if type(src_attrs) is list else [src_attrs]
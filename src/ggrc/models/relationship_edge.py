@@ -0,0 +1,141 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Both orientations of relationships, for lookups of mapped objects.
+
+A relationship can store an object on either side, so looking up the objects
+mapped to an object used to scan the relationships table twice, once per
+side. `relationship_edges` stores each relationship once from the source to
+the destination and once from the destination to the source. All objects
+mapped to an object are then a single range of the primary key.
+
+Edges of a relationship are rebuilt in the same transaction whenever a flush
+adds or changes the relationship, see `ggrc.models.hooks.relationship`, and
+are removed by the foreign key when the relationship is deleted. Code that
+inserts relationships without the session must call `refresh_edges` itself.
+A batched nightly consistency check repairs edges that got out of sync
+anyway.
+"""
+
+from sqlalchemy import select
+from sqlalchemy import union
+
+from ggrc import cron
+from ggrc import db
+from ggrc.models.relationship import Relationship
+
+# Maximum number of relationship ids in a single IN clause.
+QUERY_CHUNK_SIZE = 1000
+
+_COLUMNS = ("relationship_id", "object_type", "object_id", "related_type",
+            "related_id")
+
+
+class RelationshipEdge(db.Model):
+  """Object related to another object through a relationship.
+
+  This is a denormalised table maintained from relationships, it is not
+  exposed through the api.
+  """
+  __tablename__ = 'relationship_edges'
+  __table_args__ = (
+      db.Index('ix_relationship_edges_relationship', 'relationship_id'),
+  )
+
+  # The primary key starts with the object, so all objects related to an
+  # object are stored next to each other and ordered by their type.
+  object_type = db.Column(db.String(length=250), primary_key=True)
+  object_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  related_type = db.Column(db.String(length=250), primary_key=True)
+  related_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  relationship_id = db.Column(
+      db.Integer,
+      db.ForeignKey('relationships.id', ondelete="CASCADE"),
+      primary_key=True,
+      autoincrement=False,
+  )
+
+
+def _orientation_select(object_side, related_side, relationship_ids):
+  """Select edges from one side of relationships to the other."""
+  table = Relationship.__table__
+  columns = [
+      table.c.id,
+      table.c[object_side + "_type"],
+      table.c[object_side + "_id"],
+      table.c[related_side + "_type"],
+      table.c[related_side + "_id"],
+  ]
+  query = select([
+      column.label(name) for column, name in zip(columns, _COLUMNS)
+  ])
+  if relationship_ids is not None:
+    query = query.where(table.c.id.in_(relationship_ids))
+  return query
+
+
+def edges_select(relationship_ids=None):
+  """Select edges of relationships in both orientations.
+
+  Args:
+    relationship_ids: ids of relationships whose edges are selected, or None
+      for all relationships.
+  """
+  # The union also drops the second edge of a relationship of an object with
+  # itself. It is wrapped in a named subquery, since MySQL rejects the unnamed
+  # one that INSERT ... SELECT would get otherwise.
+  return select([union(
+      _orientation_select("source", "destination", relationship_ids),
+      _orientation_select("destination", "source", relationship_ids),
+  ).alias("edges")])
+
+
+def refresh_edges(session, relationship_ids):
+  """Rebuild edges of the given relationships."""
+  relationship_ids = sorted(id_ for id_ in set(relationship_ids) if id_)
+  table = RelationshipEdge.__table__
+  for i in range(0, len(relationship_ids), QUERY_CHUNK_SIZE):
+    chunk = relationship_ids[i:i + QUERY_CHUNK_SIZE]
+    session.execute(table.delete().where(table.c.relationship_id.in_(chunk)))
+    session.execute(table.insert().from_select(_COLUMNS, edges_select(chunk)))
+
+
+def _get_rows(session, query):
+  return {tuple(row) for row in session.execute(query)}
+
+
+def _find_mismatched_relationships(session, relationship_ids):
+  """Get ids of relationships with stored edges that differ from them."""
+  table = RelationshipEdge.__table__
+  stored = _get_rows(session, select(
+      [table.c[column] for column in _COLUMNS]
+  ).where(table.c.relationship_id.in_(relationship_ids)))
+  expected = _get_rows(session, edges_select(relationship_ids))
+  # The relationship id is the first column of each row.
+  return {row[0] for row in stored.symmetric_difference(expected)}
+
+
+@cron.batched
+def check_relationship_edges(cursor=None):
+  """Repair edges that do not match their relationships.
+
+  This is the nightly consistency check. Each call compares one chunk of
+  relationships and commits the repairs.
+
+  Args:
+    cursor: id of the last relationship checked by the previous call.
+
+  Returns:
+    id of the last checked relationship, or None when all relationships have
+    been checked.
+  """
+  query = db.session.query(Relationship.id).order_by(Relationship.id)
+  if cursor is not None:
+    query = query.filter(Relationship.id > cursor)
+  relationship_ids = [id_ for id_, in query.limit(QUERY_CHUNK_SIZE)]
+  if not relationship_ids:
+    return None
+  refresh_edges(db.session, _find_mismatched_relationships(
+      db.session, relationship_ids))
+  db.session.commit()
+  return relationship_ids[-1]
@@ -1,7 +1,10 @@
 # Copyright (C) 2016 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
-from sqlalchemy import and_
+import collections
+
+from flask import g
+from flask import has_request_context
 from sqlalchemy import sql
 
 from ggrc import db
@@ -10,9 +13,92 @@ from ggrc import models
 from ggrc.models import Audit
 from ggrc.models import Request
 from ggrc.models.relationship import Relationship
+from ggrc.models.relationship_edge import RelationshipEdge
 from ggrc.models import all_models
 
 
+def _query_edges(columns, object_type, related_type, related_ids):
+  """Query columns of edges from related objects to objects of object_type."""
+  return db.session.query(*columns).filter(
+      RelationshipEdge.object_type == related_type,
+      RelationshipEdge.object_id.in_(related_ids),
+      RelationshipEdge.related_type == object_type,
+  )
+
+
+class RelationshipAdjacency(object):
+  """In-memory index of relationship edges between objects.
+
+  The index is filled in bulk: a lookup fetches all relationship rows for the
+  requested objects that are not in the index yet with a single query, and
+  answers the rest from memory. Both orientations of every fetched edge are
+  stored, but only neighbourhoods that were fully fetched are trusted.
+  """
+
+  def __init__(self):
+    # (type, id, neighbour type) -> set of neighbour ids
+    self._edges = collections.defaultdict(set)
+    self._loaded = set()
+
+  def clear(self):
+    """Drop all cached edges."""
+    self._edges.clear()
+    self._loaded.clear()
+
+  def _load(self, object_type, related_type, related_ids):
+    """Fetch edges between related objects and objects of object_type."""
+    rows = _query_edges(
+        (RelationshipEdge.object_id, RelationshipEdge.related_id),
+        object_type, related_type, related_ids)
+    for related_id, object_id in rows:
+      self._edges[(related_type, related_id, object_type)].add(object_id)
+      self._edges[(object_type, object_id, related_type)].add(related_id)
+    self._loaded.update((related_type, id_, object_type)
+                        for id_ in related_ids)
+
+  def get_ids_related_to(self, object_type, related_type, related_ids):
+    """Get ids of object_type objects mapped with a Relationship.
+
+    Args:
+      object_type: type of objects whose ids are returned.
+      related_type: type of the objects in related_ids.
+      related_ids: list of ids of related objects.
+
+    Returns:
+      set of ids of object_type objects related to any of the related objects.
+    """
+    missing = [id_ for id_ in set(related_ids)
+               if (related_type, id_, object_type) not in self._loaded]
+    if missing:
+      self._load(object_type, related_type, missing)
+    result = set()
+    for id_ in related_ids:
+      result.update(self._edges.get((related_type, id_, object_type), ()))
+    return result
+
+
+def get_adjacency():
+  """Get the relationship adjacency index for the current request.
+
+  Outside of a request context a new empty index is returned, so nothing is
+  cached between unrelated calls.
+  """
+  if not has_request_context():
+    return RelationshipAdjacency()
+  adjacency = getattr(g, "relationship_adjacency", None)
+  if adjacency is None:
+    adjacency = g.relationship_adjacency = RelationshipAdjacency()
+  return adjacency
+
+
+def clear_adjacency():
+  """Invalidate the relationship adjacency index of the current request."""
+  if has_request_context():
+    adjacency = getattr(g, "relationship_adjacency", None)
+    if adjacency is not None:
+      adjacency.clear()
+
+
 class RelationshipHelper(object):
 
   @classmethod
@@ -166,6 +252,30 @@ class RelationshipHelper(object):
       query = query.union(q)
     return query
 
+  @classmethod
+  def get_related_ids(cls, object_type, related_type, related_ids):
+    """Get a set of ids of objects related to the given objects.
+
+    This returns the same ids as get_ids_related_to, but direct relationships
+    are answered from the request adjacency index and only the special and
+    extension mappings are queried from the database.
+    """
+    if isinstance(related_ids, (int, long)):
+      related_ids = [related_ids]
+    if not related_ids:
+      return set()
+
+    ids = get_adjacency().get_ids_related_to(
+        object_type, related_type, related_ids)
+
+    queries = cls.get_extension_mappings(
+        object_type, related_type, related_ids)
+    queries.extend(cls.get_special_mappings(
+        object_type, related_type, related_ids))
+    if any(query is not None for query in queries):
+      ids.update(row[0] for row in cls._array_union(queries))
+    return ids
+
   @classmethod
   def get_ids_related_to(cls, object_type, related_type, related_ids=[]):
     """ get ids of objects
@@ -180,22 +290,8 @@ class RelationshipHelper(object):
     if not related_ids:
       return db.session.query(Relationship.source_id).filter(sql.false())
 
-    destination_ids = db.session.query(Relationship.destination_id).filter(
-        and_(
-            Relationship.destination_type == object_type,
-            Relationship.source_type == related_type,
-            Relationship.source_id.in_(related_ids),
-        )
-    )
-    source_ids = db.session.query(Relationship.source_id).filter(
-        and_(
-            Relationship.source_type == object_type,
-            Relationship.destination_type == related_type,
-            Relationship.destination_id.in_(related_ids),
-        )
-    )
-
-    queries = [destination_ids, source_ids]
+    queries = [_query_edges((RelationshipEdge.related_id,),
+                            object_type, related_type, related_ids)]
     queries.extend(cls.get_extension_mappings(
         object_type, related_type, related_ids))
     queries.extend(cls.get_special_mappings(
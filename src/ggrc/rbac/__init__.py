@@ -8,20 +8,18 @@ def context_query_filter(context_column, contexts):
   Else, return the full query
   '''
   from sqlalchemy import or_
+  from ggrc.rbac.grants import in_grants
 
   if contexts is None:
     # Admin context, no filter
     return True
   else:
     filter_expr = None
-    # Handle `NULL` context specially
+    # Handle `NULL` context specially, in_grants ignores it
     if None in contexts:
       filter_expr = context_column == None
-      # We're modifying `contexts`, so copy
-      contexts = set(contexts)
-      contexts.remove(None)
-    if len(contexts) > 0:
-      filter_in_expr = context_column.in_(contexts)
+    if any(context is not None for context in contexts):
+      filter_in_expr = in_grants(context_column, contexts)
       if filter_expr is not None:
         filter_expr = or_(filter_expr, filter_in_expr)
       else:
@@ -0,0 +1,235 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Materialised permission grants.
+
+Users with many per object grants or contexts used to get permission filters
+with IN lists of tens of thousands of ids. Such statements can exceed
+max_allowed_packet and are hard for the optimizer.
+
+When the permissions of a user are loaded and contain a list longer than
+PERMISSION_GRANTS_TABLE_THRESHOLD, all granted id lists of the user are
+stored in the permission grant tables:
+
+  permission_grant_sources: the list key of each action, resource type and
+    kind (resources or contexts) of the user.
+  permission_grant_ids: the ids of each list of the user.
+  permission_grant_generations: a hash of all lists of the user.
+
+The lists are only written when this generation differs from the stored one,
+that is after the grants of the user changed, and they are written in their
+own transaction on the primary database. Permission filters then use a
+semi-join against the lists instead of an IN list, as long as the stored
+generation is the one of the loaded permissions. Otherwise, for instance on
+a replica that has not caught up yet, they fall back to IN lists.
+"""
+
+import hashlib
+import logging
+
+from flask import g
+from flask import has_request_context
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import and_
+from sqlalchemy import exc
+from sqlalchemy import or_
+from sqlalchemy import select
+
+from ggrc import db
+from ggrc import settings
+from ggrc.login import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of rows in a single insert statement.
+INSERT_CHUNK_SIZE = 1000
+
+RESOURCES = "resources"
+CONTEXTS = "contexts"
+
+# Key of the grants generation in the permissions of a user.
+GENERATION_KEY = "__grants"
+
+# The tables are created by a migration, but they are not part of the
+# application metadata, since they are not models.
+_metadata = MetaData()
+
+generations_table = Table(
+    "permission_grant_generations", _metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=False),
+    Column("generation", String(40), nullable=False),
+)
+
+sources_table = Table(
+    "permission_grant_sources", _metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=False),
+    Column("action", String(250), primary_key=True),
+    Column("resource_type", String(250), primary_key=True),
+    Column("kind", String(20), primary_key=True),
+    Column("list_key", String(40), nullable=False),
+)
+
+ids_table = Table(
+    "permission_grant_ids", _metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=False),
+    Column("list_key", String(40), primary_key=True),
+    Column("grant_id", Integer, primary_key=True, autoincrement=False),
+)
+
+
+class GrantList(list):
+  """Granted ids collected from the permissions of the current user.
+
+  Attributes:
+    kind: RESOURCES or CONTEXTS.
+    sources: (action, resource type) pairs of the permissions the ids were
+      collected from.
+    generation: grants generation of the permissions or None.
+  """
+
+  def __init__(self, kind, sources, generation):
+    super(GrantList, self).__init__()
+    self.kind = kind
+    self.sources = sources
+    self.generation = generation
+
+
+def _get_hash(value):
+  return hashlib.sha1(repr(value)).hexdigest()
+
+
+def _collect_lists(permissions):
+  """Get granted id lists of permissions.
+
+  Returns:
+    list of (action, resource type, kind, list key) sources and dict of id
+    lists without None by list key.
+  """
+  sources = []
+  lists = {}
+  keys = {}
+  for action, types in permissions.iteritems():
+    if not isinstance(types, dict):
+      continue
+    for resource_type, permission in types.iteritems():
+      for kind in (RESOURCES, CONTEXTS):
+        ids = permission.get(kind)
+        if not ids:
+          continue
+        # Actions with the same grants share their lists.
+        if id(ids) not in keys:
+          clean_ids = sorted(id_ for id_ in set(ids) if id_ is not None)
+          keys[id(ids)] = _get_hash(clean_ids)
+          lists[keys[id(ids)]] = clean_ids
+        sources.append((action, resource_type, kind, keys[id(ids)]))
+  return sorted(sources), lists
+
+
+def _get_stored_generation(connection, user_id, for_update=False):
+  query = select([generations_table.c.generation]).where(
+      generations_table.c.user_id == user_id)
+  if for_update:
+    query = query.with_for_update()
+  return connection.execute(query).scalar()
+
+
+def _write_lists(connection, user_id, generation, sources, lists):
+  """Replace the stored grant lists of a user."""
+  for table in (sources_table, ids_table, generations_table):
+    connection.execute(table.delete().where(table.c.user_id == user_id))
+  connection.execute(sources_table.insert(), [{
+      "user_id": user_id,
+      "action": action,
+      "resource_type": resource_type,
+      "kind": kind,
+      "list_key": list_key,
+  } for action, resource_type, kind, list_key in sources])
+  rows = [{"user_id": user_id, "list_key": list_key, "grant_id": id_}
+          for list_key, ids in lists.iteritems() for id_ in ids]
+  for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+    connection.execute(ids_table.insert(), rows[i:i + INSERT_CHUNK_SIZE])
+  connection.execute(generations_table.insert(), {
+      "user_id": user_id,
+      "generation": generation,
+  })
+
+
+def store_grants(user_id, permissions):
+  """Store the granted id lists of a user if they changed.
+
+  This is called whenever the permissions of a user are computed. Lists are
+  only written when the user has a list that is too long for an IN list and
+  the stored lists are not the current ones.
+
+  Args:
+    user_id: id of the user the permissions belong to.
+    permissions: permissions of the user. The generation of the stored lists
+      is added to them.
+  """
+  if db.engine.dialect.name != "mysql":
+    return
+  sources, lists = _collect_lists(permissions)
+  longest = max([len(ids) for ids in lists.itervalues()] or [0])
+  if longest <= settings.PERMISSION_GRANTS_TABLE_THRESHOLD:
+    return
+  generation = _get_hash(sources)
+  try:
+    if _get_stored_generation(db.engine, user_id) != generation:
+      with db.engine.begin() as connection:
+        if _get_stored_generation(connection, user_id, True) != generation:
+          _write_lists(connection, user_id, generation, sources, lists)
+  except exc.SQLAlchemyError:
+    # Permission filters fall back to IN lists.
+    logger.exception("Failed to store permission grants of user %s",
+                     user_id)
+    return
+  permissions[GENERATION_KEY] = generation
+
+
+def _is_stored(generation):
+  """Check if the lists of the current user are stored for a generation."""
+  stored = {}
+  if has_request_context():
+    stored = g.setdefault("permission_grant_generations", {})
+  if generation not in stored:
+    stored[generation] = _get_stored_generation(
+        db.session, get_current_user_id()) == generation
+  return stored[generation]
+
+
+def _select_grants(ids):
+  """Select the stored ids of a grant list of the current user."""
+  return select([ids_table.c.grant_id]).select_from(
+      ids_table.join(sources_table, and_(
+          sources_table.c.user_id == ids_table.c.user_id,
+          sources_table.c.list_key == ids_table.c.list_key,
+      ))
+  ).where(and_(
+      ids_table.c.user_id == get_current_user_id(),
+      sources_table.c.kind == ids.kind,
+      or_(*[and_(sources_table.c.action == action,
+                 sources_table.c.resource_type == resource_type)
+            for action, resource_type in ids.sources]),
+  ))
+
+
+def in_grants(column, ids):
+  """Get a filter for rows where the column is one of the granted ids.
+
+  Args:
+    column: column with object or context ids.
+    ids: iterable of granted ids, None is ignored.
+
+  Returns:
+    a semi-join against the stored grants for long grant lists of the current
+    user, and `column IN (ids)` otherwise.
+  """
+  if (isinstance(ids, GrantList) and ids.generation is not None and
+          len(ids) > settings.PERMISSION_GRANTS_TABLE_THRESHOLD and
+          _is_stored(ids.generation)):
+    return column.in_(_select_grants(ids))
+  return column.in_(sorted(id_ for id_ in set(ids) if id_ is not None))
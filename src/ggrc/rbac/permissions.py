@@ -78,6 +78,17 @@ def is_allowed_delete(resource_type, resource_id, context_id):
 def is_allowed_delete_for(instance):
   return permissions_for(get_user()).is_allowed_delete_for(instance)
 
+
+def filter_allowed_read_for(instances):
+  """The instances that the user is allowed to read."""
+  return permissions_for(get_user()).filter_allowed_for(instances, "read")
+
+
+def filter_allowed_update_for(instances):
+  """The instances that the user is allowed to update."""
+  return permissions_for(get_user()).filter_allowed_for(instances, "update")
+
+
 def create_contexts_for(resource_type):
   """All contexts in which the user has create permission."""
   return permissions_for(get_user()).create_contexts_for(resource_type)
@@ -126,6 +137,8 @@ def has_conditions(action, resource):
   is_allowed_for
   """
   _permissions = permissions_for()._permissions()
-  return bool(_permissions.get(action, {})
-              .get(resource, {})
-              .get('conditions', {}))
+  # Permission checks add empty condition lists for the checked contexts.
+  conditions = (_permissions.get(action, {})
+                .get(resource, {})
+                .get('conditions', {}))
+  return any(conditions.itervalues())
@@ -2,11 +2,21 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 from collections import namedtuple
+from collections import OrderedDict
 from flask import g
 from flask.ext.login import current_user
+import sqlalchemy
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.associationproxy import AssociationProxy
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.properties import RelationshipProperty
+from werkzeug.local import LocalProxy
 from .user_permissions import UserPermissions
+from ggrc import db
 from ggrc.rbac.permissions import permissions_for as find_permissions
 from ggrc.rbac.permissions import is_allowed_create
+from ggrc.rbac import grants
+from ggrc.rbac import resource_ids
 from ggrc.models import get_model
 from ggrc.models import Person
 
@@ -142,6 +152,126 @@ _CONDITIONS_MAP = {
 }
 
 
+def _resolve_predicate_value(value):
+  value = resolve_permission_variable(value)
+  if isinstance(value, LocalProxy):
+    value = value._get_current_object()  # pylint: disable=protected-access
+  return value
+
+
+def _get_class_attr(model, name):
+  """Get a mapped attribute of a model or None for other attributes."""
+  if "." in name:
+    return None
+  attr = getattr(model, name, None)
+  if isinstance(attr, (InstrumentedAttribute, AssociationProxy)):
+    return attr
+  return None
+
+
+def _is_relationship(attr):
+  return (isinstance(attr, InstrumentedAttribute) and
+          isinstance(attr.property, RelationshipProperty))
+
+
+def contains_predicate(model, value, list_property, **_):
+  """SQL version of `contains_condition`."""
+  attr = _get_class_attr(model, list_property)
+  if attr is None or not (isinstance(attr, AssociationProxy) or
+                          _is_relationship(attr) and attr.property.uselist):
+    return None
+  return attr.contains(_resolve_predicate_value(value))
+
+
+def is_predicate(model, value, property_name, **_):
+  """SQL version of `is_condition`."""
+  attr = _get_class_attr(model, property_name)
+  value = _resolve_predicate_value(value)
+  if isinstance(attr, AssociationProxy) or attr is None:
+    return None
+  if _is_relationship(attr):
+    if attr.property.uselist or not isinstance(value, (db.Model, type(None))):
+      return None
+  elif isinstance(value, db.Model):
+    return None
+  return attr == value
+
+
+def in_predicate(model, value, property_name, **_):
+  """SQL version of `in_condition`."""
+  attr = _get_class_attr(model, property_name)
+  if attr is None or isinstance(attr, AssociationProxy) or \
+     _is_relationship(attr):
+    return None
+  return attr.in_(list(_resolve_predicate_value(value)))
+
+
+def forbid_predicate(model, blacklist, _current_action, **_):
+  """SQL version of `forbid_condition`."""
+  if model.__name__ in blacklist.get(_current_action, ()):
+    return sqlalchemy.false()
+  return sqlalchemy.true()
+
+
+"""
+Functions that compile a condition into an SQL predicate on a model, with a
+signature
+
+..
+
+  func(model, **kwargs)
+
+They return None if the condition can only be checked on instances.
+"""
+_PREDICATES_MAP = {
+    'contains': contains_predicate,
+    'is': is_predicate,
+    'in': in_predicate,
+    'forbid': forbid_predicate,
+}
+
+
+def compile_condition(model, action, condition):
+  """Get an SQL predicate that holds for instances meeting the condition.
+
+  Returns:
+    sqlalchemy expression or None if the condition can not be compiled.
+  """
+  compiler = _PREDICATES_MAP.get(str(condition['condition']))
+  if compiler is None:
+    return None
+  try:
+    return compiler(model, _current_action=action,
+                    **condition.setdefault('terms', {}))
+  except (AttributeError, NotImplementedError, sa_exc.SQLAlchemyError):
+    return None
+
+
+def _instance_key(instance):
+  return type(instance), instance.id
+
+
+def _load_relationship_targets(instances, props):
+  """Load objects referenced by `<prop>_type` and `<prop>_id` of instances.
+
+  Returns:
+    dict of loaded objects by their (type, id).
+  """
+  target_ids = {}
+  for instance in instances:
+    for prop in props:
+      target_ids.setdefault(getattr(instance, prop + '_type'), set())\
+          .add(getattr(instance, prop + '_id'))
+  targets = {}
+  for target_type, ids in target_ids.iteritems():
+    target_model = get_model(target_type)
+    if target_model is None:
+      continue
+    for obj in target_model.query.filter(target_model.id.in_(ids)):
+      targets[target_type, obj.id] = obj
+  return targets
+
+
 class DefaultUserPermissions(UserPermissions):
   # super user, context_id 0 indicates all contexts
   ADMIN_PERMISSION = Permission(
@@ -169,10 +299,12 @@ class DefaultUserPermissions(UserPermissions):
             .get('contexts', []):
       return True
     return \
-        permission.resource_id in permissions\
-        .get(permission.action, {})\
-        .get(permission.resource_type, {})\
-        .get('resources', [])\
+        resource_ids.contains(
+            permissions
+            .get(permission.action, {})
+            .get(permission.resource_type, {})
+            .get('resources', []),
+            permission.resource_id)\
         or permission.context_id in \
         permissions\
         .get(permission.action, {})\
@@ -213,7 +345,13 @@ class DefaultUserPermissions(UserPermissions):
         return True
     return False
 
-  def _is_allowed_for(self, instance, action):
+  def _get_conditions_for(self, instance, action):
+    """Get the conditions on which the permission for an instance depends.
+
+    Returns:
+      True or False if the permission does not depend on any conditions,
+      otherwise the list of conditions of which at least one must hold.
+    """
     permissions = self._permissions()
     # Check for admin permission
     if self._permission_match(self.ADMIN_PERMISSION, permissions):
@@ -223,7 +361,7 @@ class DefaultUserPermissions(UserPermissions):
           .get(None, [])
       if not conditions:
         return True
-      return self._check_conditions(instance, action, conditions)
+      return conditions
     if (not permissions.get(action) or
        not permissions[action].get(instance._inflector.model_singular)):
       return False
@@ -241,7 +379,7 @@ class DefaultUserPermissions(UserPermissions):
     context_id = None
     if hasattr(instance, 'context') and hasattr(instance.context, 'id'):
       context_id = instance.context.id
-    if instance.id in resources:
+    if resource_ids.contains(resources, instance.id):
       return True
     no_context_conditions = self._permissions()\
         .setdefault(action, {})\
@@ -258,8 +396,115 @@ class DefaultUserPermissions(UserPermissions):
     # Check any conditions applied per resource
     if (None in contexts or context_id in contexts) and not conditions:
       return True
+    return conditions or False
+
+  def _is_allowed_for(self, instance, action):
+    conditions = self._get_conditions_for(instance, action)
+    if isinstance(conditions, bool):
+      return conditions
     return self._check_conditions(instance, action, conditions)
 
+  def filter_allowed_for(self, instances, action):
+    """Get the instances that the user is allowed to perform the action on.
+
+    Instances with conditional permissions are grouped by model and
+    conditions. Conditions of a group are compiled into SQL predicates and
+    checked with a single query, and targets of relationship conditions are
+    loaded with one query per type, so the number of queries does not grow
+    with the number of instances.
+    """
+    instances = list(instances)
+    if any(instance.id is None for instance in instances):
+      # Conditions of new objects can only be checked on the instances.
+      return [instance for instance in instances
+              if self._is_allowed_for(instance, action)]
+    allowed = set()
+    groups = OrderedDict()
+    for instance in instances:
+      conditions = self._get_conditions_for(instance, action)
+      if conditions is True:
+        allowed.add(_instance_key(instance))
+      elif conditions:
+        key = (type(instance), tuple(id(c) for c in conditions))
+        groups.setdefault(key, (conditions, []))[1].append(instance)
+    for (model, _), (conditions, group) in groups.iteritems():
+      allowed.update(
+          self._check_conditions_for_all(model, group, action, conditions))
+    return [instance for instance in instances
+            if _instance_key(instance) in allowed]
+
+  def _check_conditions_for_all(self, model, instances, action, conditions):
+    """Get keys of instances of a model for which any condition holds."""
+    allowed = set()
+    predicates = []
+    for condition in conditions:
+      pending = [i for i in instances if _instance_key(i) not in allowed]
+      if not pending:
+        return allowed
+      terms = condition.setdefault('terms', {})
+      if condition['condition'] == 'relationship':
+        allowed.update(self._check_relationships(pending, action, **terms))
+        continue
+      predicate = compile_condition(model, action, condition)
+      if predicate is not None:
+        predicates.append(predicate)
+        continue
+      func = _CONDITIONS_MAP[str(condition['condition'])]
+      allowed.update(_instance_key(i) for i in pending
+                     if func(i, _current_action=action, **terms))
+    pending_ids = [i.id for i in instances if _instance_key(i) not in allowed]
+    if predicates and pending_ids:
+      query = db.session.query(model.id).filter(
+          model.id.in_(pending_ids),
+          sqlalchemy.or_(*predicates),
+      )
+      allowed.update((model, id_) for id_, in query)
+    return allowed
+
+  def _check_relationships(self, instances, action, property_name, **_):
+    """Check `relationship` conditions of many instances at once.
+
+    This is `relationship_condition` with all related objects loaded and
+    checked together.
+    """
+    props = property_name.split(',')
+    if not all(hasattr(instances[0], prop + '_type') and
+               hasattr(instances[0], prop + '_id') for prop in props):
+      return set(_instance_key(i) for i in instances
+                 if relationship_condition(i, action, property_name))
+
+    targets = _load_relationship_targets(instances, props)
+    allowed_targets = self.filter_allowed_for(
+        [obj for obj in targets.itervalues() if not isinstance(obj, Person)],
+        action)
+    allowed_targets = set(_instance_key(obj) for obj in allowed_targets)
+
+    create_allowed = {}
+    allowed = set()
+    for instance in instances:
+      context_id = instance.context_id
+      for prop in props:
+        obj = targets.get((getattr(instance, prop + '_type'),
+                           getattr(instance, prop + '_id')))
+        if obj is None:
+          break
+        if context_id is not None and obj.context_id == context_id:
+          if context_id not in create_allowed:
+            create_allowed[context_id] = is_allowed_create(
+                'Relationship', None, context_id)
+          if create_allowed[context_id]:
+            allowed.add(_instance_key(instance))
+            break
+        # Mapping a person does not require a permission check on the Person
+        # object
+        if isinstance(obj, Person):
+          continue
+        if _instance_key(obj) not in allowed_targets:
+          break
+      else:
+        allowed.add(_instance_key(instance))
+    return allowed
+
   def is_allowed_create(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to create a resource of the specified
     type in the context."""
@@ -312,7 +557,11 @@ class DefaultUserPermissions(UserPermissions):
     #   superclasses
     resource_types = get_contributing_resource_types(resource_type)
 
-    ret = []
+    ret = grants.GrantList(
+        grants.RESOURCES,
+        [(action, type_) for type_ in resource_types],
+        permissions.get(grants.GENERATION_KEY),
+    )
     for resource_type in resource_types:
       ret.extend(
           permissions
@@ -333,7 +582,12 @@ class DefaultUserPermissions(UserPermissions):
     #   superclasses
     resource_types = get_contributing_resource_types(resource_type)
 
-    ret = []
+    ret = grants.GrantList(
+        grants.CONTEXTS,
+        [(action, type_) for type_ in resource_types] +
+        [(self.ADMIN_PERMISSION.action, self.ADMIN_PERMISSION.resource_type)],
+        permissions.get(grants.GENERATION_KEY),
+    )
     for resource_type in resource_types:
       ret.extend(permissions.get(action, {})
                             .get(resource_type, {})
@@ -0,0 +1,119 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Compact lists of resource ids in user permissions.
+
+Users in large programs get per object grants for hundreds of thousands of
+objects, mostly for the same ids under several actions. Resource ids are
+therefore kept as sorted lists without duplicates, and actions with the same
+grants for a type share a single list object.
+
+For memcache and for the client the lists are run-length encoded as
+`resource_ranges`: a flat list of `start, length` pairs. Ids of objects
+created together are mostly consecutive, so this is much smaller than the
+plain list.
+"""
+
+import bisect
+import collections
+import itertools
+
+RESOURCES = "resources"
+RESOURCE_RANGES = "resource_ranges"
+
+
+class ResourceGrants(object):
+  """Collector of per object grants.
+
+  Grants are grouped by the set of actions they allow, so that the resource
+  lists of actions with the same grants are only built once.
+  """
+
+  def __init__(self):
+    self._groups = collections.defaultdict(
+        lambda: collections.defaultdict(set))
+
+  def add(self, resource_type, resource_id, actions):
+    self._groups[resource_type][frozenset(actions)].add(resource_id)
+
+  def store(self, permissions):
+    """Set the resource lists of all collected grants in permissions."""
+    for resource_type, groups in self._groups.iteritems():
+      shared = {}
+      for action in set(itertools.chain.from_iterable(groups)):
+        key = frozenset(actions for actions in groups if action in actions)
+        if key not in shared:
+          shared[key] = sorted(set().union(*(groups[actions]
+                                             for actions in key)))
+        permissions.setdefault(action, {})\
+            .setdefault(resource_type, {})[RESOURCES] = shared[key]
+
+
+def contains(resource_ids, resource_id):
+  """Check if a sorted list of resource ids contains the given id."""
+  index = bisect.bisect_left(resource_ids, resource_id)
+  return index < len(resource_ids) and resource_ids[index] == resource_id
+
+
+def encode(resource_ids):
+  """Run-length encode a sorted list of resource ids."""
+  ranges = []
+  for resource_id in resource_ids:
+    if ranges and ranges[-2] + ranges[-1] == resource_id:
+      ranges[-1] += 1
+    else:
+      ranges.extend((resource_id, 1))
+  return ranges
+
+
+def decode(ranges):
+  """Get the sorted list of resource ids from its run-length encoding."""
+  resource_ids = []
+  for start, length in zip(ranges[::2], ranges[1::2]):
+    resource_ids.extend(xrange(start, start + length))
+  return resource_ids
+
+
+def _replace_resources(permissions, old_key, new_key, convert):
+  """Get permissions with all resource lists converted.
+
+  The action and type dicts holding resource lists are copied, the rest of
+  permissions is shared with the original. Lists that were shared stay
+  shared after the conversion.
+  """
+  converted = {}
+  result = {}
+  for action, types in permissions.iteritems():
+    if not isinstance(types, dict):
+      result[action] = types
+      continue
+    result[action] = {}
+    for resource_type, permission in types.iteritems():
+      if old_key in permission:
+        permission = dict(permission)
+        value = permission.pop(old_key)
+        if id(value) not in converted:
+          converted[id(value)] = convert(value)
+        permission[new_key] = converted[id(value)]
+      result[action][resource_type] = permission
+  return result
+
+
+def encode_permissions(permissions):
+  """Get permissions with resource lists replaced by resource ranges."""
+  return _replace_resources(permissions, RESOURCES, RESOURCE_RANGES, encode)
+
+
+def _sort_unique(resource_ids):
+  return sorted(set(resource_ids))
+
+
+def decode_permissions(permissions):
+  """Get permissions with resource ranges replaced by resource lists.
+
+  Permissions cached before resource lists were kept sorted hold plain
+  resource lists in any order, these are sorted and deduplicated.
+  """
+  permissions = _replace_resources(permissions, RESOURCES, RESOURCES,
+                                   _sort_unique)
+  return _replace_resources(permissions, RESOURCE_RANGES, RESOURCES, decode)
@@ -67,6 +67,15 @@ class UserPermissions(object):
     """All contexts in which the user has delete permission."""
     raise NotImplementedError()
 
+  def filter_allowed_for(self, instances, action):
+    """The instances that the user is allowed to perform the action on.
+
+    The default implementation checks instances one by one, providers can
+    override it to check many instances at once.
+    """
+    is_allowed_for = getattr(self, "is_allowed_{}_for".format(action))
+    return [instance for instance in instances if is_allowed_for(instance)]
+
 class BasicUserPermissions(UserPermissions):
   """Basic implementation of a UserPermissions object."""
 
@@ -84,9 +84,10 @@ def all_services():
 def init_extra_services(app):
   from ggrc.login import login_required
 
+  from ggrc.utils.replica import read_only
   from .search import search
   app.add_url_rule(
-      '/search', 'search', login_required(search))
+      '/search', 'search', login_required(read_only(search)))
 
   from .log_event import log_event
   app.add_url_rule(
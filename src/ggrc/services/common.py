@@ -30,7 +30,9 @@ import ggrc.builder.json
 import ggrc.models
 from flask.ext.sqlalchemy import Pagination
 from ggrc import db, utils
-from ggrc.utils import as_json, benchmark
+from ggrc.builder import stubs
+from ggrc.utils import as_json, benchmark, iter_json
+from ggrc.utils import replica
 from ggrc.fulltext import get_indexer
 from ggrc.fulltext.recordbuilder import fts_record_for
 from ggrc.login import get_current_user_id, get_current_user
@@ -39,13 +41,19 @@ from ggrc.models.event import Event
 from ggrc.models.revision import Revision
 from ggrc.models.exceptions import ValidationError, translate_message
 from ggrc.rbac import permissions, context_query_filter
+from ggrc.rbac.grants import in_grants
 from .attribute_query import AttributeQueryBuilder
 from ggrc.models.background_task import BackgroundTask, create_task
+from ggrc.models.background_task import uses_task_queue
 from ggrc import settings
 
 
 CACHE_EXPIRY_COLLECTION = 60
 
+# Attributes that filter_resource() reads from published objects.
+FILTER_RESOURCE_FIELDS = ("id", "type", "context", "source", "destination",
+                          "resource_type", "resource_id")
+
 
 def get_oauth_credentials():
   from flask import session
@@ -113,7 +121,19 @@ def get_related_keys_for_expiration(context, o):
   return keys
 
 
-def set_ids_for_new_custom_attributes(parent_obj):
+def _get_new_objects():
+  """Get objects created in the current request, flushed or not.
+
+  Objects that were autoflushed are no longer in session.new, but they are
+  still in the request cache.
+  """
+  cache = get_cache()
+  flushed = cache.new if cache is not None else ()
+  return set(db.session.new).union(flushed)
+
+
+def set_ids_for_new_custom_attributes(parent_obj, new_objects=None,
+                                      flush=True):
   """
   When we are creating custom attribute values and definitions for
   POST requests, parent object ID is not yet defined. This is why we update
@@ -121,6 +141,10 @@ def set_ids_for_new_custom_attributes(parent_obj):
 
   Args:
     parent_obj: parent object to be set as attributable
+    new_objects: objects created together with parent_obj. If not given, all
+      new objects in the session are used.
+    flush: flush the updated objects. Callers that update the objects of
+      many parents can flush once afterwards instead.
 
   Returns:
     None
@@ -128,7 +152,10 @@ def set_ids_for_new_custom_attributes(parent_obj):
   if not hasattr(parent_obj, "PER_OBJECT_CUSTOM_ATTRIBUTABLE"):
     return
 
-  modified_objects = get_modified_objects(db.session).new
+  if new_objects is None:
+    modified_objects = get_modified_objects(db.session).new
+  else:
+    modified_objects = new_objects
 
   object_attrs = {
       "CustomAttributeValue": "attributable_id",
@@ -147,7 +174,8 @@ def set_ids_for_new_custom_attributes(parent_obj):
     if hasattr(obj, '_skip_os_state_update'):
       obj.skip_os_state_update()
     db.session.add(obj)
-  db.session.flush()
+  if flush:
+    db.session.flush()
 
 
 def memcache_mark_for_deletion(context, objects_to_mark):
@@ -162,6 +190,8 @@ def memcache_mark_for_deletion(context, objects_to_mark):
     None
   """
   for o, _ in objects_to_mark:
+    context.cache_manager.marked_for_delete.append(
+        stubs.get_cache_key(o, o.id))
     cls = get_cache_class(o)
     if cls in context.cache_manager.supported_classes:
       key = get_cache_key(o)
@@ -487,7 +517,7 @@ class ModelView(View):
       resources = permissions.read_resources_for(self.model.__name__)
       filter_expr = context_query_filter(self.model.context_id, contexts)
       if resources:
-        filter_expr = or_(filter_expr, self.model.id.in_(resources))
+        filter_expr = or_(filter_expr, in_grants(self.model.id, resources))
       query = query.filter(filter_expr)
       for j in joinlist:
         j_class = j.property.mapper.class_
@@ -496,10 +526,11 @@ class ModelView(View):
         if j_contexts is not None:
           j_filter_expr = context_query_filter(j_class.context_id, j_contexts)
           if resources:
-            j_filter_expr = or_(j_filter_expr, self.model.id.in_(j_resources))
+            j_filter_expr = or_(j_filter_expr,
+                                in_grants(self.model.id, j_resources))
           query = query.filter(j_filter_expr)
         elif resources:
-          query = query.filter(self.model.id.in_(resources))
+          query = query.filter(in_grants(self.model.id, resources))
     if '__search' in request.args:
       terms = request.args['__search']
       types = self._get_matching_types(self.model)
@@ -726,10 +757,11 @@ class Resource(ModelView):
       with benchmark("dispatch_request > Try"):
         try:
           if method == 'GET':
-            if self.pk in kwargs and kwargs[self.pk] is not None:
-              return self.get(*args, **kwargs)
-            else:
-              return self.collection_get()
+            with replica.use_replica():
+              if self.pk in kwargs and kwargs[self.pk] is not None:
+                return self.get(*args, **kwargs)
+              else:
+                return self.collection_get()
           elif method == 'POST':
             if self.pk in kwargs and kwargs[self.pk] is not None:
               return self.post(*args, **kwargs)
@@ -890,7 +922,7 @@ class Resource(ModelView):
   def delete(self, id):
     if 'X-Appengine-Taskname' not in request.headers:
       task = create_task(request.method, request.full_path)
-      if getattr(settings, 'APP_ENGINE', False):
+      if uses_task_queue():
         return self.json_success_response(
             self.object_for_json(task, 'background_task'),
             self.modified_at(task))
@@ -972,7 +1004,14 @@ class Resource(ModelView):
     }
     return matches, collection_extras
 
-  def get_matched_resources(self, matches):
+  def get_matched_resources(self, matches, fields=None):
+    """Get representations of matched objects from cache or database.
+
+    Args:
+      matches: list of (id, type, context_id, updated_at) tuples.
+      fields: optional set of attribute names to publish for objects that are
+        not cached. Such partial representations are not added to the cache.
+    """
     cache_objs = {}
     if self.has_cache():
       self.request.cache_manager = _get_cache_manager()
@@ -984,8 +1023,8 @@ class Resource(ModelView):
 
     database_objs = {}
     if len(database_matches) > 0:
-      database_objs = self.get_resources_from_database(matches)
-      if self.has_cache():
+      database_objs = self.get_resources_from_database(matches, fields)
+      if self.has_cache() and fields is None:
         with benchmark("Add resources to cache"):
           self.add_resources_to_cache(database_objs)
     return cache_objs, database_objs
@@ -1017,15 +1056,11 @@ class Resource(ModelView):
     with benchmark("dispatch_request > collection_get > Matched resources"):
       cache_op = None
       if '__stubs_only' in request.args:
-        objs = [{
-            'id': m[0],
-            'type': m[1],
-            'href': utils.url_for(m[1], id=m[0]),
-            'context_id': m[2]
-        } for m in matches]
+        objs = [stubs.render(m[1], m[0], m[2]) for m in matches]
 
       else:
-        cache_objs, database_objs = self.get_matched_resources(matches)
+        cache_objs, database_objs = self.get_matched_resources(
+            matches, self.get_projected_fields())
         objs = {}
         objs.update(cache_objs)
         objs.update(database_objs)
@@ -1037,8 +1072,8 @@ class Resource(ModelView):
         cache_op = 'Hit' if len(cache_objs) > 0 else 'Miss'
     with benchmark("dispatch_request > collection_get > Create Response"):
       # Return custom fields specified via `__fields=id,title,description` etc.
-      # TODO this can be optimized by filter_resource() not retrieving
-      # the other fields to being with
+      # Objects published from the database only contain these fields and
+      # the ones needed by filter_resource(), cached objects are complete.
       if '__fields' in request.args:
         custom_fields = request.args['__fields'].split(',')
         objs = [{f: o[f] for f in custom_fields if f in o} for o in objs]
@@ -1053,7 +1088,8 @@ class Resource(ModelView):
 
       with benchmark("Make response"):
         return self.json_success_response(
-            collection, self.collection_last_modified(), cache_op=cache_op)
+            collection, self.collection_last_modified(), cache_op=cache_op,
+            stream=True)
 
   def get_resources_from_cache(self, matches):
     """Get resources from cache for specified matches"""
@@ -1207,9 +1243,29 @@ class Resource(ModelView):
       db.session.add(obj)
     return obj
 
+  @staticmethod
+  def _post_permission_key(obj):
+    """Get the key of objects that share the create permission check result.
+
+    Without permission conditions, the create permission for a new object
+    only depends on its type and context.
+
+    Returns:
+      tuple with the object type and context id or None if the permission
+      must be checked separately for the object.
+    """
+    if obj.id is not None or \
+       permissions.has_conditions("create", obj.__class__.__name__) or \
+       permissions.has_conditions("__GGRC_ADMIN__", "__GGRC_ALL__"):
+      return None
+    return obj.__class__, getattr(getattr(obj, "context", None), "id", None)
+
   def _check_post_permissions(self, objects):
     """Check create permissions for a list of objects.append
 
+    The permission is checked only once for objects with the same
+    _post_permission_key.
+
     Args:
       objects: List of objects.
 
@@ -1217,8 +1273,16 @@ class Resource(ModelView):
       Forbidden error if user does not have create permission for all objects
       in the objects list.
     """
+    checked = {}
     for obj in objects:
-      if not permissions.is_allowed_create_for(obj):
+      key = self._post_permission_key(obj)
+      if key is None or key not in checked:
+        allowed = permissions.is_allowed_create_for(obj)
+        if key is not None:
+          checked[key] = allowed
+      else:
+        allowed = checked[key]
+      if not allowed:
         # json_create sometimes adds objects to session, so we need to
         # make sure the session is cleared
         db.session.expunge_all()
@@ -1257,20 +1321,26 @@ class Resource(ModelView):
       running_async: Flag for async jobs.
     """
 
+    per_object_cas = hasattr(self.model, "PER_OBJECT_CUSTOM_ATTRIBUTABLE")
     with benchmark("Generate objects"):
       objects = []
       sources = []
+      new_custom_attributes = []
+      current_user = get_current_user()
       for wrapped_src in body:
         src = self._unwrap_collection_post_src(wrapped_src)
         obj = self._get_model_instance(src, body)
+        if per_object_cas:
+          pending_objects = _get_new_objects()
         with benchmark("Deserialize object"):
           self.json_create(obj, src)
         with benchmark("Send model POSTed event"):
           self.model_posted.send(obj.__class__, obj=obj, src=src, service=self)
-        with benchmark("Update custom attribute values"):
-          set_ids_for_new_custom_attributes(obj)
+        if per_object_cas:
+          new_custom_attributes.append(
+              (obj, list(_get_new_objects() - pending_objects)))
 
-        obj.modified_by = get_current_user()
+        obj.modified_by = current_user
         objects.append(obj)
         sources.append(src)
 
@@ -1281,6 +1351,11 @@ class Resource(ModelView):
                                   objects=objects, sources=sources)
     with benchmark("Flush posted objects"):
       db.session.flush()
+    with benchmark("Update custom attribute values"):
+      for parent_obj, new_objects in new_custom_attributes:
+        set_ids_for_new_custom_attributes(parent_obj, new_objects,
+                                          flush=False)
+      db.session.flush()
     with benchmark("Validate custom attributes"):
       for obj in objects:
         if hasattr(obj, "validate_custom_attributes"):
@@ -1329,7 +1404,7 @@ class Resource(ModelView):
         if 'X-Appengine-Taskname' not in request.headers:
           task = create_task(request.method, request.full_path,
                              None, request.data)
-          if getattr(settings, 'APP_ENGINE', False):
+          if uses_task_queue():
             return self.json_success_response(
                 self.object_for_json(task, 'background_task'),
                 self.modified_at(task))
@@ -1343,7 +1418,7 @@ class Resource(ModelView):
         no_result = True
       else:
         body = self.request.json
-        no_result = False
+        no_result = "__no_result" in request.args
       wrap = isinstance(body, dict)
       if wrap:
         body = [body]
@@ -1466,7 +1541,20 @@ class Resource(ModelView):
     paging_obj['total'] = paging.total
     return paging_obj
 
-  def get_resources_from_database(self, matches):
+  @staticmethod
+  def get_projected_fields():
+    """Get attributes to publish for the `__fields` request argument.
+
+    Returns:
+      set of requested attribute names together with the attributes needed for
+      permission filtering, or None if all attributes should be published.
+    """
+    if '__fields' not in request.args:
+      return None
+    fields = set(request.args['__fields'].split(','))
+    return fields.union(FILTER_RESOURCE_FIELDS)
+
+  def get_resources_from_database(self, matches, fields=None):
     # FIXME: This is cheating -- `matches` should be allowed to be any model
     model = self.model
     ids = {m[0]: m for m in matches}
@@ -1478,7 +1566,8 @@ class Resource(ModelView):
       resources = {}
       includes = self.get_properties_to_include(request.args.get('__include'))
       for obj in objs:
-        resources[ids[obj.id]] = ggrc.builder.json.publish(obj, includes)
+        resources[ids[obj.id]] = ggrc.builder.json.publish(
+            obj, includes, fields=fields)
     with benchmark("Publish representation"):
       ggrc.builder.json.publish_representation(resources)
     return resources
@@ -1518,7 +1607,12 @@ class Resource(ModelView):
     return format_date_time(time.mktime(timestamp.utctimetuple()))
 
   def json_success_response(self, response_object, last_modified,
-                            status=200, id=None, cache_op=None):
+                            status=200, id=None, cache_op=None, stream=False):
+    """Make a JSON response.
+
+    With stream set, the response object is encoded while the response is
+    sent, instead of building the whole body first.
+    """
     headers = [
         ('Last-Modified', self.http_timestamp(last_modified)),
         ('Etag', etag(response_object)),
@@ -1528,8 +1622,11 @@ class Resource(ModelView):
       headers.append(('Location', self.url_for(id=id)))
     if cache_op:
       headers.append(('X-GGRC-Cache', cache_op))
-    return current_app.make_response(
-        (self.as_json(response_object), status, headers))
+    if stream:
+      body = iter_json(response_object)
+    else:
+      body = self.as_json(response_object)
+    return current_app.make_response((body, status, headers))
 
   def getval(self, src, attr, *args):
     if args:
@@ -1548,7 +1645,27 @@ class ReadOnlyResource(Resource):
       raise NotImplementedError()
 
 
-def filter_resource(resource, depth=0, user_permissions=None):  # noqa
+def _get_readable_revision_objects(resources, user_permissions):
+  """Get (type, id) of objects of revisions that the user can read.
+
+  Objects of all revisions in the list are loaded with one query per type
+  and their permissions are checked together.
+  """
+  ids_by_type = defaultdict(set)
+  for resource in resources:
+    if isinstance(resource, dict) and resource.get('type') == "Revision":
+      ids_by_type[resource['resource_type']].add(resource['resource_id'])
+  readable = set()
+  for resource_type, ids in ids_by_type.iteritems():
+    res_model = getattr(ggrc.models.all_models, resource_type)
+    instances = res_model.query.filter(res_model.id.in_(ids))
+    readable.update((resource_type, instance.id) for instance in
+                    user_permissions.filter_allowed_for(instances, "read"))
+  return readable
+
+
+def filter_resource(resource, depth=0, user_permissions=None,  # noqa
+                    readable_revision_objects=None):
   """
   Returns:
      The subset of resources which are readable based on user_permissions
@@ -1558,10 +1675,14 @@ def filter_resource(resource, depth=0, user_permissions=None):  # noqa
     user_permissions = permissions.permissions_for(get_current_user())
 
   if isinstance(resource, (list, tuple)):
+    if _is_creator():
+      readable_revision_objects = _get_readable_revision_objects(
+          resource, user_permissions)
     filtered = []
     for sub_resource in resource:
       filtered_sub_resource = filter_resource(
-          sub_resource, depth=depth + 1, user_permissions=user_permissions)
+          sub_resource, depth=depth + 1, user_permissions=user_permissions,
+          readable_revision_objects=readable_revision_objects)
       if filtered_sub_resource is not None:
         filtered.append(filtered_sub_resource)
     return filtered
@@ -1604,10 +1725,11 @@ def filter_resource(resource, depth=0, user_permissions=None):  # noqa
         return None
     elif resource['type'] == "Revision" and _is_creator():
       # Make a check for revision objects that are a special case
-      res_model = getattr(ggrc.models.all_models, resource['resource_type'])
-      instance = res_model.query.get(resource['resource_id'])
-      if instance is None or\
-         not user_permissions.is_allowed_read_for(instance):
+      if readable_revision_objects is None:
+        readable_revision_objects = _get_readable_revision_objects(
+            [resource], user_permissions)
+      if (resource['resource_type'], resource['resource_id']) not in \
+         readable_revision_objects:
         return None
     else:
       if not user_permissions.is_allowed_read(resource['type'],
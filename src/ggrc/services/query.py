@@ -15,7 +15,8 @@ from ggrc.services.query_helper import QueryAPIQueryHelper
 from ggrc.login import login_required
 from ggrc.models.inflector import get_model
 from ggrc.services.common import etag
-from ggrc.utils import as_json
+from ggrc.utils import iter_json
+from ggrc.utils.replica import read_only
 
 
 def build_collection_representation(model, description):
@@ -47,7 +48,7 @@ def json_success_response(response_object, last_modified=None, status=200):
     headers.append(('Last-Modified', http_timestamp(last_modified)))
 
   return current_app.make_response(
-      (as_json(response_object), status, headers),
+      (iter_json(response_object), status, headers),
   )
 
 
@@ -92,6 +93,7 @@ def init_query_view(app):
   # pylint: disable=unused-variable
   @app.route('/query', methods=['POST'])
   @login_required
+  @read_only
   def query_objects():
     """Advanced object collection queries view."""
     try:
@@ -41,7 +41,7 @@ class QueryAPIQueryHelper(QueryHelper):
       list of dicts: same query as the input with requested results that match
                      the filter.
     """
-    for object_query in self.query:
+    for index, object_query in enumerate(self.query):
       query_type = object_query.get("type", "values")
       if query_type not in {"values", "ids", "count"}:
         raise NotImplementedError("Only 'values', 'ids' and 'count' queries "
@@ -56,13 +56,14 @@ class QueryAPIQueryHelper(QueryHelper):
       )
       object_query["count"] = len(objects)
       object_query["last_modified"] = self._get_last_modified(model, objects)
+      ids = self._set_result_ids(index, objects)
       if query_type == "values":
         object_query["values"] = self._transform_to_json(
             objects,
             object_query.get("fields"),
         )
       if query_type == "ids":
-        object_query["ids"] = [o.id for o in objects]
+        object_query["ids"] = ids
     return self.query
 
   @staticmethod
@@ -69,3 +69,56 @@ EMAIL_PENDING = JINJA2.get_template("notifications/view_pending_digest.html")
 USE_APP_ENGINE_ASSETS_SUBDOMAIN = False
 
 BACKGROUND_COLLECTION_POST_SLEEP = 0
+
+# Number of csv rows saved in a single commit during import
+IMPORT_CHUNK_SIZE = 500
+
+# Run background tasks outside of the web request when not on App Engine.
+# Queued tasks are picked up by workers started with `python -m
+# ggrc.task_runner`. The lease is the number of seconds a worker owns a task
+# without renewing it before it is handed to another worker. Running workers
+# renew their lease every third of that time.
+LOCAL_TASK_QUEUE = bool(os.environ.get('GGRC_LOCAL_TASK_QUEUE', ''))
+LOCAL_TASK_QUEUE_WORKERS = int(
+    os.environ.get('GGRC_LOCAL_TASK_QUEUE_WORKERS', '2'))
+LOCAL_TASK_QUEUE_LEASE = 600
+LOCAL_TASK_QUEUE_MAX_ATTEMPTS = 3
+LOCAL_TASK_QUEUE_POLL_INTERVAL = 1
+
+# Nightly cron jobs, see ggrc.cron. With a task queue, batched jobs continue
+# in a new background task after running for CRON_JOB_TIME_BUDGET seconds,
+# which should stay below LOCAL_TASK_QUEUE_LEASE. Failed jobs are started
+# again by later calls of the cron endpoint on the same day, up to
+# CRON_JOB_MAX_ATTEMPTS times.
+CRON_JOB_TIME_BUDGET = int(os.environ.get('GGRC_CRON_JOB_TIME_BUDGET', '300'))
+CRON_JOB_MAX_ATTEMPTS = 3
+
+# Collect benchmark spans, SQL and memcache statistics for sampled requests
+# and requests with the X-GGRC-Profile header, and return them in the
+# Server-Timing header. When PROFILE_REQUESTS_DIR is set, the traces are also
+# saved there as JSON files.
+PROFILE_REQUESTS = bool(os.environ.get('GGRC_PROFILE_REQUESTS', ''))
+PROFILE_REQUESTS_SAMPLE_RATE = float(
+    os.environ.get('GGRC_PROFILE_REQUESTS_SAMPLE_RATE', '0'))
+PROFILE_REQUESTS_DIR = os.environ.get('GGRC_PROFILE_REQUESTS_DIR', '')
+
+# Library used for encoding JSON responses, one of the names in
+# ggrc.utils.encoders.ENCODERS. "simplejson" is much faster when installed
+# with its C speedups.
+JSON_ENCODER = os.environ.get('GGRC_JSON_ENCODER', 'json')
+
+# Permission filters with more ids than this are not sent as IN lists. The
+# granted ids of such users are stored when their permissions change and
+# queries use a semi-join against them, see ggrc.rbac.grants.
+PERMISSION_GRANTS_TABLE_THRESHOLD = int(
+    os.environ.get('GGRC_PERMISSION_GRANTS_TABLE_THRESHOLD', '1000'))
+
+# Log the durations of application setup steps, see ggrc.utils.startup.
+PROFILE_STARTUP = bool(os.environ.get('GGRC_PROFILE_STARTUP', ''))
+
+# Optional read replica. Read only views are served from it while its
+# replication lag is at most REPLICA_MAX_LAG seconds, see
+# ggrc.utils.replica.
+SQLALCHEMY_REPLICA_DATABASE_URI = os.environ.get(
+    'GGRC_REPLICA_DATABASE_URI', '')
+REPLICA_MAX_LAG = int(os.environ.get('GGRC_REPLICA_MAX_LAG', '10'))
@@ -0,0 +1,215 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Local background task runner.
+
+With LOCAL_TASK_QUEUE enabled, `create_task` stores the request that runs a
+task in the background_tasks table instead of executing it inside the web
+request. This module is the other half of that queue: a pool of worker
+processes that claim queued tasks and replay their requests against the app,
+the same way the App Engine task queue calls the task URL.
+
+A worker claims a task by taking a lease on it and renews the lease while the
+task runs. If the worker dies, the lease expires and another worker retries
+the task, until LOCAL_TASK_QUEUE_MAX_ATTEMPTS is reached and the task is
+marked as failed.
+
+Usage:
+  python -m ggrc.task_runner
+"""
+
+import contextlib
+import datetime
+import multiprocessing
+import threading
+import time
+import urllib
+
+from sqlalchemy import and_
+from sqlalchemy import or_
+from sqlalchemy import select
+
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.models.background_task import BackgroundTask
+
+
+FINAL_STATES = ("Success", "Failure")
+
+
+def _queued_tasks_filter(now):
+  """Get a filter for queued tasks that are not finished yet."""
+  table = BackgroundTask.__table__
+  return and_(
+      table.c.queued_request.isnot(None),
+      table.c.status.notin_(FINAL_STATES),
+      or_(table.c.lease_expires_at.is_(None),
+          table.c.lease_expires_at < now),
+  )
+
+
+def fail_exhausted_tasks():
+  """Mark tasks that have used up all their attempts as failed."""
+  table = BackgroundTask.__table__
+  now = datetime.datetime.utcnow()
+  db.engine.execute(table.update().where(and_(
+      _queued_tasks_filter(now),
+      table.c.attempts >= settings.LOCAL_TASK_QUEUE_MAX_ATTEMPTS,
+  )).values(
+      status="Failure",
+      result={
+          "content": "Task exceeded the maximum number of attempts",
+          "status_code": 200,
+          "headers": [("Content-Type", "text/html")],
+      },
+  ))
+
+
+def claim_task():
+  """Take a lease on the oldest available queued task.
+
+  The lease is taken with a conditional update, so that only one of the
+  workers racing for the same task gets it.
+
+  Returns:
+    id of the claimed task or None if there are no tasks to run.
+  """
+  table = BackgroundTask.__table__
+  now = datetime.datetime.utcnow()
+  lease_expires_at = now + datetime.timedelta(
+      seconds=settings.LOCAL_TASK_QUEUE_LEASE)
+  candidates = select([table.c.id]).where(and_(
+      _queued_tasks_filter(now),
+      table.c.attempts < settings.LOCAL_TASK_QUEUE_MAX_ATTEMPTS,
+  )).order_by(table.c.id).limit(10)
+  for (task_id,) in db.engine.execute(candidates).fetchall():
+    claimed = db.engine.execute(table.update().where(and_(
+        table.c.id == task_id,
+        _queued_tasks_filter(now),
+    )).values(
+        lease_expires_at=lease_expires_at,
+        attempts=table.c.attempts + 1,
+    ))
+    if claimed.rowcount == 1:
+      return task_id
+  return None
+
+
+def release_task(task_id):
+  """Drop the lease on a task so that it can be retried right away."""
+  table = BackgroundTask.__table__
+  db.engine.execute(table.update().where(table.c.id == task_id).values(
+      lease_expires_at=None,
+  ))
+
+
+def extend_lease(engine, task_id):
+  """Renew the lease on a claimed task."""
+  table = BackgroundTask.__table__
+  engine.execute(table.update().where(and_(
+      table.c.id == task_id,
+      table.c.lease_expires_at.isnot(None),
+  )).values(
+      lease_expires_at=datetime.datetime.utcnow() + datetime.timedelta(
+          seconds=settings.LOCAL_TASK_QUEUE_LEASE),
+  ))
+
+
+@contextlib.contextmanager
+def keep_lease(task_id):
+  """Renew the lease on a task from a separate thread within this block.
+
+  Tasks such as imports and nightly jobs can run longer than the lease, and
+  must not be claimed again by another worker while they run.
+  """
+  # The thread has no application context, so it gets the engine.
+  engine = db.engine
+  stopped = threading.Event()
+
+  def renew():
+    while not stopped.wait(settings.LOCAL_TASK_QUEUE_LEASE / 3.0):
+      extend_lease(engine, task_id)
+
+  thread = threading.Thread(target=renew)
+  thread.daemon = True
+  thread.start()
+  try:
+    yield
+  finally:
+    stopped.set()
+    thread.join()
+
+
+def run_task(task_id):
+  """Replay the request of a claimed task.
+
+  Tasks whose request ended with a server error are released for a retry.
+  Tasks whose handler did not record a result are marked as failed.
+  """
+  task = BackgroundTask.query.get(task_id)
+  queued_request = task.queued_request
+  url = queued_request["url"]
+  url += ("&" if "?" in url else "?") + urllib.urlencode({"task_id": task_id})
+  db.session.remove()
+
+  client = app.test_client()
+  user_id = queued_request.get("user_id")
+  if user_id is not None:
+    # The same session keys as flask_login.login_user
+    with client.session_transaction() as session:
+      session["user_id"] = user_id
+      session["_fresh"] = True
+  try:
+    with keep_lease(task_id):
+      response = client.open(
+          url,
+          method=queued_request["method"],
+          headers=queued_request["headers"],
+      )
+  except Exception:  # pylint: disable=broad-except
+    app.logger.error("Background task %s failed", task_id, exc_info=True)
+    release_task(task_id)
+    return
+
+  db.session.remove()
+  task = BackgroundTask.query.get(task_id)
+  if task.status in FINAL_STATES:
+    return
+  if response.status_code >= 500:
+    app.logger.warning("Background task %s will be retried, status %s",
+                       task_id, response.status_code)
+    release_task(task_id)
+  else:
+    task.finish("Failure", response.data)
+
+
+def work():
+  """Run queued tasks until the process is stopped."""
+  # Connections must not be shared with the parent process.
+  db.engine.dispose()
+  with app.app_context():
+    while True:
+      fail_exhausted_tasks()
+      task_id = claim_task()
+      if task_id is None:
+        time.sleep(settings.LOCAL_TASK_QUEUE_POLL_INTERVAL)
+        continue
+      try:
+        run_task(task_id)
+      finally:
+        db.session.remove()
+
+
+def main():
+  """Start the worker pool and wait for the workers to finish."""
+  workers = [multiprocessing.Process(target=work)
+             for _ in range(settings.LOCAL_TASK_QUEUE_WORKERS)]
+  for worker in workers:
+    worker.start()
+  for worker in workers:
+    worker.join()
+
+
+if __name__ == "__main__":
+  main()
@@ -2,7 +2,6 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 import datetime
-import json
 import re
 import sqlalchemy
 import sys
@@ -10,33 +9,17 @@ import sys
 from flask import request
 from ggrc.settings import CUSTOM_URL_ROOT
 from ggrc.utils import benchmarks
+from ggrc.utils import encoders
+from ggrc.utils.encoders import GrcEncoder  # noqa
 
 
-class GrcEncoder(json.JSONEncoder):
-
-  """Custom JSON Encoder to handle datetime objects and sets
-
-  from:
-     `http://stackoverflow.com/questions/12122007/python-json-encoder-to-support-datetime`_
-  also consider:
-     `http://hg.tryton.org/2.4/trytond/file/ade5432ac476/trytond/protocols/jsonrpc.py#l53`_
-  """
-
-  def default(self, obj):
-    if isinstance(obj, datetime.datetime):
-      return obj.isoformat()
-    elif isinstance(obj, datetime.date):
-      return obj.isoformat()
-    elif isinstance(obj, datetime.timedelta):
-      return (datetime.datetime.min + obj).time().isoformat()
-    elif isinstance(obj, set):
-      return list(obj)
-    else:
-      return super(GrcEncoder, self).default(obj)
+def as_json(obj, **kwargs):
+  return encoders.get_encoder().dumps(obj, **kwargs)
 
 
-def as_json(obj, **kwargs):
-  return json.dumps(obj, cls=GrcEncoder, **kwargs)
+def iter_json(obj):
+  """Encode obj to JSON in chunks, for streaming it into a response."""
+  return encoders.get_encoder().iterencode(obj)
 
 
 def service_for(obj):
@@ -122,7 +105,21 @@ def get_url_root():
   return request.url_root
 
 
+_mapping_rules = None
+
+
 def get_mapping_rules():
+  """Get mapping rules, they are only built on the first call.
+
+  The returned dict is shared and must not be modified.
+  """
+  global _mapping_rules  # pylint: disable=global-statement
+  if _mapping_rules is None:
+    _mapping_rules = _build_mapping_rules()
+  return _mapping_rules
+
+
+def _build_mapping_rules():
   """ Get mappings rules as defined in business_object.js
 
   Special cases:
@@ -4,13 +4,16 @@
 """Benchmark context managers."""
 
 import os
-import inspect
 import logging
+import sys
 import time
 from collections import defaultdict
 
 from flask import current_app
 
+from ggrc import settings
+from ggrc.utils import profiling
+
 
 class BenchmarkContextManager(object):
   """Default benchmark context manager.
@@ -34,6 +37,30 @@ class BenchmarkContextManager(object):
     current_app.logger.info("{:.4f} {}".format(end - self.start, self.message))
 
 
+class ProfilingBenchmark(BenchmarkContextManager):
+  """Benchmark context manager that records spans for request profiling.
+
+  Outside of profiled requests this behaves as the default benchmark context
+  manager. See ggrc.utils.profiling.
+  """
+  # pylint: disable=too-few-public-methods
+
+  def __init__(self, message, **kwargs):
+    super(ProfilingBenchmark, self).__init__(message, **kwargs)
+    self.profile = None
+
+  def __enter__(self):
+    self.profile = profiling.get_profile()
+    if self.profile is not None:
+      self.profile.push(self.message)
+    super(ProfilingBenchmark, self).__enter__()
+
+  def __exit__(self, exc_type, exc_value, exc_trace):
+    super(ProfilingBenchmark, self).__exit__(exc_type, exc_value, exc_trace)
+    if self.profile is not None:
+      self.profile.pop()
+
+
 class WithNop(object):
   """Nop benchmark context manager.
 
@@ -65,8 +92,8 @@ class DebugBenchmark(object):
 
   Note that this benchmark is useful inside for loops with quiet set to True.
   The benchmark itself has some overhead. It's about 10 times slower than
-  simple addition with func_name given. If func name is not given the it will
-  run about 200 times slower than simple addition.
+  simple addition with func_name given, and somewhat slower if func name has
+  to be looked up from the calling frame.
 
   For more precise measurements uncomment the c profiler in ggrc.__main__.
   """
@@ -109,9 +136,8 @@ class DebugBenchmark(object):
     self.form = form
     self.start = 0
     if func_name is None and self._summary in {"all", "last"}:
-      curframe = inspect.currentframe()
-      calframe = inspect.getouterframes(curframe, 0)
-      func_name = calframe[1][3]
+      # pylint: disable=protected-access
+      func_name = sys._getframe(1).f_code.co_name
     self.func_name = func_name
 
   def __enter__(self):
@@ -210,5 +236,7 @@ def get_benchmark():
     logging.basicConfig(format="%(message)s", level=logging.DEBUG)
     DebugBenchmark.set_summary(benchmark)
     return DebugBenchmark
+  elif getattr(settings, "PROFILE_REQUESTS", False):
+    return ProfilingBenchmark
   else:
     return BenchmarkContextManager
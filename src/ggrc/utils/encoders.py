@@ -0,0 +1,154 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""JSON encoders for API responses.
+
+The JSON_ENCODER setting selects the library used by `as_json` and
+`iter_json`:
+
+  json: the standard library encoder.
+  simplejson: simplejson, an optional dependency that is much faster when its
+    C speedups are compiled.
+
+`iter_json` encodes large lists in pages with the one shot encoder, which
+uses the C speedups, and yields one chunk per page. The incremental
+`iterencode` of both libraries is pure Python and yields tiny chunks.
+
+Both encoders call back into Python for every value that JSON does not
+support. Published objects therefore contain datetimes already converted to
+strings, see `publish_value`.
+"""
+
+import datetime
+import importlib
+import json
+
+from ggrc import settings
+
+
+def default(obj):
+  """Convert values that JSON does not support.
+
+  Raises:
+    TypeError if the value can not be converted.
+  """
+  if isinstance(obj, (datetime.datetime, datetime.date)):
+    return obj.isoformat()
+  elif isinstance(obj, datetime.timedelta):
+    return (datetime.datetime.min + obj).time().isoformat()
+  elif isinstance(obj, set):
+    return list(obj)
+  raise TypeError("{!r} is not JSON serializable".format(obj))
+
+
+def publish_value(value):
+  """Convert a published attribute value to its JSON representation.
+
+  Only datetimes are converted, the other values are kept so that JSON
+  attributes can still be modified after publishing.
+  """
+  if isinstance(value, (datetime.datetime, datetime.date)):
+    return value.isoformat()
+  return value
+
+
+# Number of list items encoded into a single chunk by `iter_chunks`.
+CHUNK_ITEMS = 100
+
+
+def iter_chunks(encoder, obj):
+  """Encode obj in chunks with the one shot encode method of an encoder.
+
+  Dicts with string keys are split into their values and lists longer than
+  CHUNK_ITEMS into pages of items, everything else is encoded at once. The
+  joined chunks are the same as the encoded obj.
+  """
+  encode = encoder.encode
+  if isinstance(obj, dict) and all(isinstance(key, basestring)
+                                   for key in obj):
+    separator = "{"
+    for key, value in obj.iteritems():
+      yield separator + encode(key) + encoder.key_separator
+      for chunk in iter_chunks(encoder, value):
+        yield chunk
+      separator = encoder.item_separator
+    yield "}" if obj else "{}"
+  elif isinstance(obj, (list, tuple)) and len(obj) > CHUNK_ITEMS:
+    separator = "["
+    for i in range(0, len(obj), CHUNK_ITEMS):
+      # Strip the brackets of the encoded page.
+      yield separator + encode(list(obj[i:i + CHUNK_ITEMS]))[1:-1]
+      separator = encoder.item_separator
+    yield "]"
+  else:
+    yield encode(obj)
+
+
+class GrcEncoder(json.JSONEncoder):
+
+  """Custom JSON Encoder to handle datetime objects and sets
+
+  from:
+     `http://stackoverflow.com/questions/12122007/python-json-encoder-to-support-datetime`_
+  also consider:
+     `http://hg.tryton.org/2.4/trytond/file/ade5432ac476/trytond/protocols/jsonrpc.py#l53`_
+  """
+
+  def default(self, obj):  # pylint: disable=method-hidden
+    try:
+      return default(obj)
+    except TypeError:
+      return super(GrcEncoder, self).default(obj)
+
+
+class StdlibEncoder(object):
+  """Encoder using the json module of the standard library."""
+
+  def __init__(self):
+    self._encoder = GrcEncoder()
+
+  def dumps(self, obj, **kwargs):
+    if kwargs:
+      return json.dumps(obj, cls=GrcEncoder, **kwargs)
+    return self._encoder.encode(obj)
+
+  def iterencode(self, obj):
+    return iter_chunks(self._encoder, obj)
+
+
+class SimplejsonEncoder(object):
+  """Encoder using simplejson."""
+
+  def __init__(self):
+    self._simplejson = importlib.import_module("simplejson")
+    # Encode namedtuples as lists, the same way the json module does.
+    self._options = {
+        "default": default,
+        "namedtuple_as_object": False,
+    }
+    self._encoder = self._simplejson.JSONEncoder(**self._options)
+
+  def dumps(self, obj, **kwargs):
+    if kwargs:
+      options = dict(self._options, **kwargs)
+      return self._simplejson.dumps(obj, **options)
+    return self._encoder.encode(obj)
+
+  def iterencode(self, obj):
+    return iter_chunks(self._encoder, obj)
+
+
+ENCODERS = {
+    "json": StdlibEncoder,
+    "simplejson": SimplejsonEncoder,
+}
+
+_encoders = {}
+
+
+def get_encoder(name=None):
+  """Get the encoder with the given name or the configured encoder."""
+  name = name or settings.JSON_ENCODER
+  if name not in _encoders:
+    _encoders[name] = ENCODERS[name]()
+  return _encoders[name]
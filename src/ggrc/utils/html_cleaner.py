@@ -3,10 +3,13 @@
 
 """Provides an HTML cleaner function with sqalchemy compatible API"""
 
+import re
 from HTMLParser import HTMLParser
 
 import bleach
 
+from ggrc.utils.structures import LRUCache
+
 
 # Set up custom tags/attributes for bleach
 BLEACH_TAGS = [
@@ -28,29 +31,85 @@ for tag in BLEACH_TAGS:
   BLEACH_ATTRS[tag] = ATTRS
 
 
-def cleaner(dummy, value, *_):
-  """Cleans out unsafe HTML tags.
+# Number of recently cleaned values that are remembered.
+CACHE_SIZE = 1000
+
+# Values without these characters are not changed by cleaning. Carriage
+# returns, null characters and lone surrogates are normalized by the html
+# parser, any surrogates are matched to be safe on narrow Python builds.
+UNSAFE_CHARACTERS = re.compile(u"[<&\r\x00\ud800-\udfff]")
+
+_clean_values = LRUCache(CACHE_SIZE)
 
-  Uses bleach and unescape until it reaches a fix point.
+
+def clean(value):
+  """Clean out unsafe HTML tags from a string.
+
+  Uses bleach and unescape until it reaches a fix point. Values without any
+  markup are returned right away and recently cleaned values are looked up
+  in a cache, so that assigning the same text again is cheap.
 
   Args:
-    dummy: unused, sqalchemy will pass in the model class
     value: html (string) to be cleaned
   Returns:
     Html (string) without unsafe tags.
   """
-  # Some cases like Request don't use the title value
-  #  and it's nullable, so check for that
-  if value is None:
+  value = unicode(value)
+  if not UNSAFE_CHARACTERS.search(value):
     return value
+  cleaned = _clean_values.get(value)
+  if cleaned is not None:
+    return cleaned
 
   parser = HTMLParser()
-  value = unicode(value)
+  cleaned = value
   while True:
-    lastvalue = value
-    value = parser.unescape(
-        bleach.clean(value, BLEACH_TAGS, BLEACH_ATTRS, strip=True)
+    lastvalue = cleaned
+    cleaned = parser.unescape(
+        bleach.clean(cleaned, BLEACH_TAGS, BLEACH_ATTRS, strip=True)
     )
-    if value == lastvalue:
+    if cleaned == lastvalue:
       break
-  return value
+  _clean_values[value] = cleaned
+  if cleaned != value and UNSAFE_CHARACTERS.search(cleaned):
+    # Cleaning does not change clean values, setting them again is a hit.
+    _clean_values[cleaned] = cleaned
+  return cleaned
+
+
+def clean_all(values):
+  """Clean a batch of values, such as a whole column of an import.
+
+  Every distinct value is only cleaned once.
+
+  Args:
+    values: iterable of html strings, None values are kept.
+  Returns:
+    list of cleaned values in the same order.
+  """
+  cleaned = {}
+  result = []
+  for value in values:
+    if value is None:
+      result.append(None)
+      continue
+    if value not in cleaned:
+      cleaned[value] = clean(value)
+    result.append(cleaned[value])
+  return result
+
+
+def cleaner(dummy, value, *_):
+  """Cleans out unsafe HTML tags.
+
+  Args:
+    dummy: unused, sqalchemy will pass in the model class
+    value: html (string) to be cleaned
+  Returns:
+    Html (string) without unsafe tags.
+  """
+  # Some cases like Request don't use the title value
+  #  and it's nullable, so check for that
+  if value is None:
+    return value
+  return clean(value)
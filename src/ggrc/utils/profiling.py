@@ -0,0 +1,226 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Request scoped profiling.
+
+With PROFILE_REQUESTS enabled, sampled requests and requests with the
+X-GGRC-Profile header collect a tree of spans, one for each `benchmark()`
+block entered during the request. Every span counts the SQL statements and
+memcache calls made directly inside it, together with the time spent in SQL.
+
+The profile is returned in a Server-Timing header and, if
+PROFILE_REQUESTS_DIR is set, saved there as a JSON trace for offline
+analysis.
+
+When PROFILE_REQUESTS is disabled none of the hooks are installed, so normal
+requests do not pay for any of this.
+"""
+
+import json
+import os
+import random
+import time
+import uuid
+
+import sqlalchemy
+from flask import g
+from flask import has_request_context
+from flask import request
+
+from ggrc import settings
+
+PROFILE_HEADER = "X-GGRC-Profile"
+
+# Number of the slowest spans listed in the Server-Timing header.
+SERVER_TIMING_SPANS = 10
+
+
+class Span(object):
+  """Timing data of a single benchmark block."""
+  # pylint: disable=too-few-public-methods
+
+  __slots__ = ("name", "start", "duration", "sql_count", "sql_time",
+               "memcache_count", "children")
+
+  def __init__(self, name):
+    self.name = name
+    self.start = time.time()
+    self.duration = 0
+    self.sql_count = 0
+    self.sql_time = 0
+    self.memcache_count = 0
+    self.children = []
+
+  def finish(self):
+    self.duration = time.time() - self.start
+
+  def totals(self):
+    """Get sql count, sql time and memcache count including all children."""
+    sql_count, sql_time, memcache_count = (
+        self.sql_count, self.sql_time, self.memcache_count)
+    for child in self.children:
+      child_totals = child.totals()
+      sql_count += child_totals[0]
+      sql_time += child_totals[1]
+      memcache_count += child_totals[2]
+    return sql_count, sql_time, memcache_count
+
+  def walk(self):
+    """Iterate over this span and all its descendants."""
+    yield self
+    for child in self.children:
+      for span in child.walk():
+        yield span
+
+  def as_dict(self):
+    return {
+        "name": self.name,
+        "duration": self.duration,
+        "sql_count": self.sql_count,
+        "sql_time": self.sql_time,
+        "memcache_count": self.memcache_count,
+        "children": [child.as_dict() for child in self.children],
+    }
+
+
+class RequestProfile(object):
+  """Span tree of a single request."""
+
+  def __init__(self, name):
+    self.root = Span(name)
+    self._stack = [self.root]
+
+  @property
+  def current(self):
+    return self._stack[-1]
+
+  def push(self, name):
+    span = Span(name)
+    self.current.children.append(span)
+    self._stack.append(span)
+    return span
+
+  def pop(self):
+    self._stack.pop().finish()
+
+  def finish(self):
+    while len(self._stack) > 1:
+      self.pop()
+    self.root.finish()
+
+  def server_timing(self):
+    """Get the value of the Server-Timing header for this profile."""
+    sql_count, sql_time, memcache_count = self.root.totals()
+    metrics = [
+        'total;dur={:.1f}'.format(self.root.duration * 1000),
+        'sql;dur={:.1f};desc="{} queries"'.format(sql_time * 1000, sql_count),
+        'memcache;desc="{} calls"'.format(memcache_count),
+    ]
+    spans = sorted(self.root.walk(), key=lambda span: span.duration,
+                   reverse=True)[1:SERVER_TIMING_SPANS + 1]
+    for i, span in enumerate(spans):
+      metrics.append('span{};dur={:.1f};desc="{}"'.format(
+          i, span.duration * 1000, span.name.replace('"', "'")))
+    return ", ".join(metrics)
+
+  def as_dict(self):
+    return self.root.as_dict()
+
+
+def get_profile():
+  """Get the profile of the current request or None if not profiled."""
+  if not has_request_context():
+    return None
+  return getattr(g, "request_profile", None)
+
+
+def _should_profile():
+  return (PROFILE_HEADER in request.headers or
+          random.random() < settings.PROFILE_REQUESTS_SAMPLE_RATE)
+
+
+def start_request():
+  """Start profiling the current request if it is sampled."""
+  if _should_profile():
+    g.request_profile = RequestProfile(
+        "{} {}".format(request.method, request.full_path))
+
+
+def finish_request(response):
+  """Add the Server-Timing header and save the trace of a profiled request."""
+  profile = get_profile()
+  if profile is None:
+    return response
+  profile.finish()
+  g.request_profile = None
+  response.headers["Server-Timing"] = profile.server_timing()
+  if settings.PROFILE_REQUESTS_DIR:
+    save_trace(profile, response.status_code)
+  return response
+
+
+def save_trace(profile, status_code):
+  """Write the profile as a JSON file into PROFILE_REQUESTS_DIR."""
+  trace = profile.as_dict()
+  trace["status_code"] = status_code
+  trace["timestamp"] = profile.root.start
+  filename = "{:.0f}-{}.json".format(profile.root.start * 1000,
+                                     uuid.uuid4().hex)
+  with open(os.path.join(settings.PROFILE_REQUESTS_DIR, filename), "w") as f:
+    json.dump(trace, f)
+
+
+def _before_cursor_execute(conn, *_):
+  conn.info.setdefault("profiling_start", []).append(time.time())
+
+
+def _after_cursor_execute(conn, *_):
+  start = conn.info["profiling_start"].pop()
+  profile = get_profile()
+  if profile is not None:
+    span = profile.current
+    span.sql_count += 1
+    span.sql_time += time.time() - start
+
+
+def count_memcache_call():
+  profile = get_profile()
+  if profile is not None:
+    profile.current.memcache_count += 1
+
+
+class MemcacheClientProxy(object):
+  """Memcache client wrapper that counts calls for the request profile."""
+  # pylint: disable=too-few-public-methods
+
+  def __init__(self, client):
+    self._client = client
+
+  def __getattr__(self, name):
+    attr = getattr(self._client, name)
+    if not callable(attr):
+      return attr
+
+    def counted(*args, **kwargs):
+      count_memcache_call()
+      return attr(*args, **kwargs)
+    return counted
+
+
+def wrap_memcache_client(client):
+  """Wrap a memcache client for counting if profiling is enabled."""
+  if settings.PROFILE_REQUESTS:
+    return MemcacheClientProxy(client)
+  return client
+
+
+def init_app(app):
+  """Install the profiling hooks if profiling is enabled."""
+  if not settings.PROFILE_REQUESTS:
+    return
+  sqlalchemy.event.listen(sqlalchemy.engine.Engine, "before_cursor_execute",
+                          _before_cursor_execute)
+  sqlalchemy.event.listen(sqlalchemy.engine.Engine, "after_cursor_execute",
+                          _after_cursor_execute)
+  app.before_request(start_request)
+  app.after_request(finish_request)
@@ -0,0 +1,151 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Routing of read only requests to a database replica.
+
+With SQLALCHEMY_REPLICA_DATABASE_URI set, code running inside `use_replica()`
+(or a function decorated with `read_only`) reads from the replica instead of
+the primary database. Everything else keeps using the primary.
+
+A session is pinned to the primary as soon as it has pending changes or has
+flushed anything, so a request never reads its own writes from a replica
+that has not caught up yet. The replica is also skipped while its lag is
+above REPLICA_MAX_LAG seconds.
+
+Replicas are configured as the `replica` Flask-SQLAlchemy bind, so any two
+database urls work, including two SQLite files for local testing.
+"""
+
+import contextlib
+import functools
+import logging
+import threading
+import time
+
+from flask import g
+from flask import has_app_context
+from flask.ext.sqlalchemy import SQLAlchemy
+from flask.ext.sqlalchemy import _SignallingSession
+from sqlalchemy import event
+from sqlalchemy import orm
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = "replica"
+
+# Seconds for which a measured replica lag is reused.
+LAG_CHECK_INTERVAL = 5
+
+# Key in session.info that marks sessions pinned to the primary.
+PINNED = "pinned_to_primary"
+
+
+class RoutingSession(_SignallingSession):
+  """Session that reads from the replica when it is safe to do so."""
+
+  def __init__(self, db, *args, **kwargs):
+    self._db = db
+    super(RoutingSession, self).__init__(db, *args, **kwargs)
+
+  def _use_replica(self):
+    if not has_app_context() or not getattr(g, "use_replica", False):
+      return False
+    if self.info.get(PINNED) or self.new or self.dirty or self.deleted:
+      return False
+    return self._db.replica_available(self.app)
+
+  def get_bind(self, mapper=None, clause=None):
+    if self._use_replica():
+      return self._db.get_engine(self.app, REPLICA_BIND)
+    return super(RoutingSession, self).get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+  """Flask-SQLAlchemy with an optional read replica."""
+
+  def __init__(self, *args, **kwargs):
+    self._lag_lock = threading.Lock()
+    self._lag_checked_at = 0
+    self._replica_lag = None
+    super(RoutingSQLAlchemy, self).__init__(*args, **kwargs)
+
+  def create_scoped_session(self, options=None):
+    options = dict(options or {})
+    scopefunc = options.pop("scopefunc", None)
+    return orm.scoped_session(
+        functools.partial(RoutingSession, self, **options),
+        scopefunc=scopefunc)
+
+  def init_app(self, app):
+    replica_uri = app.config.get("SQLALCHEMY_REPLICA_DATABASE_URI")
+    if replica_uri:
+      binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+      binds[REPLICA_BIND] = replica_uri
+      app.config["SQLALCHEMY_BINDS"] = binds
+    super(RoutingSQLAlchemy, self).init_app(app)
+
+  @staticmethod
+  def replica_configured(app):
+    return REPLICA_BIND in (app.config.get("SQLALCHEMY_BINDS") or {})
+
+  def get_replica_lag(self, app):
+    """Get the replication lag in seconds.
+
+    Returns:
+      lag of the replica, 0 for replicas that do not report any lag, or None
+      if the replica is not configured or replication is broken.
+    """
+    if not self.replica_configured(app):
+      return None
+    with self._lag_lock:
+      if time.time() - self._lag_checked_at > LAG_CHECK_INTERVAL:
+        self._replica_lag = self._measure_lag(
+            self.get_engine(app, REPLICA_BIND))
+        self._lag_checked_at = time.time()
+      return self._replica_lag
+
+  @staticmethod
+  def _measure_lag(engine):
+    if engine.dialect.name != "mysql":
+      return 0
+    try:
+      status = engine.execute("SHOW SLAVE STATUS").first()
+    except Exception:  # pylint: disable=broad-except
+      logger.exception("Failed to check the replica status")
+      return None
+    if status is None:
+      # Not a replica, for instance a second schema in local setups.
+      return 0
+    return status["Seconds_Behind_Master"]
+
+  def replica_available(self, app):
+    lag = self.get_replica_lag(app)
+    return lag is not None and lag <= app.config.get("REPLICA_MAX_LAG", 0)
+
+
+def pin_to_primary(session, *_):
+  """Send all further statements of the session to the primary."""
+  session.info[PINNED] = True
+
+
+event.listen(RoutingSession, "after_flush", pin_to_primary)
+
+
+@contextlib.contextmanager
+def use_replica():
+  """Read from the replica within this block, if one is available."""
+  previous = getattr(g, "use_replica", False)
+  g.use_replica = True
+  try:
+    yield
+  finally:
+    g.use_replica = previous
+
+
+def read_only(func):
+  """Decorator for views that only read from the database."""
+  @functools.wraps(func)
+  def wrapper(*args, **kwargs):
+    with use_replica():
+      return func(*args, **kwargs)
+  return wrapper
@@ -0,0 +1,51 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Timing of application startup steps.
+
+Every new instance and worker pays for the application setup in `ggrc.app`
+before it can serve its first request. The setup steps are run through
+`run_step`, which records their durations. With PROFILE_STARTUP enabled, a
+report of all steps is logged once the setup is done.
+"""
+
+import time
+
+from ggrc import settings
+
+# Time when the setup started, steps are reported relative to it.
+STARTED_AT = time.time()
+
+_steps = []
+
+
+def run_step(func, *args):
+  """Run a startup step and record its duration."""
+  start = time.time()
+  try:
+    return func(*args)
+  finally:
+    _steps.append((func.__name__, time.time() - start))
+
+
+def get_steps():
+  """Get (name, duration) of all recorded startup steps."""
+  return list(_steps)
+
+
+def format_report():
+  """Get a human readable table of startup step durations."""
+  total = time.time() - STARTED_AT
+  lines = ["Startup took {:.3f}s".format(total)]
+  for name, duration in sorted(_steps, key=lambda step: -step[1]):
+    lines.append("{:>8.3f}s {:>5.1f}%  {}".format(
+        duration, 100 * duration / total if total else 0, name))
+  lines.append("{:>8.3f}s          imports and other setup".format(
+      total - sum(duration for _, duration in _steps)))
+  return "\n".join(lines)
+
+
+def log_report(logger):
+  """Log the startup report if startup profiling is enabled."""
+  if settings.PROFILE_STARTUP:
+    logger.info(format_report())
@@ -102,3 +102,42 @@ class CaseInsensitiveDefaultDict(CaseInsensitiveDict):
 
   def copy(self):
     return CaseInsensitiveDefaultDict(self._default, data=self._store.values())
+
+
+class LRUCache(object):
+  """Mapping that keeps only a limited number of recently used items.
+
+  Concurrent threads can evict items from under each other, in which case a
+  lookup is just a miss.
+  """
+
+  def __init__(self, size):
+    self.size = size
+    self._store = collections.OrderedDict()
+
+  def get(self, key, default=None):
+    """Get an item and mark it as recently used."""
+    try:
+      value = self._store.pop(key)
+    except KeyError:
+      return default
+    self._store[key] = value
+    return value
+
+  def __setitem__(self, key, value):
+    self._store.pop(key, None)
+    self._store[key] = value
+    while len(self._store) > self.size:
+      try:
+        self._store.popitem(last=False)
+      except KeyError:
+        break
+
+  def __contains__(self, key):
+    return key in self._store
+
+  def __len__(self):
+    return len(self._store)
+
+  def clear(self):
+    self._store.clear()
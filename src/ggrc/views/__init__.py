@@ -33,9 +33,11 @@ from ggrc.models.background_task import make_task_response
 from ggrc.models.background_task import queued_task
 from ggrc.models.reflection import AttributeInfo
 from ggrc.rbac import permissions
+from ggrc.rbac import resource_ids
 from ggrc.services.common import as_json
 from ggrc.services.common import inclusion_filter
 from ggrc.services import query as services_query
+from ggrc.views import bootstrap
 from ggrc.views import converters
 from ggrc.views import cron
 from ggrc.views import filters
@@ -50,20 +52,23 @@ from ggrc.utils import benchmark
 
 @app.route("/_background_tasks/reindex", methods=["POST"])
 @queued_task
-def reindex(_):
+def reindex(task):
   """
   Web hook to update the full text search index
   """
 
-  do_reindex()
+  do_reindex(task)
 
   return app.make_response((
       'success', 200, [('Content-Type', 'text/html')]))
 
 
-def do_reindex():
+def do_reindex(task=None):
   """
   update the full text search index
+
+  Args:
+    task: background task whose progress is updated after each model.
   """
 
   indexer = get_indexer()
@@ -77,7 +82,7 @@ def do_reindex():
   models_ = set(all_models.all_models) - set(inheritance_base_models)
   models_ = [model for model in models_ if model_is_indexed(model)]
 
-  for model in models_:
+  for done, model in enumerate(models_, 1):
     mapper_class = model._sa_class_manager.mapper.base_mapper.class_
     query = model.query.options(
         db.undefer_group(mapper_class.__name__ + '_complete'),
@@ -86,13 +91,18 @@ def do_reindex():
       for instance in query_chunk:
         indexer.create_record(fts_record_for(instance), False)
       db.session.commit()
+    if task is not None:
+      task.update_progress(done, len(models_))
 
 
 def get_permissions_json():
   """Get all permissions for current user"""
   with benchmark("Get permission JSON"):
     permissions.permissions_for(permissions.get_user())
-    return json.dumps(getattr(g, '_request_permissions', None))
+    user_permissions = getattr(g, '_request_permissions', None)
+    if user_permissions:
+      user_permissions = resource_ids.encode_permissions(user_permissions)
+    return json.dumps(user_permissions)
 
 
 def get_config_json():
@@ -187,11 +197,24 @@ def get_all_attributes_json(load_custom_attributes=False):
     return as_json(published)
 
 
+bootstrap.register(
+    "custom_attr_defs", "GGRC.custom_attr_defs",
+    bootstrap.custom_attributes_version, get_attributes_json)
+bootstrap.register(
+    "model_attr_defs", "GGRC.model_attr_defs",
+    bootstrap.deployment_version, get_all_attributes_json)
+bootstrap.register(
+    "model_attr_defs_with_cas", "GGRC.model_attr_defs",
+    bootstrap.custom_attributes_version,
+    lambda: get_all_attributes_json(load_custom_attributes=True))
+
+
 @app.context_processor
 def base_context():
   """Gets the base context"""
   return dict(
       get_model=models.get_model,
+      bootstrap_url=bootstrap.bootstrap_url,
       permissions_json=get_permissions_json,
       permissions=permissions,
       config_json=get_config_json,
@@ -345,6 +368,7 @@ def init_extra_views(app_):
   filters.init_filter_views()
   converters.init_converter_views()
   cron.init_cron_views(app_)
+  bootstrap.init_bootstrap_views(app_)
   notifications.init_notification_views(app_)
   services_query.init_query_view(app_)
 
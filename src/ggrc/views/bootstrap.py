@@ -0,0 +1,121 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Cached page bootstrap resources.
+
+Pages used to inline large JSON blobs, such as all model attribute
+definitions, that were rebuilt on every page render. These blobs are now
+registered here as bootstrap resources. Each resource has a version function
+that is cheap to evaluate and only changes when the payload could change, for
+instance when custom attribute definitions are modified.
+
+The payload is built once for each version and served from
+/bootstrap/<content hash>.js. Since the url changes whenever the content
+changes, browsers can cache the script indefinitely.
+"""
+
+import collections
+import hashlib
+
+from flask import url_for
+from sqlalchemy import func
+from werkzeug.exceptions import NotFound
+
+from ggrc import db
+from ggrc import models
+from ggrc.login import login_required
+
+# Number of previous payloads of a resource that are kept, so that pages
+# rendered just before a change can still load their scripts.
+KEPT_VERSIONS = 3
+
+BootstrapResource = collections.namedtuple(
+    "BootstrapResource", ["variable", "get_version", "get_json"])
+
+_resources = {}
+_versions = {}
+# Recent payloads of each resource by their content hashes, oldest first.
+_contents = collections.defaultdict(collections.OrderedDict)
+
+
+def register(name, variable, get_version, get_json):
+  """Register a bootstrap resource.
+
+  Args:
+    name: name used by templates to reference the resource.
+    variable: javascript variable that the resource sets.
+    get_version: function returning a hashable version of the payload.
+    get_json: function building the json payload.
+  """
+  _resources[name] = BootstrapResource(variable, get_version, get_json)
+
+
+def deployment_version():
+  """Version of payloads that only depend on the deployed code."""
+  return None
+
+
+def custom_attributes_version():
+  """Version of payloads that depend on custom attribute definitions."""
+  cad = models.CustomAttributeDefinition
+  return tuple(db.session.query(
+      func.count(cad.id),
+      func.max(cad.id),
+      func.max(cad.updated_at),
+  ).one())
+
+
+def _get_content_hash(name):
+  """Get the content hash of the current payload of a resource."""
+  resource = _resources[name]
+  version = resource.get_version()
+  cached = _versions.get(name)
+  contents = _contents[name]
+  if cached and cached[0] == version and cached[1] in contents:
+    return cached[1]
+  content = "{} = {};".format(resource.variable, resource.get_json())
+  content_hash = hashlib.sha1(content).hexdigest()
+  contents.pop(content_hash, None)
+  contents[content_hash] = content
+  _versions[name] = (version, content_hash)
+  if len(contents) > KEPT_VERSIONS:
+    contents.popitem(last=False)
+  return content_hash
+
+
+def _find_content(content_hash):
+  for contents in _contents.values():
+    if content_hash in contents:
+      return contents[content_hash]
+  return None
+
+
+def bootstrap_url(name):
+  """Get the url of the current payload of a bootstrap resource."""
+  return url_for("bootstrap_resource", content_hash=_get_content_hash(name))
+
+
+@login_required
+def bootstrap_resource(content_hash):
+  """Serve a bootstrap resource by its content hash."""
+  from ggrc.app import app
+  content = _find_content(content_hash)
+  if content is None:
+    # The page could have been rendered by another instance.
+    for name in _resources:
+      _get_content_hash(name)
+    content = _find_content(content_hash)
+  if content is None:
+    raise NotFound()
+  response = app.make_response((
+      content, 200,
+      [("Content-Type", "application/javascript")]))
+  response.cache_control.private = True
+  response.cache_control.max_age = 365 * 24 * 60 * 60
+  return response
+
+
+def init_bootstrap_views(app):
+  app.add_url_rule(
+      "/bootstrap/<content_hash>.js", "bootstrap_resource",
+      view_func=bootstrap_resource)
@@ -7,12 +7,17 @@ This module handles all view related function to import and export pages
 including the import/export api endponts.
 """
 
+import copy
+import functools
+
 from flask import current_app
 from flask import request
 from flask import json
 from flask import render_template
+from flask import url_for
 from werkzeug.exceptions import BadRequest
 
+from ggrc import db
 from ggrc.app import app
 from ggrc.converters.base import Converter
 from ggrc.converters.import_helper import generate_csv_string
@@ -20,7 +25,10 @@ from ggrc.converters.import_helper import read_csv_file
 from ggrc.converters.query_helper import BadQueryException
 from ggrc.converters.query_helper import QueryHelper
 from ggrc.login import login_required
+from ggrc.models.background_task import create_task
+from ggrc.models.background_task import queued_task
 from ggrc.utils import benchmark
+from ggrc.utils.replica import read_only
 
 
 def check_required_headers(required_headers):
@@ -94,6 +102,8 @@ def parse_import_request():
 def handle_import_request():
   try:
     dry_run, csv_data = parse_import_request()
+    if "X-GGRC-BackgroundTask" in request.headers:
+      return schedule_import(dry_run, csv_data)
     converter = Converter(dry_run=dry_run, csv_data=csv_data)
     converter.import_csv()
     response_data = converter.get_info()
@@ -105,6 +115,76 @@ def handle_import_request():
   raise BadRequest("Import failed due to server error.")
 
 
+def schedule_import(dry_run, csv_data):
+  """Run the import as a background task.
+
+  Returns:
+    import results if the task has been run right away, or the id and status
+    of the scheduled background task.
+  """
+  task = create_task("import_csv", url_for(run_import_task.__name__),
+                     run_import_task,
+                     parameters={"dry_run": dry_run, "csv_data": csv_data})
+  response_json = json.dumps({
+      "background_task": {"id": task.id, "status": task.status},
+  })
+  headers = [("Content-Type", "application/json")]
+  return task.make_response(
+      current_app.make_response((response_json, 200, headers)))
+
+
+def _save_import_checkpoint(task, checkpoint, done, total):
+  """Store import checkpoint and progress on the background task."""
+  task.update_progress(done, total, checkpoint)
+
+
+def _has_import_errors(response_data):
+  """Check if any block of an import reports block or row errors."""
+  return any(block["block_errors"] or block["row_errors"]
+             for block in response_data)
+
+
+def _make_import_response(response_data):
+  response_json = json.dumps(response_data)
+  headers = [("Content-Type", "application/json")]
+  return app.make_response((response_json, 200, headers))
+
+
+# Needs to be secured as we are removing @login_required
+
+@app.route("/_background_tasks/import_csv", methods=["POST"])
+@queued_task
+def run_import_task(task):
+  """Web hook that imports a csv file in a background task.
+
+  The data is validated with a dry run first, so that conversion failures are
+  caught before anything is committed. If the validation reports errors, the
+  task finishes with the validation results and nothing is imported. The
+  import itself is committed in chunks of rows and a checkpoint is stored on
+  the task after each commit. A retried task skips the validation and
+  continues from its last checkpoint.
+  """
+  dry_run = task.parameters["dry_run"]
+  csv_data = task.parameters["csv_data"]
+  if not task.checkpoint:
+    with benchmark("Validate import"):
+      converter = Converter(dry_run=True, csv_data=copy.deepcopy(csv_data))
+      converter.import_csv()
+      db.session.rollback()
+    response_data = converter.get_info()
+    if dry_run or _has_import_errors(response_data):
+      return _make_import_response(response_data)
+  with benchmark("Import"):
+    converter = Converter(
+        dry_run=False,
+        csv_data=csv_data,
+        checkpoint=task.checkpoint,
+        checkpoint_callback=functools.partial(_save_import_checkpoint, task),
+    )
+    converter.import_csv()
+  return _make_import_response(converter.get_info())
+
+
 def init_converter_views():
   """Initialize views for import and export."""
 
@@ -112,6 +192,7 @@ def init_converter_views():
   # The view function trigger a false unused-variable.
   @app.route("/_service/export_csv", methods=["POST"])
   @login_required
+  @read_only
   def handle_export_csv():
     with benchmark("handle export request"):
       return handle_export_request()
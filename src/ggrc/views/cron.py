@@ -1,10 +1,25 @@
 # Copyright (C) 2016 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
+"""Nightly cron endpoint.
+
+Every contributed cron job is started as a separate background task, so with
+a task queue the jobs run concurrently and one slow job does not delay the
+others. Without a task queue the tasks run one after another within the
+request, as before. See `ggrc.cron` for run records and batched jobs.
+"""
+
+import datetime
 import traceback
+
 from flask import current_app
+from flask import url_for
 
-from ggrc import extensions
+from ggrc import cron
+from ggrc import settings
+from ggrc.models.background_task import create_task
+from ggrc.models.background_task import queued_task
+from ggrc.models.background_task import uses_task_queue
 from ggrc.notifications import common
 
 
@@ -16,20 +31,72 @@ def send_error_notification(message):
     current_app.logger.error(e)
 
 
+def report_job_failure(job):
+  """Log and send the exception that is being handled for a failed job."""
+  message = "job '{}' failed with: \n{}".format(
+      job.__name__, traceback.format_exc())
+  current_app.logger.error(message)
+  send_error_notification(message)
+
+
 def run_job(job):
+  """Run a job right away, without a run record."""
   try:
     job()
   except:
-    message = "job '{}' failed with: \n{}".format(
-        job.__name__, traceback.format_exc())
-    current_app.logger.error(message)
-    send_error_notification(message)
+    report_job_failure(job)
+
+
+def _is_due(run):
+  """Check if a run record allows starting its job again."""
+  if run.status == "Success":
+    return False
+  if run.attempts >= settings.CRON_JOB_MAX_ATTEMPTS:
+    return False
+  if run.status in ("Running", "Paused"):
+    # The task running or continuing the job could have died without
+    # recording it.
+    stale_at = run.started_at + datetime.timedelta(
+        seconds=settings.LOCAL_TASK_QUEUE_LEASE)
+    return stale_at < datetime.datetime.utcnow()
+  return True
+
+
+def schedule_job(name, job, run_date):
+  """Start a background task that runs a job for the given day."""
+  create_task("cron_" + job.__name__, url_for(run_cron_job.__name__),
+              run_cron_job,
+              parameters={"name": name, "run_date": run_date.isoformat()})
+
+
+@queued_task
+def run_cron_job(task):
+  """Web hook that runs a cron job in a background task.
+
+  With a task queue, batched jobs stop after CRON_JOB_TIME_BUDGET seconds and
+  continue in a new task.
+  """
+  name = task.parameters["name"]
+  run_date = datetime.datetime.strptime(
+      task.parameters["run_date"], "%Y-%m-%d").date()
+  job = cron.get_jobs()[name]
+  run = cron.get_run(name, run_date)
+  time_budget = settings.CRON_JOB_TIME_BUDGET if uses_task_queue() else None
+  try:
+    done = cron.run_job(job, run, time_budget)
+  except:
+    report_job_failure(job)
+    raise
+  if not done:
+    schedule_job(name, job, run_date)
+  return 'Ok'
 
 
 def nightly_cron_endpoint():
-  cron_jobs = extensions.get_module_contributions("CONTRIBUTED_CRON_JOBS")
-  for job in cron_jobs:
-    run_job(job)
+  run_date = datetime.date.today()
+  for name, job in cron.get_jobs().items():
+    if _is_due(cron.get_run(name, run_date)):
+      schedule_job(name, job, run_date)
   return 'Ok'
 
 
@@ -37,3 +104,8 @@ def init_cron_views(app):
   app.add_url_rule(
       "/nightly_cron_endpoint", "nightly_cron_endpoint",
       view_func=nightly_cron_endpoint)
+  # The cron endpoint is called with GET, and queued tasks repeat the method
+  # of the request that created them.
+  app.add_url_rule(
+      "/_background_tasks/run_cron_job", "run_cron_job",
+      view_func=run_cron_job, methods=["GET", "POST"])
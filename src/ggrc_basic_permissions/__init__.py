@@ -22,8 +22,11 @@ from ggrc.login import get_current_user
 from ggrc.models import all_models
 from ggrc.models.audit import Audit
 from ggrc.models.program import Program
+from ggrc.models.relationship_edge import RelationshipEdge
 from ggrc.models.object_owner import ObjectOwner
+from ggrc.rbac import grants
 from ggrc.rbac import permissions as rbac_permissions
+from ggrc.rbac import resource_ids
 from ggrc.rbac.permissions_provider import DefaultUserPermissions
 from ggrc.services.common import _get_cache_manager
 from ggrc.services.common import Resource
@@ -371,7 +374,7 @@ def query_memcache(key):
   if permissions_cache:
     # If the key is both in permissions:list and in memcache itself
     # it is safe to return the cached permissions
-    return cache, permissions_cache
+    return cache, resource_ids.decode_permissions(permissions_cache)
   return cache, None
 
 
@@ -551,12 +554,12 @@ def load_implied_roles(permissions, source_contexts_to_rolenames,
           implied_role.permissions, implied_context_id, permissions)
 
 
-def load_object_owners(user, permissions):
+def load_object_owners(user, resource_grants):
   """Load object owners permissions
 
   Args:
       user (Person): Person object
-      permissions (dict): dict where the permissions will be stored
+      resource_grants (ResourceGrants): collector of per object grants
   Returns:
       None
   """
@@ -567,11 +570,7 @@ def load_object_owners(user, permissions):
   with benchmark("load_object_owners > update permissions"):
     actions = ("read", "create", "update", "delete", "view_object_page")
     for ownable_type, ownable_id in object_owners:
-      for action in actions:
-        permissions.setdefault(action, {})\
-            .setdefault(ownable_type, {})\
-            .setdefault('resources', list())\
-            .append(ownable_id)
+      resource_grants.add(ownable_type, ownable_id, actions)
 
 
 def context_relationship_query(contexts):
@@ -586,35 +585,23 @@ def context_relationship_query(contexts):
     return []
 
   _context = aliased(all_models.Context, name="c")
-  _relationship = aliased(all_models.Relationship, name="rl")
+  _edge = aliased(RelationshipEdge, name="re")
 
-  headers = (case([
-      (_relationship.destination_type == _context.related_object_type,
-       _relationship.source_id.label('id'))
-  ], else_=_relationship.destination_id.label('id')),
-      case([
-          (_relationship.destination_type == _context.related_object_type,
-           _relationship.source_type.label('type'))
-      ], else_=_relationship.destination_type.label('type')),
-      literal(None))
-
-  return db.session.query(*headers).join(_context, and_(
-      _context.id.in_(contexts),
-      _relationship.destination_id == _context.related_object_id,
-      _relationship.destination_type == _context.related_object_type,
-  )).union(db.session.query(*headers).join(_context, and_(
+  return db.session.query(
+      _edge.related_id, _edge.related_type, literal(None)
+  ).join(_context, and_(
       _context.id.in_(contexts),
-      _relationship.source_id == _context.related_object_id,
-      _relationship.source_type == _context.related_object_type,
-  ))).all()
+      _edge.object_id == _context.related_object_id,
+      _edge.object_type == _context.related_object_type,
+  )).distinct().all()
 
 
-def load_context_relationships(permissions):
+def load_context_relationships(permissions, resource_grants):
   """Load context relationship permissions
 
   Args:
-      user (Person): Person object
-      permissions (dict): dict where the permissions will be stored
+      permissions (dict): dict with the already loaded context permissions
+      resource_grants (ResourceGrants): collector of per object grants
   Returns:
       None
   """
@@ -635,32 +622,22 @@ def load_context_relationships(permissions):
   read_only_contexts = read_contexts - write_contexts
 
   read_objects = context_relationship_query(read_only_contexts)
-  for res in read_objects:
-    id_, type_, _ = res
-    actions = ["read", "view_object_page"]
-    for action in actions:
-      permissions.setdefault(action, {})\
-          .setdefault(type_, {})\
-          .setdefault('resources', list())\
-          .append(id_)
+  actions = ["read", "view_object_page"]
+  for id_, type_, _ in read_objects:
+    resource_grants.add(type_, id_, actions)
 
   write_objects = context_relationship_query(write_contexts)
-  for res in write_objects:
-    id_, type_, role_name = res
-    actions = ["read", "view_object_page", "create", "update", "delete"]
-    for action in actions:
-      permissions.setdefault(action, {})\
-          .setdefault(type_, {})\
-          .setdefault('resources', list())\
-          .append(id_)
+  actions = ["read", "view_object_page", "create", "update", "delete"]
+  for id_, type_, _ in write_objects:
+    resource_grants.add(type_, id_, actions)
 
 
-def load_assignee_relationships(user, permissions):
+def load_assignee_relationships(user, resource_grants):
   """Load assignee relationship permissions
 
   Args:
       user (Person): Person object
-      permissions (dict): dict where the permissions will be stored
+      resource_grants (ResourceGrants): collector of per object grants
   Returns:
       None
   """
@@ -668,11 +645,7 @@ def load_assignee_relationships(user, permissions):
     actions = ["read", "view_object_page"]
     if role_name == "RUD":
       actions += ["update", "delete"]
-    for action in actions:
-      permissions.setdefault(action, {})\
-          .setdefault(type_, {})\
-          .setdefault('resources', list())\
-          .append(id_)
+    resource_grants.add(type_, id_, actions)
 
 
 def load_personal_context(user, permissions):
@@ -736,7 +709,8 @@ def store_results_into_memcache(permissions, cache, key):
     # We only add the permissions to the cache if the
     # key still exists in the permissions:list after
     # the query has executed.
-    cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
+    cache.set(key, resource_ids.encode_permissions(permissions),
+              PERMISSION_CACHE_TIMEOUT)
 
 
 def load_permissions_for(user):
@@ -756,8 +730,12 @@ def load_permissions_for(user):
     keys.
   'condition' is the string name of a conditional operator, such as 'contains'.
   'terms' are the arguments to the 'condition'.
+  'resources' is a sorted list of ids of objects of 'resource_type' on which
+    the action is allowed. Actions with the same object grants share the
+    same list, so it must not be modified.
   """
   permissions = {}
+  resource_grants = resource_ids.ResourceGrants()
   key = 'permissions:{}'.format(user.id)
 
   with benchmark("load_permissions > query memcache"):
@@ -783,13 +761,16 @@ def load_permissions_for(user):
                        all_context_implications)
 
   with benchmark("load_permissions > load object owners"):
-    load_object_owners(user, permissions)
+    load_object_owners(user, resource_grants)
 
   with benchmark("load_permissions > load context relationships"):
-    load_context_relationships(permissions)
+    load_context_relationships(permissions, resource_grants)
 
   with benchmark("load_permissions > load assignee relationships"):
-    load_assignee_relationships(user, permissions)
+    load_assignee_relationships(user, resource_grants)
+
+  with benchmark("load_permissions > store resource grants"):
+    resource_grants.store(permissions)
 
   with benchmark("load_permissions > load personal context"):
     load_personal_context(user, permissions)
@@ -797,6 +778,9 @@ def load_permissions_for(user):
   with benchmark("load_permissions > load backlog workflows"):
     load_backlog_workflows(permissions)
 
+  with benchmark("load_permissions > store permission grants"):
+    grants.store_grants(user.id, permissions)
+
   with benchmark("load_permissions > store results into memcache"):
     store_results_into_memcache(permissions, cache, key)
 
@@ -18,7 +18,12 @@ from ggrc_workflows.models import WORKFLOW_OBJECT_TYPES
 from ggrc_workflows.converters import IMPORTABLE, EXPORTABLE
 from ggrc_workflows.converters.handlers import COLUMN_HANDLERS
 from ggrc_workflows.services.common import Signals
+from ggrc_workflows.services import bulk_clone
+from ggrc_workflows.services import object_closure
+from ggrc_workflows.services import task_counts
 from ggrc_workflows.services import workflow_cycle_calculator
+from ggrc_workflows.services.status_rollup import get_status_rollup
+from ggrc_workflows.services.status_rollup import PARENT_ATTRS
 from ggrc_workflows.roles import (
     WorkflowOwner, WorkflowMember, BasicWorkflowReader, WorkflowBasicReader
 )
@@ -308,12 +313,6 @@ def build_cycle(cycle, current_user=None, base_date=None):
       old_status=None
   )
 
-# 'InProgress' states propagate via these links
-_cycle_task_parent_attr = {
-    models.CycleTaskGroupObjectTask: ['cycle_task_group'],
-    models.CycleTaskGroup: ['cycle']
-}
-
 # 'Finished' and 'Verified' states are determined via these links
 _cycle_task_children_attr = {
     models.CycleTaskGroup: ['cycle_task_group_tasks'],
@@ -326,6 +325,7 @@ def update_cycle_task_child_state(obj):
   status_order = (None, 'Assigned', 'InProgress',
                   'Declined', 'Finished', 'Verified')
   status = obj.status
+  rollup = get_status_rollup()
   children_attrs = _cycle_task_children_attr.get(type(obj), [])
   for children_attr in children_attrs:
     if children_attr:
@@ -334,10 +334,11 @@ def update_cycle_task_child_state(obj):
         if status == 'Declined' or \
            status_order.index(status) > status_order.index(child.status):
           if is_allowed_update(child.__class__.__name__,
-                               child.id, child.context.id):
+                               child.id, child.context_id):
             old_status = child.status
             child.status = status
             db.session.add(child)
+            rollup.record(child, obj)
             Signals.status_change.send(
                 child.__class__,
                 obj=child,
@@ -347,59 +348,40 @@ def update_cycle_task_child_state(obj):
           update_cycle_task_child_state(child)
 
 
-def update_cycle_task_parent_state(obj):  # noqa
-  """Propagate changes to obj's parents"""
+def update_cycle_task_parent_state(obj):
+  """Propagate changes to obj's parents.
 
-  if not is_allowed_update(obj.__class__.__name__,
-                           obj.id, obj.context.id):
+  The new status of a parent is decided from the status counters of its
+  children, see `ggrc_workflows.services.status_rollup`. Parents are only
+  updated, and status changes only signalled, if their status changes.
+  """
+  if not is_allowed_update(obj.__class__.__name__, obj.id, obj.context_id):
     return
 
-  def update_parent(parent, old_status, new_status):
-    """Update a parent element and emit a signal about the change"""
-    parent.status = new_status
-    db.session.add(parent)
-    Signals.status_change.send(
-        parent.__class__,
-        obj=parent,
-        old_status=old_status,
-        new_status=new_status,
-    )
-    update_cycle_task_parent_state(parent)
-
-  parent_attrs = _cycle_task_parent_attr.get(type(obj), [])
-  for parent_attr in parent_attrs:
-    if not parent_attr:
-      continue
-
-    parent = getattr(obj, parent_attr, None)
-    old_status = parent.status
-    if not parent:
-      continue
-
-    # Don't propagate changes to CycleTaskGroup if it's a part of backlog wf
-    if isinstance(parent, models.CycleTaskGroup) \
-       and parent.cycle.workflow.kind == "Backlog":
-      continue
-
-    # If any child is `InProgress`, then parent should be `InProgress`
-    if obj.status in {"InProgress", "Declined"} and old_status != "InProgress":
-      new_status = "InProgress"
-      update_parent(parent, old_status, new_status)
-    # If all children are `Finished` or `Verified`, then parent should be same
-    elif obj.status in {"Finished", "Verified", "Assigned"}:
-      children_attrs = _cycle_task_children_attr.get(type(parent), [])
-      for children_attr in children_attrs:
-        children = getattr(parent, children_attr, None)
-        if not children:
-          continue
-
-        children_statues = [c.status for c in children]
-        unique_statuses = set(children_statues)
-        for status in ["Verified", "Finished", "Assigned"]:
-          # Check if all elements match a certain state
-          if children_statues[0] == status and len(unique_statuses) == 1:
-            new_status = status
-            update_parent(parent, old_status, new_status)
+  parent_attr = PARENT_ATTRS.get(type(obj))
+  parent = getattr(obj, parent_attr, None) if parent_attr else None
+  if not parent:
+    return
+
+  # Don't propagate changes to CycleTaskGroup if it's a part of backlog wf
+  if isinstance(parent, models.CycleTaskGroup) \
+     and parent.cycle.workflow.kind == "Backlog":
+    return
+
+  old_status = parent.status
+  new_status = get_status_rollup().get_parent_status(obj, parent)
+  if new_status is None or new_status == old_status:
+    return
+
+  parent.status = new_status
+  db.session.add(parent)
+  Signals.status_change.send(
+      parent.__class__,
+      obj=parent,
+      old_status=old_status,
+      new_status=new_status,
+  )
+  update_cycle_task_parent_state(parent)
 
 
 def ensure_assignee_is_workflow_member(workflow, assignee):
@@ -482,12 +464,17 @@ def handle_task_group_post(sender, obj=None, src=None, service=None):  # noqa py
     source_task_group.copy(
         obj,
         clone_people=src.get('clone_people', False),
-        clone_tasks=src.get('clone_tasks', False),
-        clone_objects=src.get('clone_objects', False)
     )
 
     db.session.add(obj)
     db.session.flush()
+    bulk_clone.clone_task_group_children(
+        source_task_group,
+        obj,
+        clone_people=src.get('clone_people', False),
+        clone_tasks=src.get('clone_tasks', False),
+        clone_objects=src.get('clone_objects', False)
+    )
 
     obj.title = source_task_group.title + ' (copy ' + str(obj.id) + ')'
 
@@ -798,7 +785,8 @@ def handle_workflow_post(sender, obj=None, src=None, service=None):  # noqa pyli
     add_public_workflow_context_implication(context)
 
   if src.get('clone'):
-    source_workflow.copy_task_groups(
+    bulk_clone.clone_task_groups(
+        source_workflow,
         obj,
         clone_people=src.get('clone_people', False),
         clone_tasks=src.get('clone_tasks', False),
@@ -1037,5 +1025,9 @@ contributed_importables = IMPORTABLE
 contributed_exportables = EXPORTABLE
 contributed_column_handlers = COLUMN_HANDLERS
 contributed_get_ids_related_to = relationship_helper.get_ids_related_to
-CONTRIBUTED_CRON_JOBS = [start_recurring_cycles]
+CONTRIBUTED_CRON_JOBS = [
+    start_recurring_cycles,
+    task_counts.refresh_all_task_counts,
+    object_closure.check_workflow_object_closure,
+]
 NOTIFICATION_LISTENERS = [notification.register_listeners]
@@ -0,0 +1,52 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add user task counts
+
+Create Date: 2016-09-07 10:12:45.518302
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6b3f1d2a9c47'
+down_revision = '4cb78ab9a321'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'user_task_counts',
+      sa.Column('person_id', sa.Integer(), nullable=False),
+      sa.Column('task_count', sa.Integer(), nullable=False),
+      sa.Column('overdue_count', sa.Integer(), nullable=False),
+      sa.Column('computed_on', sa.Date(), nullable=False),
+      sa.ForeignKeyConstraint(['person_id'], ['people.id'],
+                              ondelete='CASCADE'),
+      sa.PrimaryKeyConstraint('person_id'),
+  )
+  op.execute("""
+      INSERT INTO user_task_counts
+          (person_id, task_count, overdue_count, computed_on)
+      SELECT ct.contact_id,
+             COUNT(ct.id),
+             SUM(CASE WHEN ct.end_date < CURDATE() THEN 1 ELSE 0 END),
+             CURDATE()
+      FROM cycle_task_group_object_tasks AS ct
+      JOIN cycles AS c ON c.id = ct.cycle_id
+      WHERE ct.status IN ('Assigned', 'InProgress', 'Finished', 'Declined')
+        AND c.is_current = 1
+        AND ct.contact_id IS NOT NULL
+      GROUP BY ct.contact_id
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('user_task_counts')
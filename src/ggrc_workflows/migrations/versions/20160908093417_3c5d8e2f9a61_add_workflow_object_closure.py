@@ -0,0 +1,71 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add workflow object closure
+
+Create Date: 2016-09-08 09:34:17.204516
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5d8e2f9a61'
+down_revision = '6b3f1d2a9c47'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'workflow_object_closure',
+      sa.Column('cycle_task_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('object_type', sa.String(length=250), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False,
+                autoincrement=False),
+      sa.Column('cycle_task_group_id', sa.Integer(), nullable=False),
+      sa.Column('cycle_id', sa.Integer(), nullable=False),
+      sa.Column('workflow_id', sa.Integer(), nullable=False),
+      sa.ForeignKeyConstraint(['cycle_task_id'],
+                              ['cycle_task_group_object_tasks.id'],
+                              ondelete='CASCADE'),
+      sa.PrimaryKeyConstraint('cycle_task_id', 'object_type', 'object_id'),
+  )
+  op.create_index('ix_workflow_object_closure_object',
+                  'workflow_object_closure', ['object_type', 'object_id'])
+  op.create_index('ix_workflow_object_closure_workflow',
+                  'workflow_object_closure', ['workflow_id'])
+  op.create_index('ix_workflow_object_closure_cycle',
+                  'workflow_object_closure', ['cycle_id'])
+  op.create_index('ix_workflow_object_closure_cycle_task_group',
+                  'workflow_object_closure', ['cycle_task_group_id'])
+  op.execute("""
+      INSERT INTO workflow_object_closure
+          (workflow_id, cycle_id, cycle_task_group_id, cycle_task_id,
+           object_type, object_id)
+      SELECT c.workflow_id, ct.cycle_id, ct.cycle_task_group_id, ct.id,
+             r.destination_type, r.destination_id
+      FROM relationships AS r
+      JOIN cycle_task_group_object_tasks AS ct
+          ON r.source_type = 'CycleTaskGroupObjectTask'
+         AND r.source_id = ct.id
+      JOIN cycles AS c ON c.id = ct.cycle_id
+      UNION
+      SELECT c.workflow_id, ct.cycle_id, ct.cycle_task_group_id, ct.id,
+             r.source_type, r.source_id
+      FROM relationships AS r
+      JOIN cycle_task_group_object_tasks AS ct
+          ON r.destination_type = 'CycleTaskGroupObjectTask'
+         AND r.destination_id = ct.id
+      JOIN cycles AS c ON c.id = ct.cycle_id
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('workflow_object_closure')
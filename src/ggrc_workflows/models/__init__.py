@@ -14,6 +14,8 @@ from .cycle import Cycle
 from .cycle_task_entry import CycleTaskEntry
 from .cycle_task_group import CycleTaskGroup
 from .cycle_task_group_object_task import CycleTaskGroupObjectTask
+from .user_task_count import UserTaskCount  # noqa
+from .workflow_object_closure import WorkflowObjectClosure  # noqa
 
 
 register_model(TaskGroup)
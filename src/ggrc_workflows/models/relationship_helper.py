@@ -2,14 +2,13 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 from ggrc import db
-from ggrc.models.relationship import Relationship
 from ggrc_workflows.models import Cycle
 from ggrc_workflows.models import CycleTaskGroup
 from ggrc_workflows.models import CycleTaskGroupObjectTask as CycleTask
 from ggrc_workflows.models import TaskGroup
 from ggrc_workflows.models import TaskGroupObject
 from ggrc_workflows.models import TaskGroupTask
-from ggrc_workflows.models import Workflow
+from ggrc_workflows.models import WorkflowObjectClosure
 from ggrc_workflows.models import WORKFLOW_OBJECT_TYPES
 
 
@@ -143,12 +142,13 @@ def ctg_ctgot(object_type, related_type, related_ids):
         CycleTask.cycle_task_group_id.in_(related_ids))
 
 
-def ctg_ctgo(object_type, related_type, related_ids):
-  """ Indirect relationship helper between Cycle Task Groups and Objects
-
-  Build a query to find indirectly related objects.
+def _closure_query(holder_type, holder_column, object_type, related_type,
+                   related_ids):
+  """Build a query for objects mapped to cycle tasks under a holder.
 
   Args:
+      holder_type: Type name of the workflow, cycle or cycle task group side
+      holder_column: Column of WorkflowObjectClosure with ids of holder_type
       object_type: Type name (string) of the sought objects
       related_type: Type name (string) of the known objects
       related_ids: List of ids of the known objects
@@ -156,104 +156,37 @@ def ctg_ctgo(object_type, related_type, related_ids):
       A query object which finds the ids of objects (of type object_type) that
       are indirectly related to one of the related objects.
   """
-  if object_type == "CycleTaskGroup":
-    join_by_source_id = db.session.query(CycleTask.cycle_task_group_id) \
-        .join(Relationship, CycleTask.id == Relationship.source_id) \
-        .filter(
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == related_type,
-            Relationship.destination_id.in_(related_ids))
-    join_by_destination_id = db.session.query(CycleTask.cycle_task_group_id) \
-        .join(Relationship, CycleTask.id == Relationship.destination_id) \
-        .filter(
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == related_type,
-            Relationship.source_id.in_(related_ids))
-    return join_by_source_id.union(join_by_destination_id)
+  if object_type == holder_type:
+    return db.session.query(holder_column).filter(
+        WorkflowObjectClosure.object_type == related_type,
+        WorkflowObjectClosure.object_id.in_(related_ids)).distinct()
   else:
-    join_by_source_id = db.session.query(Relationship.destination_id) \
-        .join(CycleTask, CycleTask.id == Relationship.source_id) \
-        .filter(
-            CycleTask.cycle_task_group_id.in_(related_ids),
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == object_type)
-    join_by_destination_id = db.session.query(Relationship.source_id) \
-        .join(CycleTask, CycleTask.id == Relationship.destination_id) \
-        .filter(
-            CycleTask.cycle_task_group_id.in_(related_ids),
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == object_type)
-    return join_by_source_id.union(join_by_destination_id)
+    return db.session.query(WorkflowObjectClosure.object_id).filter(
+        WorkflowObjectClosure.object_type == object_type,
+        holder_column.in_(related_ids)).distinct()
+
+
+def ctg_ctgo(object_type, related_type, related_ids):
+  """ indirect relationships between Cycle Task Groups and Objects mapped to
+      their Cycle Tasks.
+  """
+  return _closure_query("CycleTaskGroup",
+                        WorkflowObjectClosure.cycle_task_group_id,
+                        object_type, related_type, related_ids)
 
 
 def cycle_ctgo(object_type, related_type, related_ids):
   """ indirect relationships between Cycles and Objects mapped to CycleTask """
-  if object_type == "Cycle":
-    join_by_source_id = db.session.query(CycleTask.cycle_id) \
-        .join(Relationship, CycleTask.id == Relationship.source_id) \
-        .filter(
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == related_type,
-            Relationship.destination_id.in_(related_ids))
-    join_by_destination_id = db.session.query(CycleTask.cycle_id) \
-        .join(Relationship, CycleTask.id == Relationship.destination_id) \
-        .filter(
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == related_type,
-            Relationship.source_id.in_(related_ids))
-    return join_by_source_id.union(join_by_destination_id)
-  else:
-    join_by_source_id = db.session.query(Relationship.destination_id) \
-        .join(CycleTask, CycleTask.id == Relationship.source_id) \
-        .filter(
-            CycleTask.cycle_id.in_(related_ids),
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == object_type)
-    join_by_destination_id = db.session.query(Relationship.source_id) \
-        .join(CycleTask, CycleTask.id == Relationship.destination_id) \
-        .filter(
-            CycleTask.cycle_id.in_(related_ids),
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == object_type)
-    return join_by_source_id.union(join_by_destination_id)
+  return _closure_query("Cycle", WorkflowObjectClosure.cycle_id,
+                        object_type, related_type, related_ids)
 
 
 def wf_ctgo(object_type, related_type, related_ids):
   """ indirect relationships between Workflows and Objects mapped to the
       Tasks in the Workflow.
   """
-  if object_type == "Workflow":
-    join_by_source_id = db.session.query(Workflow.id).join(
-        Cycle, CycleTaskGroup, CycleTask) \
-        .join(Relationship, CycleTask.id == Relationship.source_id) \
-        .filter(
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == related_type,
-            Relationship.destination_id.in_(related_ids))
-    join_by_destination_id = db.session.query(Workflow.id).join(
-        Cycle, CycleTaskGroup, CycleTask) \
-        .join(Relationship, CycleTask.id == Relationship.destination_id) \
-        .filter(
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == related_type,
-            Relationship.source_id.in_(related_ids))
-    return join_by_source_id.union(join_by_destination_id)
-  else:
-    join_by_source_id = db.session.query(Relationship.destination_id) \
-        .join(CycleTask, CycleTask.id == Relationship.source_id) \
-        .join(Cycle, Workflow) \
-        .filter(
-            Workflow.id.in_(related_ids),
-            Relationship.source_type == "CycleTaskGroupObjectTask",
-            Relationship.destination_type == object_type)
-    join_by_destination_id = db.session.query(Relationship.source_id) \
-        .join(CycleTask, CycleTask.id == Relationship.destination_id) \
-        .join(Cycle, Workflow) \
-        .filter(
-            Workflow.id.in_(related_ids),
-            Relationship.destination_type == "CycleTaskGroupObjectTask",
-            Relationship.source_type == object_type)
-    return join_by_source_id.union(join_by_destination_id)
+  return _closure_query("Workflow", WorkflowObjectClosure.workflow_id,
+                        object_type, related_type, related_ids)
 
 _function_map = {
     ("Cycle", "CycleTaskGroup"): cycle_ctg,
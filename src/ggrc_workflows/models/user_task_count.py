@@ -0,0 +1,25 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Module containing per person task counters."""
+
+from ggrc import db
+
+
+class UserTaskCount(db.Model):
+  """Numbers of open and overdue tasks of a person in current cycles.
+
+  This is a denormalised table maintained by
+  `ggrc_workflows.services.task_counts`, it is not exposed through the api.
+  """
+  __tablename__ = 'user_task_counts'
+
+  person_id = db.Column(
+      db.Integer,
+      db.ForeignKey('people.id', ondelete="CASCADE"),
+      primary_key=True,
+  )
+  task_count = db.Column(db.Integer, nullable=False, default=0)
+  overdue_count = db.Column(db.Integer, nullable=False, default=0)
+  # Overdue counts are only valid on the day they were computed.
+  computed_on = db.Column(db.Date, nullable=False)
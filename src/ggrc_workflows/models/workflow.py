@@ -15,7 +15,6 @@ from sqlalchemy import orm
 from ggrc import db
 from ggrc.fulltext import get_indexer
 from ggrc.fulltext.recordbuilder import fts_record_for
-from ggrc.login import get_current_user
 from ggrc.models import mixins
 from ggrc.models import reflection
 from ggrc.models.associationproxy import association_proxy
@@ -206,28 +205,6 @@ class Workflow(mixins.CustomAttributable, HasOwnContext, mixins.Timeboxed,
     target = self.copy_into(_other, columns, **kwargs)
     return target
 
-  def copy_task_groups(self, target, **kwargs):
-    """Copy all task groups and tasks mapped to this workflow.
-    """
-    for task_group in self.task_groups:
-      obj = task_group.copy(
-          workflow=target,
-          context=target.context,
-          clone_people=kwargs.get("clone_people", False),
-          clone_objects=kwargs.get("clone_objects", False),
-          modified_by=get_current_user(),
-      )
-      target.task_groups.append(obj)
-
-      if kwargs.get("clone_tasks"):
-        task_group.copy_tasks(
-            obj,
-            clone_people=kwargs.get("clone_people", False),
-            clone_objects=kwargs.get("clone_objects", True)
-        )
-
-    return target
-
   @classmethod
   def eager_query(cls):
     return super(Workflow, cls).eager_query().options(
@@ -0,0 +1,35 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Module containing objects mapped to cycle tasks with their ancestors."""
+
+from ggrc import db
+
+
+class WorkflowObjectClosure(db.Model):
+  """Object mapped to a cycle task, with the cycle and workflow of the task.
+
+  This is a denormalised table maintained by
+  `ggrc_workflows.services.object_closure`, it is not exposed through the api.
+  """
+  __tablename__ = 'workflow_object_closure'
+  __table_args__ = (
+      db.Index('ix_workflow_object_closure_object', 'object_type',
+               'object_id'),
+      db.Index('ix_workflow_object_closure_workflow', 'workflow_id'),
+      db.Index('ix_workflow_object_closure_cycle', 'cycle_id'),
+      db.Index('ix_workflow_object_closure_cycle_task_group',
+               'cycle_task_group_id'),
+  )
+
+  cycle_task_id = db.Column(
+      db.Integer,
+      db.ForeignKey('cycle_task_group_object_tasks.id', ondelete="CASCADE"),
+      primary_key=True,
+      autoincrement=False,
+  )
+  object_type = db.Column(db.String(length=250), primary_key=True)
+  object_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  cycle_task_group_id = db.Column(db.Integer, nullable=False)
+  cycle_id = db.Column(db.Integer, nullable=False)
+  workflow_id = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,257 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Set based cloning of task groups with their tasks and objects.
+
+Cloning through the ORM created task groups, tasks and task group objects one
+by one, which took minutes for large workflows. Here each kind of row is
+copied with a single INSERT ... SELECT statement.
+
+New task groups get a temporary slug made of a clone token and the id of
+their source. Joining the source task groups to the new ones on that slug
+gives the mapping of source ids to new ids, which is used to copy the tasks
+and objects of each task group. The temporary slugs are replaced with
+regular ones at the end.
+
+The copied rows are loaded once at the end and added to the request cache,
+so they get revisions, fulltext records and memcache updates the same way as
+objects created through the ORM.
+"""
+
+import uuid
+
+from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import select
+
+from ggrc import db
+from ggrc.login import get_current_user_id
+from ggrc.models.background_task import get_request_task
+from ggrc.services.common import get_cache
+from ggrc_workflows.models import TaskGroup
+from ggrc_workflows.models import TaskGroupObject
+from ggrc_workflows.models import TaskGroupTask
+
+# Maximum number of ids in a single IN clause.
+QUERY_CHUNK_SIZE = 1000
+
+
+class _Cloner(object):
+  """State of a single clone operation.
+
+  Args:
+    context_id: context of the new objects.
+    clone_people: keep assignees of the source objects.
+    clone_tasks: copy task group tasks.
+    clone_objects: copy task group objects.
+  """
+
+  def __init__(self, context_id, clone_people, clone_tasks, clone_objects):
+    self.token = "CLONE-{}-".format(uuid.uuid4().hex)
+    self.context_id = context_id
+    self.clone_people = clone_people
+    self.clone_tasks = clone_tasks
+    self.clone_objects = clone_objects
+    self.user_id = get_current_user_id()
+    self.task = get_request_task()
+    # Copying task groups, slugs and logging, and the optional copies.
+    self.steps = 3 + int(clone_tasks) + int(clone_objects)
+    self.done = 0
+
+  def report_progress(self):
+    """Store progress of the background task running the clone, if any."""
+    self.done += 1
+    if self.task is not None:
+      self.task.update_progress(self.done, self.steps)
+
+  def temporary_slug(self, source_id):
+    return func.concat(self.token, source_id)
+
+  def common_values(self):
+    now = func.now()
+    return {
+        "context_id": literal(self.context_id),
+        "modified_by_id": literal(self.user_id),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+  def copy_task_groups(self, source_workflow_id, target_workflow_id):
+    """Copy task groups of a workflow.
+
+    Returns:
+      a selectable with `source_id` and `target_id` columns of the copied task
+      groups.
+    """
+    table = TaskGroup.__table__
+    values = self.common_values()
+    values.update({
+        "workflow_id": literal(target_workflow_id),
+        "title": table.c.title,
+        "description": table.c.description,
+        "sort_index": table.c.sort_index,
+        "contact_id": (table.c.contact_id if self.clone_people
+                       else literal(None)),
+        "slug": self.temporary_slug(table.c.id),
+    })
+    _insert(table, values, table, table.c.workflow_id == source_workflow_id)
+    self.report_progress()
+
+    source = table.alias("source_task_groups")
+    target = table.alias("target_task_groups")
+    return select([
+        source.c.id.label("source_id"),
+        target.c.id.label("target_id"),
+    ]).select_from(
+        source.join(target, target.c.slug == self.temporary_slug(source.c.id))
+    ).where(
+        source.c.workflow_id == source_workflow_id
+    ).alias("task_group_map")
+
+  def copy_children(self, task_group_map):
+    """Copy tasks and objects of the mapped task groups."""
+    if self.clone_tasks:
+      table = TaskGroupTask.__table__
+      values = self.common_values()
+      values.update({
+          "task_group_id": task_group_map.c.target_id,
+          "title": table.c.title,
+          "description": table.c.description,
+          "sort_index": table.c.sort_index,
+          "relative_start_month": table.c.relative_start_month,
+          "relative_start_day": table.c.relative_start_day,
+          "relative_end_month": table.c.relative_end_month,
+          "relative_end_day": table.c.relative_end_day,
+          "start_date": table.c.start_date,
+          "end_date": table.c.end_date,
+          "contact_id": (table.c.contact_id if self.clone_people
+                         else literal(self.user_id)),
+          "task_type": table.c.task_type,
+          "response_options": table.c.response_options,
+          "object_approval": false(),
+          "slug": self.temporary_slug(table.c.id),
+      })
+      _insert(table, values, table.join(
+          task_group_map,
+          table.c.task_group_id == task_group_map.c.source_id))
+      self.report_progress()
+
+    if self.clone_objects:
+      table = TaskGroupObject.__table__
+      values = self.common_values()
+      values.update({
+          "task_group_id": task_group_map.c.target_id,
+          "object_id": table.c.object_id,
+          "object_type": table.c.object_type,
+          # Defaults of the ORM are not applied to INSERT ... SELECT, and
+          # the ORM copy did not keep the status of the source object.
+          "status": literal(TaskGroupObject.default_status()),
+      })
+      _insert(table, values, table.join(
+          task_group_map,
+          table.c.task_group_id == task_group_map.c.source_id))
+      self.report_progress()
+
+  def finalize_slugs(self, model):
+    """Replace temporary slugs with the slugs the ORM would generate.
+
+    Slugs that are already taken are generated through the ORM, which looks
+    for the next free one.
+    """
+    table = model.__table__
+    is_temporary = table.c.slug.like(self.token + "%")
+    new_ids = [id_ for id_, in db.session.execute(
+        select([table.c.id]).where(is_temporary))]
+    if not new_ids:
+      return
+    prefix = model.generate_slug_prefix_for(model.query.get(new_ids[0]))
+    slug = func.concat(prefix, "-", table.c.id)
+    other = table.alias("other")
+    conflicts = [id_ for id_, in db.session.execute(
+        select([table.c.id]).select_from(
+            table.join(other, other.c.slug == slug)
+        ).where(is_temporary))]
+    update = table.update().where(is_temporary)
+    if conflicts:
+      update = update.where(table.c.id.notin_(conflicts))
+    db.session.execute(update.values(slug=slug))
+    for id_ in conflicts:
+      model.generate_slug_for(model.query.get(id_))
+
+  def finish(self, task_group_ids, models):
+    """Finalize slugs and add the copied objects to the request cache.
+
+    Args:
+      task_group_ids: ids of task groups that received copies.
+      models: models whose copies are added to the cache.
+    """
+    for model in (TaskGroup, TaskGroupTask):
+      self.finalize_slugs(model)
+    cache = get_cache()
+    if cache is not None:
+      task_group_ids = sorted(task_group_ids)
+      for model in models:
+        column = model.id if model is TaskGroup else model.task_group_id
+        for i in range(0, len(task_group_ids), QUERY_CHUNK_SIZE):
+          chunk = task_group_ids[i:i + QUERY_CHUNK_SIZE]
+          for obj in model.eager_query().filter(column.in_(chunk)):
+            cache.new[obj] = obj.log_json()
+    self.report_progress()
+
+
+def _insert(table, values, from_obj, where=None):
+  """Run INSERT ... SELECT into table with values for its columns."""
+  names = sorted(values)
+  query = select([values[name] for name in names]).select_from(from_obj)
+  if where is not None:
+    query = query.where(where)
+  db.session.execute(table.insert().from_select(names, query))
+
+
+def _get_copied_models(clone_tasks, clone_objects):
+  models = []
+  if clone_tasks:
+    models.append(TaskGroupTask)
+  if clone_objects:
+    models.append(TaskGroupObject)
+  return models
+
+
+def clone_task_groups(source_workflow, target_workflow, clone_people=False,
+                      clone_tasks=False, clone_objects=False):
+  """Copy all task groups of a workflow into another workflow.
+
+  When the request runs as a background task, its progress is updated after
+  each step.
+  """
+  db.session.flush()
+  cloner = _Cloner(target_workflow.context_id, clone_people, clone_tasks,
+                   clone_objects)
+  task_group_map = cloner.copy_task_groups(
+      source_workflow.id, target_workflow.id)
+  cloner.copy_children(task_group_map)
+  task_group_ids = [target_id for target_id, in db.session.execute(
+      select([task_group_map.c.target_id]))]
+  cloner.finish(task_group_ids, [TaskGroup] + _get_copied_models(
+      clone_tasks, clone_objects))
+  db.session.expire(target_workflow, ["task_groups"])
+
+
+def clone_task_group_children(source_task_group, target_task_group,
+                              clone_people=False, clone_tasks=False,
+                              clone_objects=False):
+  """Copy tasks and objects of a task group into another task group."""
+  db.session.flush()
+  cloner = _Cloner(target_task_group.context_id, clone_people, clone_tasks,
+                   clone_objects)
+  cloner.report_progress()
+  task_group_map = select([
+      literal(source_task_group.id).label("source_id"),
+      literal(target_task_group.id).label("target_id"),
+  ]).alias("task_group_map")
+  cloner.copy_children(task_group_map)
+  cloner.finish([target_task_group.id], _get_copied_models(
+      clone_tasks, clone_objects))
+  db.session.expire(target_task_group,
+                    ["task_group_tasks", "task_group_objects"])
@@ -0,0 +1,155 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Objects mapped to cycle tasks together with the ancestors of the tasks.
+
+Relevant filters on workflows, cycles and cycle task groups look for objects
+mapped to their cycle tasks. Instead of joining relationships in both
+directions with cycle tasks and cycles for each lookup, the mapped objects
+of each task are stored in `workflow_object_closure` together with the ids
+of the cycle task group, cycle and workflow of the task.
+
+Rows of a task are rebuilt in the same transaction whenever a flush adds or
+removes a relationship of the task, which also covers the mappings created
+when a cycle is built. Rows of deleted tasks are removed by the foreign key.
+Relationships that are changed without the session, for instance by bulk
+deletes, are repaired by a batched nightly consistency check.
+"""
+
+from sqlalchemy import and_
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import union
+from sqlalchemy.orm.session import Session
+
+from ggrc import cron
+from ggrc import db
+from ggrc.models.relationship import Relationship
+from ggrc_workflows.models import Cycle
+from ggrc_workflows.models import CycleTaskGroupObjectTask as CycleTask
+from ggrc_workflows.models import WorkflowObjectClosure
+
+# Maximum number of task ids in a single IN clause.
+QUERY_CHUNK_SIZE = 1000
+
+_COLUMNS = ("workflow_id", "cycle_id", "cycle_task_group_id",
+            "cycle_task_id", "object_type", "object_id")
+
+_TASK_TYPE = CycleTask.__name__
+
+
+def _mapped_objects_select(task_side, object_side, task_ids):
+  """Select closure rows of objects on one side of relationships.
+
+  Args:
+    task_side: "source" or "destination", the side of the cycle tasks.
+    object_side: the other side of the relationships.
+    task_ids: ids of tasks whose rows are selected, or None for all tasks.
+  """
+  table = Relationship.__table__
+  columns = [
+      Cycle.workflow_id,
+      CycleTask.cycle_id,
+      CycleTask.cycle_task_group_id,
+      CycleTask.id,
+      table.c[object_side + "_type"],
+      table.c[object_side + "_id"],
+  ]
+  query = select([
+      column.label(name) for column, name in zip(columns, _COLUMNS)
+  ]).select_from(
+      table.join(
+          CycleTask.__table__, and_(
+              table.c[task_side + "_type"] == _TASK_TYPE,
+              table.c[task_side + "_id"] == CycleTask.id,
+          )
+      ).join(Cycle.__table__, Cycle.id == CycleTask.cycle_id)
+  )
+  if task_ids is not None:
+    query = query.where(CycleTask.id.in_(task_ids))
+  return query
+
+
+def closure_select(task_ids=None):
+  """Select closure rows from relationships of cycle tasks.
+
+  Args:
+    task_ids: ids of tasks whose rows are selected, or None for all tasks.
+  """
+  # The union is wrapped in a named subquery, since MySQL rejects the unnamed
+  # one that INSERT ... SELECT would get otherwise.
+  return select([union(
+      _mapped_objects_select("source", "destination", task_ids),
+      _mapped_objects_select("destination", "source", task_ids),
+  ).alias("mapped_objects")])
+
+
+def refresh_tasks(session, task_ids):
+  """Rebuild closure rows of the given tasks."""
+  task_ids = sorted(task_id for task_id in set(task_ids) if task_id)
+  table = WorkflowObjectClosure.__table__
+  for i in range(0, len(task_ids), QUERY_CHUNK_SIZE):
+    chunk = task_ids[i:i + QUERY_CHUNK_SIZE]
+    session.execute(table.delete().where(table.c.cycle_task_id.in_(chunk)))
+    session.execute(table.insert().from_select(
+        _COLUMNS, closure_select(chunk)))
+
+
+def _get_rows(session, query):
+  return {tuple(row) for row in session.execute(query)}
+
+
+def _find_mismatched_tasks(session, task_ids):
+  """Get ids of tasks with stored rows that differ from relationships."""
+  table = WorkflowObjectClosure.__table__
+  stored = _get_rows(session, select(
+      [table.c[column] for column in _COLUMNS]
+  ).where(table.c.cycle_task_id.in_(task_ids)))
+  expected = _get_rows(session, closure_select(task_ids))
+  # The task id is the fourth column of each row.
+  return {row[3] for row in stored.symmetric_difference(expected)}
+
+
+@cron.batched
+def check_workflow_object_closure(cursor=None):
+  """Repair closure rows that do not match the relationships of tasks.
+
+  This is the nightly consistency check. Each call compares one chunk of
+  tasks and commits the repairs.
+
+  Args:
+    cursor: id of the last task checked by the previous call.
+
+  Returns:
+    id of the last checked task, or None when all tasks have been checked.
+  """
+  query = db.session.query(CycleTask.id).order_by(CycleTask.id)
+  if cursor is not None:
+    query = query.filter(CycleTask.id > cursor)
+  task_ids = [task_id for task_id, in query.limit(QUERY_CHUNK_SIZE)]
+  if not task_ids:
+    return None
+  refresh_tasks(db.session, _find_mismatched_tasks(db.session, task_ids))
+  db.session.commit()
+  return task_ids[-1]
+
+
+def _get_task_ids(relationship):
+  """Get ids of cycle tasks on either side of a relationship."""
+  if relationship.source_type == _TASK_TYPE:
+    yield relationship.source_id
+  if relationship.destination_type == _TASK_TYPE:
+    yield relationship.destination_id
+
+
+def update_closure_after_flush(session, _):
+  """Rebuild closure rows of tasks whose relationships were flushed."""
+  task_ids = set()
+  for objects in (session.new, session.dirty, session.deleted):
+    for obj in objects:
+      if isinstance(obj, Relationship):
+        task_ids.update(_get_task_ids(obj))
+  refresh_tasks(session, task_ids)
+
+
+event.listen(Session, "after_flush", update_closure_after_flush)
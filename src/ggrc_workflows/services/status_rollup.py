@@ -0,0 +1,171 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Counters of child statuses for cycle task groups and cycles.
+
+The status of a cycle task group follows the statuses of its tasks and the
+status of a cycle follows the statuses of its task groups. Instead of loading
+all children of a parent whenever one of them changes, the statuses of the
+children of a parent are loaded once per transaction with a single projection
+and the counters are then updated on each recorded status transition. The
+status of the parent is decided from the counters alone.
+
+Counters are kept for the current request and dropped on every commit and
+rollback. The counter of a parent is also dropped when a flush adds or
+deletes one of its children, it is loaded again when it is needed next.
+"""
+
+import collections
+import itertools
+
+from flask import g
+from flask import has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+
+from ggrc import db
+from ggrc_workflows import models
+
+# Name of the parent attribute of each child model.
+PARENT_ATTRS = {
+    models.CycleTaskGroupObjectTask: "cycle_task_group",
+    models.CycleTaskGroup: "cycle",
+}
+
+# Name of the parent id column of each child model.
+PARENT_ID_COLUMNS = {
+    models.CycleTaskGroupObjectTask: "cycle_task_group_id",
+    models.CycleTaskGroup: "cycle_id",
+}
+
+# Child statuses that make the parent `InProgress`.
+IN_PROGRESS_STATUSES = ("InProgress", "Declined")
+
+# Statuses that the parent takes over when all children have them.
+SHARED_STATUSES = ("Verified", "Finished", "Assigned")
+
+
+class StatusRollup(object):
+  """Status counters of children of cycle task groups and cycles."""
+
+  def __init__(self):
+    self._counters = {}
+    self._statuses = {}
+
+  def clear(self):
+    self._counters.clear()
+    self._statuses.clear()
+
+  def _load(self, child_model, parent_id):
+    """Load statuses of all children of a parent."""
+    counter = collections.Counter()
+    parent_column = getattr(child_model, PARENT_ID_COLUMNS[child_model])
+    rows = db.session.query(child_model.id, child_model.status).filter(
+        parent_column == parent_id)
+    for child_id, status in rows:
+      counter[status] += 1
+      self._statuses[child_model, child_id] = status
+    self._counters[child_model, parent_id] = counter
+    return counter
+
+  def forget(self, child):
+    """Drop the counter of the parent of a child that is added or deleted."""
+    child_model = type(child)
+    parent_id = getattr(child, PARENT_ID_COLUMNS[child_model])
+    if parent_id is None:
+      parent = getattr(child, PARENT_ATTRS[child_model])
+      parent_id = parent.id if parent is not None else None
+    self._counters.pop((child_model, parent_id), None)
+    self._statuses.pop((child_model, child.id), None)
+
+  def _count(self, counter, child):
+    """Move a child to its current status in the counter of its parent."""
+    key = (type(child), child.id)
+    old_status = self._statuses.get(key)
+    if key in self._statuses and old_status == child.status:
+      return
+    if key in self._statuses:
+      counter[old_status] -= 1
+    counter[child.status] += 1
+    self._statuses[key] = child.status
+
+  def record(self, child, parent):
+    """Record the current status of a child whose parent counters are kept.
+
+    Counters that are not loaded yet are left alone, they will see the new
+    status when they are loaded.
+    """
+    counter = self._counters.get((type(child), parent.id))
+    if counter is not None:
+      self._count(counter, child)
+
+  def get_counter(self, child, parent):
+    """Get status counts of all children of the parent of child."""
+    if parent.id is None:
+      db.session.flush()
+    counter = self._counters.get((type(child), parent.id))
+    if counter is None:
+      # Loading flushes the session, so the counter already contains the
+      # current status of child.
+      counter = self._load(type(child), parent.id)
+    self._count(counter, child)
+    return counter
+
+  def get_parent_status(self, child, parent):
+    """Get the status that the parent of child should have after its change.
+
+    Returns:
+      the new parent status or None if the change of child does not affect
+      the parent.
+    """
+    if child.status not in SHARED_STATUSES:
+      self.record(child, parent)
+      if child.status in IN_PROGRESS_STATUSES:
+        return "InProgress"
+      return None
+    counter = self.get_counter(child, parent)
+    total = sum(counter.values())
+    for status in SHARED_STATUSES:
+      if counter[status] == total:
+        return status
+    return None
+
+
+def get_status_rollup():
+  """Get status counters for the current request.
+
+  Outside of a request context new counters are returned, so nothing is
+  cached between unrelated calls.
+  """
+  if not has_request_context():
+    return StatusRollup()
+  rollup = getattr(g, "cycle_status_rollup", None)
+  if rollup is None:
+    rollup = g.cycle_status_rollup = StatusRollup()
+  return rollup
+
+
+def clear_status_rollup(*_):
+  """Drop status counters of the current request."""
+  if has_request_context():
+    rollup = getattr(g, "cycle_status_rollup", None)
+    if rollup is not None:
+      rollup.clear()
+
+
+def forget_changed_parents(session, *_):
+  """Drop status counters of parents that get new or deleted children."""
+  if not has_request_context():
+    return
+  rollup = getattr(g, "cycle_status_rollup", None)
+  if rollup is None:
+    return
+  with session.no_autoflush:
+    for obj in itertools.chain(session.new, session.deleted):
+      if type(obj) in PARENT_ID_COLUMNS:
+        rollup.forget(obj)
+
+
+event.listen(Session, "before_flush", forget_changed_parents)
+event.listen(Session, "after_commit", clear_status_rollup)
+event.listen(Session, "after_rollback", clear_status_rollup)
@@ -0,0 +1,183 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Per person counters of open and overdue cycle tasks.
+
+The task count badge is shown on every page, so the counts of each person are
+stored in `user_task_counts` and the badge only needs a primary key lookup.
+
+Counts of a person are recomputed in the same transaction whenever a flush
+changes the status, assignee or end date of one of their tasks, or the
+`is_current` flag of a cycle with their tasks. Tasks become overdue as days
+pass without any change, so all counts are also recomputed by a nightly cron
+job. Counts that were not computed today are ignored and computed on the fly.
+"""
+
+from datetime import date
+
+from sqlalchemy import and_
+from sqlalchemy import case
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from ggrc import db
+from ggrc.models.person import Person
+from ggrc_workflows.models import Cycle
+from ggrc_workflows.models import CycleTaskGroupObjectTask
+from ggrc_workflows.models import UserTaskCount
+
+# Statuses of tasks counted in the badge.
+OPEN_STATUSES = ("Assigned", "InProgress", "Finished", "Declined")
+
+# Task attributes that affect the counts.
+TASK_ATTRS = ("status", "contact", "contact_id", "end_date", "cycle_id")
+
+_UPSERT_COUNTS = text(
+    "INSERT INTO user_task_counts "
+    "(person_id, task_count, overdue_count, computed_on) "
+    "VALUES (:person_id, :task_count, :overdue_count, :computed_on) "
+    "ON DUPLICATE KEY UPDATE task_count = VALUES(task_count), "
+    "overdue_count = VALUES(overdue_count), "
+    "computed_on = VALUES(computed_on)"
+)
+
+
+def count_tasks(session, today, person_ids=None):
+  """Count open and overdue tasks in current cycles.
+
+  Args:
+    session: session used for the query.
+    today: date for deciding which tasks are overdue.
+    person_ids: ids of people whose tasks are counted, or None for everyone.
+
+  Returns:
+    dict with (task_count, overdue_count) for people that have open tasks.
+  """
+  task = CycleTaskGroupObjectTask
+  query = session.query(
+      task.contact_id,
+      func.count(task.id),
+      func.sum(case([(task.end_date < today, 1)], else_=0)),
+  ).join(
+      Cycle, task.cycle_id == Cycle.id
+  ).filter(
+      task.status.in_(OPEN_STATUSES),
+      Cycle.is_current == True  # noqa # pylint: disable=singleton-comparison
+  ).group_by(task.contact_id)
+  if person_ids is not None:
+    query = query.filter(task.contact_id.in_(person_ids))
+  return {person_id: (task_count, int(overdue_count or 0))
+          for person_id, task_count, overdue_count in query}
+
+
+def refresh_task_counts(session, person_ids):
+  """Store current counts of the given people."""
+  person_ids = [person_id for person_id in person_ids if person_id]
+  if not person_ids:
+    return
+  today = date.today()
+  counts = count_tasks(session, today, person_ids)
+  session.execute(_UPSERT_COUNTS, [{
+      "person_id": person_id,
+      "task_count": counts.get(person_id, (0, 0))[0],
+      "overdue_count": counts.get(person_id, (0, 0))[1],
+      "computed_on": today,
+  } for person_id in person_ids])
+
+
+def refresh_all_task_counts():
+  """Recompute counts of all people.
+
+  This is the nightly reconciliation job. It also moves tasks that became
+  overdue since the last run into the overdue counts.
+  """
+  today = date.today()
+  table = UserTaskCount.__table__
+  db.session.execute(table.delete())
+  counts = count_tasks(db.session, today)
+  person_ids = [person_id for person_id, in db.session.query(Person.id)]
+  if person_ids:
+    db.session.execute(table.insert(), [{
+        "person_id": person_id,
+        "task_count": counts.get(person_id, (0, 0))[0],
+        "overdue_count": counts.get(person_id, (0, 0))[1],
+        "computed_on": today,
+    } for person_id in person_ids])
+  db.session.commit()
+
+
+def get_task_count(person_id):
+  """Get the numbers of open and overdue tasks of a person.
+
+  Returns:
+    list with the task count and the overdue task count.
+  """
+  row = db.session.query(
+      UserTaskCount.task_count,
+      UserTaskCount.overdue_count,
+      UserTaskCount.computed_on,
+  ).filter(UserTaskCount.person_id == person_id).first()
+  today = date.today()
+  if row is not None and row.computed_on == today:
+    return [row.task_count, row.overdue_count]
+  return list(count_tasks(db.session, today, [person_id])
+              .get(person_id, (0, 0)))
+
+
+def _has_changes(obj, attrs):
+  state = inspect(obj)
+  return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _get_old_contact_id(task):
+  """Get the id of the assignee of a task before the flush."""
+  state = inspect(task)
+  contacts = state.attrs["contact"].history.deleted
+  if contacts:
+    return contacts[0].id if contacts[0] is not None else None
+  contact_ids = state.attrs["contact_id"].history.deleted
+  if contact_ids:
+    return contact_ids[0]
+  return task.contact_id
+
+
+def _get_affected_people(session):
+  """Get ids of people whose counts could be changed by a flush.
+
+  This is called after the flush, while the session still holds the flushed
+  objects and their attribute history.
+  """
+  person_ids = set()
+  cycle_ids = set()
+  for obj in session.new:
+    if isinstance(obj, CycleTaskGroupObjectTask):
+      person_ids.add(obj.contact_id)
+  for obj in session.dirty:
+    if isinstance(obj, CycleTaskGroupObjectTask) and \
+       _has_changes(obj, TASK_ATTRS):
+      person_ids.add(_get_old_contact_id(obj))
+      person_ids.add(obj.contact_id)
+    elif isinstance(obj, Cycle) and _has_changes(obj, ("is_current",)):
+      cycle_ids.add(obj.id)
+  for obj in session.deleted:
+    if isinstance(obj, CycleTaskGroupObjectTask):
+      person_ids.add(_get_old_contact_id(obj))
+  if cycle_ids:
+    task = CycleTaskGroupObjectTask
+    person_ids.update(person_id for person_id, in session.query(
+        task.contact_id
+    ).filter(
+        and_(task.cycle_id.in_(cycle_ids), task.contact_id.isnot(None))
+    ).distinct())
+  return person_ids
+
+
+def update_task_counts_after_flush(session, _):
+  """Store new counts of people whose tasks were changed by the flush."""
+  refresh_task_counts(session, _get_affected_people(session))
+
+
+event.listen(Session, "after_flush", update_task_counts_after_flush)
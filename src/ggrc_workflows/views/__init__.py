@@ -16,36 +16,15 @@ from ggrc.utils import benchmark
 from ggrc.views.cron import run_job
 
 from ggrc_workflows import start_recurring_cycles
-from ggrc_workflows.models import Cycle
-from ggrc_workflows.models import CycleTaskGroupObjectTask
 from ggrc_workflows.models import Workflow
+from ggrc_workflows.services import task_counts
 
 
 def get_user_task_count():
-  with benchmark("Get user task count RAW"):
-    current_user = get_current_user()
-
-    user_tasks = CycleTaskGroupObjectTask.query.with_entities(
-        # prefetch tasks' finishing dates to avoid firing subsequent queries
-        CycleTaskGroupObjectTask.end_date
-    ).join(
-        Cycle
-    ).filter(
-        CycleTaskGroupObjectTask.contact_id == current_user.id,
-        CycleTaskGroupObjectTask.status.in_(
-            ["Assigned", "InProgress", "Finished", "Declined"]),
-        Cycle.is_current == True  # noqa # pylint: disable=singleton-comparison
-    ).all()
-
-    task_count = len(user_tasks)
-
-    today = date.today()
-    overdue_count = sum(
-        1 for task in user_tasks if task.end_date and today > task.end_date)
-
+  with benchmark("Get user task count"):
     # NOTE: the return value must be a list so that the result can be
     # directly JSON-serialized to an Array in a HAML template
-    return [task_count, overdue_count]
+    return task_counts.get_task_count(get_current_user().id)
 
 
 @app.context_processor
@@ -0,0 +1,13 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Offline performance benchmarks.
+
+The benchmarks generate a synthetic dataset of a given scale in the test
+database and run the most expensive requests against it in-process through
+the Flask test client. Each scenario reports timings and database query
+counts as JSON, so that results can be compared across commits.
+
+Usage:
+  bin/run_benchmarks --scale 10000 --output results.json
+"""
@@ -0,0 +1,197 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Synthetic dataset for benchmarks.
+
+Creating objects through the API or with factories takes too long for
+datasets with hundreds of thousands of objects, so the dataset is written
+with bulk inserts. Ids are assigned upfront so that relationships, custom
+attribute values and fulltext records can be inserted without reading the
+objects back.
+
+The generated object graph follows the automapping hierarchy:
+
+  Program <- Regulation <- Objective <- Control -> Regulation
+"""
+
+import datetime
+
+from sqlalchemy import func
+
+from ggrc import db
+from ggrc import models
+from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.models.relationship_edge import refresh_edges
+from ggrc_basic_permissions import models as permissions_models
+
+INSERT_CHUNK_SIZE = 5000
+
+
+class Dataset(object):
+  """Bulk generated benchmark data.
+
+  Attributes:
+    scale: number of generated programs, regulations, objectives and
+      controls together.
+    ids: dict with lists of generated ids for each object type.
+    creator: email of a Creator user that owns some of the controls.
+    counts: dict with the number of inserted rows for each table.
+  """
+  # pylint: disable=too-many-instance-attributes
+
+  PREFIX = "BENCHMARK"
+
+  def __init__(self, scale, ca_definitions=5):
+    self.scale = scale
+    self.ca_definitions = ca_definitions
+    self.ids = {}
+    self.creator = "benchmark.creator@example.com"
+    self.counts = {}
+    self._now = datetime.datetime.utcnow()
+
+  def generate(self):
+    """Generate all dataset objects."""
+    programs = max(1, self.scale // 100)
+    regulations = max(1, self.scale // 20)
+    objectives = max(1, self.scale // 4)
+    controls = max(1, self.scale - programs - regulations - objectives)
+
+    self._generate_people(max(5, self.scale // 1000))
+    self._generate_objects(models.Program, programs)
+    self._generate_objects(models.Regulation, regulations,
+                           meta_kind="Regulation", kind="Regulation")
+    self._generate_objects(models.Objective, objectives)
+    self._generate_objects(models.Control, controls)
+    self._generate_relationships()
+    self._generate_custom_attributes()
+    self._generate_permissions()
+    db.session.commit()
+    return self
+
+  def _insert(self, table, rows):
+    """Insert rows into table in chunks."""
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+      db.engine.execute(table.insert(),
+                        rows[start:start + INSERT_CHUNK_SIZE])
+    self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+  @staticmethod
+  def _next_ids(model, count):
+    """Get ids for count new rows of the model table."""
+    start = (db.session.query(func.max(model.id)).scalar() or 0) + 1
+    return range(start, start + count)
+
+  def _generate_people(self, count):
+    """Generate people and the creator user."""
+    ids = self._next_ids(models.Person, count + 1)
+    rows = [{
+        "id": id_,
+        "name": "{} person {}".format(self.PREFIX, id_),
+        "email": "benchmark.person.{}@example.com".format(id_),
+    } for id_ in ids[1:]]
+    rows.append({
+        "id": ids[0],
+        "name": "{} creator".format(self.PREFIX),
+        "email": self.creator,
+    })
+    self._insert(models.Person.__table__, rows)
+    self.ids["Person"] = ids
+
+  def _generate_objects(self, model, count, **extra):
+    """Generate titled and slugged objects with their fulltext records."""
+    ids = self._next_ids(model, count)
+    rows = []
+    for id_ in ids:
+      row = {
+          "id": id_,
+          "title": "{} {} {}".format(self.PREFIX, model.__name__, id_),
+          "slug": "{}-{}-{}".format(self.PREFIX, model.__name__, id_),
+          "created_at": self._now,
+          "updated_at": self._now,
+      }
+      row.update(extra)
+      rows.append(row)
+    self._insert(model.__table__, rows)
+    self._insert(MysqlRecordProperty.__table__, [{
+        "key": object_row["id"],
+        "type": model.__name__,
+        "context_id": None,
+        "tags": "",
+        "property": "title",
+        "content": object_row["title"],
+    } for object_row in rows])
+    self.ids[model.__name__] = ids
+
+  def _relationship_rows(self, sources, source_type, destinations,
+                         destination_type):
+    """Relate each source to a destination in a round robin fashion."""
+    return [{
+        "source_id": source_id,
+        "source_type": source_type,
+        "destination_id": destinations[i % len(destinations)],
+        "destination_type": destination_type,
+        "created_at": self._now,
+        "updated_at": self._now,
+    } for i, source_id in enumerate(sources)]
+
+  def _generate_relationships(self):
+    """Generate relationships along the automapping hierarchy."""
+    rows = []
+    rows.extend(self._relationship_rows(
+        self.ids["Regulation"], "Regulation", self.ids["Program"], "Program"))
+    rows.extend(self._relationship_rows(
+        self.ids["Objective"], "Objective",
+        self.ids["Regulation"], "Regulation"))
+    rows.extend(self._relationship_rows(
+        self.ids["Control"], "Control", self.ids["Objective"], "Objective"))
+    rows.extend(self._relationship_rows(
+        self.ids["Control"], "Control", self.ids["Regulation"], "Regulation"))
+    ids = self._next_ids(models.Relationship, len(rows))
+    for id_, row in zip(ids, rows):
+      row["id"] = id_
+    self._insert(models.Relationship.__table__, rows)
+    # The bulk insert bypasses the flush hook that maintains the edges.
+    refresh_edges(db.session, ids)
+    self.ids["Relationship"] = ids
+
+  def _generate_custom_attributes(self):
+    """Generate text custom attributes with a value for each control."""
+    definition_ids = self._next_ids(models.CustomAttributeDefinition,
+                                    self.ca_definitions)
+    self._insert(models.CustomAttributeDefinition.__table__, [{
+        "id": id_,
+        "title": "{} CA {}".format(self.PREFIX, id_),
+        "definition_type": "control",
+        "attribute_type": "Text",
+        "created_at": self._now,
+        "updated_at": self._now,
+    } for id_ in definition_ids])
+    for definition_id in definition_ids:
+      self._insert(models.CustomAttributeValue.__table__, [{
+          "custom_attribute_id": definition_id,
+          "attributable_id": control_id,
+          "attributable_type": "Control",
+          "attribute_value": "value {}".format(control_id),
+          "created_at": self._now,
+          "updated_at": self._now,
+      } for control_id in self.ids["Control"]])
+    self.ids["CustomAttributeDefinition"] = definition_ids
+
+  def _generate_permissions(self):
+    """Make the creator a Creator that owns every tenth control."""
+    role = permissions_models.Role.query.filter_by(name="Creator").one()
+    creator_id = self.ids["Person"][0]
+    self._insert(permissions_models.UserRole.__table__, [{
+        "role_id": role.id,
+        "person_id": creator_id,
+        "context_id": None,
+        "created_at": self._now,
+        "updated_at": self._now,
+    }])
+    self._insert(models.ObjectOwner.__table__, [{
+        "person_id": creator_id,
+        "ownable_id": control_id,
+        "ownable_type": "Control",
+        "created_at": self._now,
+        "updated_at": self._now,
+    } for control_id in self.ids["Control"][::10]])
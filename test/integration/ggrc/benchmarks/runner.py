@@ -0,0 +1,142 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Benchmark runner.
+
+Generates the dataset, runs the scenarios and prints the results as JSON:
+
+  {
+    "commit": "<git revision>",
+    "database": "mysql",
+    "scale": 10000,
+    "setup": {"seconds": ..., "rows": {<table>: <row count>}},
+    "results": [
+      {"name": "query", "runs": 5, "min": ..., "max": ..., "mean": ...,
+       "median": ..., "queries": ...},
+      ...
+    ]
+  }
+
+Times are in seconds. "queries" is the number of database queries of the
+last run.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.utils import QueryCounter
+
+from integration.ggrc import TestCase
+from integration.ggrc.benchmarks import scenarios
+from integration.ggrc.benchmarks.dataset import Dataset
+
+
+class Runner(object):
+  """Run benchmark scenarios and collect their timings."""
+
+  json_headers = {
+      "Content-Type": "application/json",
+      "X-Requested-By": "gGRC",
+  }
+
+  def __init__(self, dataset, repeat=5):
+    self.dataset = dataset
+    self.repeat = repeat
+    self.run_index = 0
+    self.client = app.test_client()
+    self.client.get("/login")
+
+  def run_scenario(self, scenario):
+    """Run a scenario repeatedly and summarize its timings."""
+    durations = []
+    queries = 0
+    for self.run_index in range(self.repeat):
+      with QueryCounter() as counter:
+        start = time.time()
+        scenario(self, self.dataset)
+        durations.append(time.time() - start)
+        queries = counter.get
+      db.session.remove()
+    durations.sort()
+    return {
+        "name": scenario.__name__,
+        "runs": len(durations),
+        "min": durations[0],
+        "max": durations[-1],
+        "mean": sum(durations) / len(durations),
+        "median": durations[len(durations) // 2],
+        "queries": queries,
+    }
+
+  def run(self, names=None):
+    """Run all scenarios or the ones with given names."""
+    return [self.run_scenario(scenario) for scenario in scenarios.SCENARIOS
+            if not names or scenario.__name__ in names]
+
+
+def get_revision():
+  """Get the current git revision if available."""
+  try:
+    return subprocess.check_output(
+        ["git", "rev-parse", "HEAD"], stderr=subprocess.STDOUT).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def run_benchmarks(scale, repeat=5, names=None, ca_definitions=5):
+  """Generate a fresh dataset and run the benchmarks on it.
+
+  Args:
+    scale: number of generated objects.
+    repeat: number of runs of each scenario.
+    names: names of scenarios to run, all scenarios if empty.
+    ca_definitions: number of custom attributes of each control.
+
+  Returns:
+    dict with the benchmark results.
+  """
+  app.testing = True
+  with app.app_context():
+    start = time.time()
+    TestCase.clear_data()
+    dataset = Dataset(scale, ca_definitions=ca_definitions).generate()
+    setup_seconds = time.time() - start
+    results = Runner(dataset, repeat=repeat).run(names)
+  return {
+      "commit": get_revision(),
+      "database": settings.SQLALCHEMY_DATABASE_URI.split(":")[0],
+      "scale": scale,
+      "setup": {"seconds": setup_seconds, "rows": dataset.counts},
+      "results": results,
+  }
+
+
+def main():
+  """Parse arguments, run benchmarks and write the results."""
+  parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+  parser.add_argument("--scale", type=int, default=10000,
+                      help="number of generated objects")
+  parser.add_argument("--repeat", type=int, default=5,
+                      help="number of runs of each scenario")
+  parser.add_argument("--ca-definitions", type=int, default=5,
+                      help="number of custom attributes on controls")
+  parser.add_argument("--output", default=None,
+                      help="file for the JSON results, stdout by default")
+  parser.add_argument("scenarios", nargs="*",
+                      help="names of scenarios to run, all by default")
+  args = parser.parse_args()
+  results = run_benchmarks(args.scale, args.repeat, args.scenarios,
+                           args.ca_definitions)
+  output = open(args.output, "w") if args.output else sys.stdout
+  json.dump(results, output, indent=2, sort_keys=True)
+  output.write("\n")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,263 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Benchmark scenarios.
+
+Each scenario is a function that gets the benchmark runner and the dataset
+and makes one measured call. Scenarios that go through the API use the
+runner's test client, so the whole request handling is included in the
+measurement.
+"""
+
+import csv
+import datetime
+import json
+import StringIO
+
+from ggrc.app import app
+from ggrc.models import all_models
+from ggrc.models.relationship_helper import RelationshipHelper
+from ggrc.utils import encoders
+from ggrc.utils import iter_json
+from ggrc_basic_permissions import load_permissions_for
+
+PAGE_SIZE = 100
+ENCODED_OBJECTS = 5000
+
+_collections = {}
+
+
+class ScenarioError(Exception):
+  """Raised when a scenario request does not succeed."""
+
+
+def _check(response):
+  if response.status_code != 200:
+    raise ScenarioError("{} {}".format(response.status_code, response.data))
+  return response
+
+
+def _check_not_empty(result, description):
+  """Make sure a scenario measured a call that found something."""
+  if not result:
+    raise ScenarioError("No {}".format(description))
+  return result
+
+
+def _get_json(response):
+  return json.loads(_check(response).data)
+
+
+def collection_get(runner, dataset):
+  """Get one page of full control objects."""
+  ids = ",".join(str(id_) for id_ in dataset.ids["Control"][:PAGE_SIZE])
+  data = _get_json(runner.client.get("/api/controls?ids={}".format(ids)))
+  _check_not_empty(data["controls_collection"]["controls"], "controls")
+
+
+def collection_stubs(runner, dataset):
+  """Get stubs of all regulations."""
+  # pylint: disable=unused-argument
+  data = _get_json(runner.client.get("/api/regulations?__stubs_only=true"))
+  _check_not_empty(data["regulations_collection"]["regulations"],
+                   "regulations")
+
+
+def query(runner, dataset):
+  """Query controls relevant to objectives of a program."""
+  data = [{
+      "object_name": "Regulation",
+      "type": "ids",
+      "filters": {"expression": {
+          "object_name": "Program",
+          "op": {"name": "relevant"},
+          "ids": [dataset.ids["Program"][0]],
+      }},
+  }, {
+      "object_name": "Control",
+      "type": "values",
+      "limit": [0, PAGE_SIZE],
+      "filters": {"expression": {
+          "object_name": "__previous__",
+          "op": {"name": "relevant"},
+          "ids": ["0"],
+      }},
+  }, {
+      "object_name": "Control",
+      "type": "count",
+      "filters": {"expression": {
+          "object_name": "__previous__",
+          "op": {"name": "relevant"},
+          "ids": ["0"],
+      }},
+  }]
+  results = _get_json(runner.client.post("/query", data=json.dumps(data),
+                                         headers=runner.json_headers))
+  _check_not_empty(results[2]["Control"]["count"], "relevant controls")
+
+
+def search(runner, dataset):
+  """Count search results for all object types."""
+  # pylint: disable=unused-argument
+  data = _get_json(runner.client.get(
+      "/search?q={}&types=Program,Regulation,Objective,Control"
+      "&counts_only=true".format(dataset.PREFIX)))
+  _check_not_empty(sum(data["results"]["counts"].values()), "search results")
+
+
+def export_csv(runner, dataset):
+  """Export controls of the first regulation."""
+  data = [{
+      "object_name": "Control",
+      "fields": "all",
+      "filters": {"expression": {
+          "object_name": "Regulation",
+          "op": {"name": "relevant"},
+          "ids": [dataset.ids["Regulation"][0]],
+      }},
+  }]
+  headers = dict(runner.json_headers)
+  headers["X-export-view"] = "blocks"
+  response = _check(runner.client.post(
+      "/_service/export_csv", data=json.dumps(data), headers=headers))
+  _check_not_empty("{}-Control-".format(dataset.PREFIX) in response.data,
+                   "exported controls")
+
+
+def import_csv(runner, dataset):
+  """Update titles and custom attributes of a page of controls."""
+  ca_titles = ["{} CA {}".format(dataset.PREFIX, id_)
+               for id_ in dataset.ids["CustomAttributeDefinition"]]
+  output = StringIO.StringIO()
+  writer = csv.writer(output)
+  writer.writerow(["Object type"])
+  writer.writerow(["Control", "Code*", "Title*", "Owner"] + ca_titles)
+  for control_id in dataset.ids["Control"][:PAGE_SIZE]:
+    writer.writerow(
+        ["", "{}-Control-{}".format(dataset.PREFIX, control_id),
+         "{} Control {} run {}".format(dataset.PREFIX, control_id,
+                                       runner.run_index),
+         "user@example.com"] +
+        ["run {}".format(runner.run_index)] * len(ca_titles))
+  data = {"file": (StringIO.StringIO(output.getvalue()), "benchmark.csv")}
+  headers = {"X-test-only": "false", "X-requested-by": "gGRC"}
+  blocks = _get_json(runner.client.post("/_service/import_csv", data=data,
+                                        headers=headers))
+  _check_not_empty(blocks[0]["updated"], "updated controls")
+
+
+def automapping(runner, dataset):
+  """Map a regulation to a program, which automaps its objectives."""
+  programs = dataset.ids["Program"]
+  regulations = dataset.ids["Regulation"]
+  # Regulations are related to programs round robin, pick an unrelated pair.
+  program_id = programs[(runner.run_index + 1) % len(programs)]
+  regulation_id = regulations[runner.run_index % len(regulations)]
+  data = [{"relationship": {
+      "source": {"type": "Program", "id": program_id},
+      "destination": {"type": "Regulation", "id": regulation_id},
+      "context": None,
+  }}]
+  response = _check(runner.client.post(
+      "/api/relationships", data=json.dumps(data),
+      headers=runner.json_headers))
+  relationship_id = json.loads(response.data)[0][1]["relationship"]["id"]
+  _check_not_empty(all_models.Relationship.query.filter_by(
+      automapping_id=relationship_id).count(), "automapped relationships")
+
+
+def load_permissions(runner, dataset):
+  """Load permissions of a Creator user."""
+  # pylint: disable=unused-argument
+  person = all_models.Person.query.filter_by(email=dataset.creator).one()
+  with app.test_request_context():
+    permissions = load_permissions_for(person)
+  _check_not_empty(
+      permissions.get("read", {}).get("Control", {}).get("resources"),
+      "owned controls")
+
+
+def related_ids_query(runner, dataset):
+  """Get controls related to all regulations with a single query."""
+  # pylint: disable=unused-argument
+  with app.test_request_context():
+    _check_not_empty(RelationshipHelper.get_ids_related_to(
+        "Control", "Regulation", dataset.ids["Regulation"]).all(),
+        "related controls")
+
+
+def related_ids_adjacency(runner, dataset):
+  """Get controls related to all regulations with the adjacency index."""
+  # pylint: disable=unused-argument
+  # A new request context starts with an empty index.
+  with app.test_request_context():
+    _check_not_empty(RelationshipHelper.get_related_ids(
+        "Control", "Regulation", dataset.ids["Regulation"]),
+        "related controls")
+
+
+def _get_collection(published_dates):
+  """Get a collection representation similar to a published one.
+
+  Args:
+    published_dates: if set, datetimes are converted during publishing,
+      otherwise they are left for the encoder.
+  """
+  if published_dates not in _collections:
+    now = datetime.datetime.utcnow()
+    value = encoders.publish_value if published_dates else (lambda v: v)
+    person = {"id": 1, "type": "Person", "href": "/api/people/1",
+              "context_id": None}
+    _collections[published_dates] = {"controls_collection": {
+        "selfLink": "/api/controls",
+        "controls": [{
+            "id": id_,
+            "type": "Control",
+            "selfLink": "/api/controls/{}".format(id_),
+            "slug": "CONTROL-{}".format(id_),
+            "title": "Control {}".format(id_),
+            "description": "Description of control {}".format(id_),
+            "created_at": value(now),
+            "updated_at": value(now),
+            "start_date": value(now.date()),
+            "end_date": None,
+            "owners": [person],
+            "modified_by": person,
+            "custom_attribute_values": [{
+                "id": id_ * 5 + index,
+                "type": "CustomAttributeValue",
+                "href": "/api/custom_attribute_values/{}".format(
+                    id_ * 5 + index),
+                "context_id": None,
+            } for index in range(5)],
+        } for id_ in range(ENCODED_OBJECTS)],
+    }}
+  return _collections[published_dates]
+
+
+def encode_collection_default(runner, dataset):
+  """Encode a large collection with datetimes converted by the encoder."""
+  # pylint: disable=unused-argument
+  json.dumps(_get_collection(False), cls=encoders.GrcEncoder)
+
+
+def encode_collection(runner, dataset):
+  """Stream a large collection published for the configured encoder."""
+  # pylint: disable=unused-argument
+  "".join(iter_json(_get_collection(True)))
+
+
+SCENARIOS = [
+    collection_get,
+    collection_stubs,
+    query,
+    search,
+    export_csv,
+    import_csv,
+    automapping,
+    load_permissions,
+    related_ids_query,
+    related_ids_adjacency,
+    encode_collection_default,
+    encode_collection,
+]
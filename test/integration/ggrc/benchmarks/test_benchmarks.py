@@ -0,0 +1,24 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Smoke test for the benchmark suite."""
+
+from integration.ggrc import TestCase
+from integration.ggrc.benchmarks import runner
+from integration.ggrc.benchmarks import scenarios
+
+
+class TestBenchmarks(TestCase):
+  """Check that all scenarios run on a small dataset."""
+
+  def test_all_scenarios(self):
+    """Every scenario reports timings and query counts."""
+    results = runner.run_benchmarks(scale=200, repeat=1)
+    self.assertEqual(
+        [result["name"] for result in results["results"]],
+        [scenario.__name__ for scenario in scenarios.SCENARIOS],
+    )
+    for result in results["results"]:
+      self.assertEqual(result["runs"], 1)
+      self.assertGreater(result["queries"], 0)
+    self.assertEqual(results["setup"]["rows"]["controls"], 138)
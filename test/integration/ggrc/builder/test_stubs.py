@@ -0,0 +1,57 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the stub service."""
+
+from ggrc.app import app
+from ggrc.builder import stubs
+from ggrc.builder.json import LazyStubRepresentation
+from ggrc.builder.json import publish_representation
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestStubs(TestCase):
+  """Test loading stubs of many objects."""
+
+  def setUp(self):
+    super(TestStubs, self).setUp()
+    self.control = factories.ControlFactory()
+    self.regulation = factories.RegulationFactory()
+
+  def test_get_stubs(self):
+    """Stubs are returned for existing objects with their actual type."""
+    with app.test_request_context():
+      result = stubs.get_stubs([
+          ("Control", self.control.id),
+          ("Directive", self.regulation.id),
+          ("Control", self.control.id + 1000),
+      ])
+    self.assertEqual(result, {
+        ("Control", self.control.id): {
+            "type": "Control",
+            "id": self.control.id,
+            "context_id": self.control.context_id,
+            "href": "/api/controls/{}".format(self.control.id),
+        },
+        ("Directive", self.regulation.id): {
+            "type": "Regulation",
+            "id": self.regulation.id,
+            "context_id": self.regulation.context_id,
+            "href": "/api/regulations/{}".format(self.regulation.id),
+        },
+    })
+
+  def test_publish_representation(self):
+    """Lazy stubs of published objects are replaced with stubs."""
+    resource = {
+        "control": LazyStubRepresentation("Control", self.control.id),
+        "missing": LazyStubRepresentation("Control", self.control.id + 1000),
+        "titled": LazyStubRepresentation(
+            "Regulation", {"title": self.regulation.title}),
+    }
+    with app.test_request_context():
+      publish_representation(resource)
+    self.assertEqual(resource["control"]["id"], self.control.id)
+    self.assertIsNone(resource["missing"])
+    self.assertEqual(resource["titled"]["id"], self.regulation.id)
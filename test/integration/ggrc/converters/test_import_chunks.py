@@ -0,0 +1,85 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for chunked and background csv imports."""
+
+from os.path import join
+
+from flask import json
+
+from ggrc import db
+from ggrc.converters.base import Converter
+from ggrc.converters.import_helper import read_csv_file
+from ggrc.models import Policy
+from integration.ggrc.converters import TestCase
+
+
+class TestImportChunks(TestCase):
+  """Test chunked commits, checkpoints and background imports."""
+
+  def setUp(self):
+    TestCase.setUp(self)
+    self.client.get("/login")
+
+  def _read_csv(self, filename):
+    with open(join(self.CSV_DIR, filename)) as csv_file:
+      return read_csv_file(csv_file)
+
+  def test_checkpoints(self):
+    """A checkpoint is saved after each committed chunk."""
+    checkpoints = []
+    converter = Converter(
+        dry_run=False,
+        csv_data=self._read_csv("policy_basic_import.csv"),
+        chunk_size=2,
+        checkpoint_callback=lambda *args: checkpoints.append(args),
+    )
+    converter.import_csv()
+    self.assertEqual(Policy.query.count(), 3)
+    self.assertEqual(
+        [(checkpoint["phase"], checkpoint["row"], done, total)
+         for checkpoint, done, total in checkpoints],
+        [("objects", 2, 2, 6),
+         ("objects", 3, 3, 6),
+         ("secondary_objects", 2, 5, 6),
+         ("secondary_objects", 3, 6, 6)],
+    )
+
+  def test_resume_from_checkpoint(self):
+    """Rows committed before the checkpoint are not imported again."""
+    converter = Converter(
+        dry_run=False,
+        csv_data=self._read_csv("policy_basic_import.csv"),
+        chunk_size=2,
+        checkpoint={"phase": "secondary_objects", "block": 0, "row": 3},
+    )
+    converter.import_csv()
+    db.session.rollback()
+    self.assertEqual(Policy.query.count(), 0)
+
+  def _import_in_background(self, filename):
+    data = {"file": (open(join(self.CSV_DIR, filename)), filename)}
+    headers = {
+        "X-test-only": "false",
+        "X-requested-by": "gGRC",
+        "X-GGRC-BackgroundTask": "true",
+    }
+    response = self.client.post("/_service/import_csv",
+                                data=data, headers=headers)
+    self.assert200(response)
+    return response
+
+  def test_background_import(self):
+    """Background import returns the same results as a regular import."""
+    expected = self.import_file("policy_basic_import.csv", dry_run=True)
+    response = self._import_in_background("policy_basic_import.csv")
+    self.assertEqual(json.loads(response.data), expected)
+    self.assertEqual(Policy.query.count(), 3)
+
+  def test_background_import_errors(self):
+    """Background import stops when the validation reports errors."""
+    expected = self.import_file("policy_same_titles.csv", dry_run=True)
+    self.assertTrue(expected[0]["row_errors"])
+    response = self._import_in_background("policy_same_titles.csv")
+    self.assertEqual(json.loads(response.data), expected)
+    self.assertEqual(Policy.query.count(), 0)
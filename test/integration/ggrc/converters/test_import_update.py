@@ -6,6 +6,7 @@
 from integration.ggrc.converters import TestCase
 
 from ggrc import models
+from ggrc.converters import errors
 
 
 class TestImportUpdates(TestCase):
@@ -43,3 +44,20 @@ class TestImportUpdates(TestCase):
         models.Revision.resource_id == policy.id
     ).count()
     self.assertEqual(revision_count, 2)
+
+  def test_shared_table_duplicate_title(self):
+    """Test title uniqueness across classes sharing a table."""
+    response = self.import_file("policy_basic_import.csv")
+    self._check_response(response, {})
+
+    response = self.import_file("regulation_shared_title.csv")
+    self._check_response(response, {
+        "Regulation": {
+            "row_errors": {
+                errors.DUPLICATE_VALUE.format(
+                    line=3, column_name="title", value="Some Weird Policy"),
+            },
+        },
+    })
+    self.assertIsNone(models.Regulation.query.filter_by(slug="r1").first())
+    self.assertIsNotNone(models.Regulation.query.filter_by(slug="r2").first())
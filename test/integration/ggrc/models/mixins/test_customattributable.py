@@ -3,10 +3,15 @@
 
 """Integration test for custom attributable mixin"""
 
+import mock
+
 from ggrc import db
 from ggrc import models
+from ggrc.utils import QueryCounter
 
 import integration.ggrc
+from integration.ggrc.models.factories import ContextFactory
+from integration.ggrc.models.factories import PersonFactory
 from integration.ggrc.models.factories import ProgramFactory
 from integration.ggrc.models.factories import \
     CustomAttributeDefinitionFactory as CAD
@@ -198,3 +203,107 @@ class TestCustomAttributableMixin(integration.ggrc.TestCase):
         set(v.attribute_value for v in prog.custom_attribute_values),
     )
     self.assertEqual(len(prog.custom_attribute_values), 2)
+
+  def test_legacy_ca_update(self):
+    """Test legacy custom attributes are updated in place."""
+    prog = ProgramFactory()
+    cad1 = CAD(definition_type="program", title="CA 1",)
+    cad2 = CAD(definition_type="program", title="CA 2",)
+    cad1_id, cad2_id = cad1.id, cad2.id
+
+    prog.custom_attributes({"custom_attributes": {
+        cad1_id: "55",
+        cad2_id: "129",
+    }})
+    db.session.commit()
+    prog = prog.__class__.query.get(prog.id)
+    value_ids = {v.custom_attribute_id: v.id
+                 for v in prog.custom_attribute_values}
+
+    prog.custom_attributes({"custom_attributes": {str(cad1_id): "57"}})
+    db.session.commit()
+    prog = prog.__class__.query.get(prog.id)
+
+    self.assertEqual(len(prog.custom_attribute_values), 1)
+    value = prog.custom_attribute_values[0]
+    self.assertEqual(value.id, value_ids[cad1_id])
+    self.assertEqual(value.attribute_value, "57")
+    self.assertIsNone(models.CustomAttributeValue.query.get(
+        value_ids[cad2_id]))
+
+  def test_preload_ca_values(self):
+    """Test loading custom attribute values of many objects at once."""
+    cad1 = CAD(definition_type="program", title="CA 1",)
+    programs = [ProgramFactory() for _ in range(3)]
+    for i, prog in enumerate(programs):
+      prog.custom_attribute_values = [{
+          "attribute_value": str(i),
+          "custom_attribute_id": cad1.id,
+      }]
+    db.session.commit()
+    program_ids = [prog.id for prog in programs]
+    db.session.expunge_all()
+
+    programs = models.Program.query.filter(
+        models.Program.id.in_(program_ids)).order_by(models.Program.id).all()
+    models.Program.preload_custom_attribute_values(programs)
+    with QueryCounter() as counter:
+      values = [[v.attribute_value for v in prog.custom_attribute_values]
+                for prog in programs]
+      self.assertEqual(counter.get, 0)
+    self.assertEqual(values, [["0"], ["1"], ["2"]])
+
+  def test_legacy_ca_batches(self):
+    """Test legacy custom attributes are written with one statement each."""
+    prog = ProgramFactory()
+    cad_ids = [CAD(definition_type="program", title="CA {}".format(i)).id
+               for i in range(10)]
+    prog = prog.__class__.query.get(prog.id)
+
+    def write_values(values):
+      with QueryCounter() as counter:
+        prog.custom_attributes({"custom_attributes": values})
+        db.session.flush()
+      return [query.split(" ")[0] for query in counter.queries
+              if "custom_attribute_values" in query.split("(")[0]]
+
+    statements = write_values({cad_id: "old" for cad_id in cad_ids})
+    self.assertEqual(statements.count("INSERT"), 1)
+    db.session.commit()
+
+    prog = prog.__class__.query.get(prog.id)
+    statements = write_values({cad_id: "new" for cad_id in cad_ids[1:]})
+    self.assertEqual(statements.count("UPDATE"), 1)
+    self.assertEqual(statements.count("DELETE"), 1)
+    db.session.commit()
+
+    prog = prog.__class__.query.get(prog.id)
+    self.assertEqual(
+        sorted((v.custom_attribute_id, v.attribute_value)
+               for v in prog.custom_attribute_values),
+        [(cad_id, "new") for cad_id in sorted(cad_ids[1:])])
+
+  def test_legacy_ca_batch_columns(self):
+    """Test batched legacy custom attributes set the modifier and context."""
+    prog = ProgramFactory(context=ContextFactory())
+    cad_ids = [CAD(definition_type="program", title="CA {}".format(i)).id
+               for i in range(2)]
+    people = [PersonFactory().id for _ in range(2)]
+    prog = prog.__class__.query.get(prog.id)
+
+    def write_values(values, person_id):
+      with mock.patch("ggrc.models.mixins.customattributable."
+                      "get_current_user_id", return_value=person_id):
+        prog.custom_attributes({"custom_attributes": values})
+      db.session.commit()
+      return prog.__class__.query.get(prog.id)
+
+    prog = write_values({cad_ids[0]: "old"}, people[0])
+    prog = write_values({cad_ids[0]: "new", cad_ids[1]: "new"}, people[1])
+    db.session.expire_all()
+    values = models.CustomAttributeValue.query.filter_by(
+        attributable_id=prog.id).all()
+    self.assertEqual(
+        sorted((v.custom_attribute_id, v.modified_by_id, v.context_id)
+               for v in values),
+        [(cad_id, people[1], prog.context_id) for cad_id in sorted(cad_ids)])
@@ -0,0 +1,110 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the local background task queue."""
+
+import datetime
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc import task_runner
+from ggrc.app import app
+from ggrc.models import BackgroundTask
+from ggrc.models import Policy
+from ggrc.models.background_task import create_task
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+
+
+class TestLocalTaskQueue(TestCase):
+  """Test claiming and leasing of queued background tasks."""
+
+  def setUp(self):
+    super(TestLocalTaskQueue, self).setUp()
+    task = BackgroundTask(name="test_task")
+    task.queued_request = {"url": "/", "method": "POST", "headers": []}
+    db.session.add(task)
+    db.session.commit()
+    self.task_id = task.id
+
+  def _expire_lease(self):
+    task = BackgroundTask.query.get(self.task_id)
+    task.lease_expires_at = datetime.datetime.utcnow() - \
+        datetime.timedelta(seconds=1)
+    db.session.commit()
+
+  def test_claim_once(self):
+    """A task with an active lease can not be claimed again."""
+    self.assertEqual(task_runner.claim_task(), self.task_id)
+    self.assertIsNone(task_runner.claim_task())
+
+  def test_claim_expired_lease(self):
+    """A task is claimed again after its lease expires."""
+    self.assertEqual(task_runner.claim_task(), self.task_id)
+    self._expire_lease()
+    self.assertEqual(task_runner.claim_task(), self.task_id)
+    db.session.expire_all()
+    self.assertEqual(BackgroundTask.query.get(self.task_id).attempts, 2)
+
+  def test_exhausted_attempts(self):
+    """A task fails once it has used up all attempts."""
+    for _ in range(settings.LOCAL_TASK_QUEUE_MAX_ATTEMPTS):
+      self.assertEqual(task_runner.claim_task(), self.task_id)
+      self._expire_lease()
+    self.assertIsNone(task_runner.claim_task())
+    task_runner.fail_exhausted_tasks()
+    db.session.expire_all()
+    self.assertEqual(BackgroundTask.query.get(self.task_id).status, "Failure")
+
+  def test_extend_lease(self):
+    """A renewed lease keeps the task from being claimed again."""
+    self.assertEqual(task_runner.claim_task(), self.task_id)
+    self._expire_lease()
+    task_runner.extend_lease(db.engine, self.task_id)
+    self.assertIsNone(task_runner.claim_task())
+
+  @mock.patch.object(settings, "LOCAL_TASK_QUEUE", True)
+  def test_queued_headers(self):
+    """Cookies and credentials are not stored with queued requests."""
+    with app.test_request_context("/", method="POST", headers={
+        "Cookie": "session=secret",
+        "Authorization": "Basic secret",
+        "Accept": "application/json",
+        "If-Match": "etag",
+        "X-GGRC-BackgroundTask": "true",
+    }):
+      task = create_task("queued", "/_background_tasks/reindex")
+    headers = dict(task.queued_request["headers"])
+    self.assertEqual(headers["Accept"], "application/json")
+    self.assertEqual(headers["If-Match"], "etag")
+    self.assertEqual(headers["X-GGRC-BackgroundTask"], "true")
+    self.assertNotIn("Cookie", headers)
+    self.assertNotIn("Authorization", headers)
+
+  def test_finished_tasks(self):
+    """Finished tasks are not claimed."""
+    BackgroundTask.query.get(self.task_id).finish("Success", "done")
+    self.assertIsNone(task_runner.claim_task())
+
+  def _run_queued_task(self, response):
+    self.assert200(response)
+    task_id = response.json["background_task"]["id"]
+    task_runner.run_task(task_id)
+    db.session.remove()
+    self.assertEqual(BackgroundTask.query.get(task_id).status, "Success")
+
+  @mock.patch.object(settings, "LOCAL_TASK_QUEUE", True)
+  def test_replay_requests(self):
+    """Queued POST and DELETE requests succeed when they are replayed."""
+    api = Api()
+    response = api.send_request(api.tc.post, Policy, {
+        "policy": {"title": "queued policy", "context": None},
+    }, headers={"X-GGRC-BackgroundTask": "true"})
+    self._run_queued_task(response)
+    policy = Policy.query.filter_by(title="queued policy").one()
+
+    response = api.data_to_json(api.delete(policy))
+    self._run_queued_task(response)
+    self.assertIsNone(Policy.query.get(policy.id))
@@ -0,0 +1,70 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for edges stored for both orientations of relationships."""
+
+from ggrc import db
+from ggrc.models import relationship_edge
+from ggrc.models.relationship_edge import RelationshipEdge
+from ggrc.models.relationship_helper import RelationshipHelper
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestRelationshipEdge(TestCase):
+  """Test maintenance and lookups of relationship edges."""
+
+  def setUp(self):
+    super(TestRelationshipEdge, self).setUp()
+    self.control = factories.ControlFactory()
+    self.regulations = [factories.RegulationFactory() for _ in range(2)]
+    self.relationships = [
+        factories.RelationshipFactory(source=self.control,
+                                      destination=self.regulations[0]),
+        factories.RelationshipFactory(source=self.regulations[1],
+                                      destination=self.control),
+    ]
+
+  @staticmethod
+  def _get_edges():
+    return {(edge.object_type, edge.object_id, edge.related_type,
+             edge.related_id) for edge in RelationshipEdge.query}
+
+  def _get_expected_edges(self):
+    edges = set()
+    for regulation in self.regulations:
+      edges.add(("Control", self.control.id, "Regulation", regulation.id))
+      edges.add(("Regulation", regulation.id, "Control", self.control.id))
+    return edges
+
+  def test_flush(self):
+    """Edges of both orientations are stored and removed on flush."""
+    self.assertEqual(self._get_edges(), self._get_expected_edges())
+
+    db.session.delete(self.relationships[0])
+    db.session.commit()
+    self.assertEqual(self._get_edges(), {
+        ("Control", self.control.id, "Regulation", self.regulations[1].id),
+        ("Regulation", self.regulations[1].id, "Control", self.control.id),
+    })
+
+  def test_related_ids(self):
+    """Objects on either side of relationships are found through edges."""
+    query = RelationshipHelper.get_ids_related_to(
+        "Regulation", "Control", [self.control.id])
+    self.assertEqual({id_ for id_, in query},
+                     {regulation.id for regulation in self.regulations})
+    query = RelationshipHelper.get_ids_related_to(
+        "Control", "Regulation", [reg.id for reg in self.regulations])
+    self.assertEqual({id_ for id_, in query}, {self.control.id})
+
+  def test_consistency_check(self):
+    """The nightly check restores edges changed outside of the session."""
+    db.session.execute(RelationshipEdge.__table__.delete())
+    db.session.commit()
+    self.assertEqual(self._get_edges(), set())
+
+    cursor = relationship_edge.check_relationship_edges()
+    self.assertEqual(cursor, max(rel.id for rel in self.relationships))
+    self.assertEqual(self._get_edges(), self._get_expected_edges())
+    self.assertIsNone(relationship_edge.check_relationship_edges(cursor))
@@ -0,0 +1,61 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for relationship helper and its adjacency index."""
+
+from ggrc import db
+from ggrc.app import app
+from ggrc.models.relationship_helper import RelationshipHelper
+from ggrc.models.relationship_helper import get_adjacency
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestRelationshipHelper(TestCase):
+  """Test related ids lookups."""
+
+  def setUp(self):
+    super(TestRelationshipHelper, self).setUp()
+    self.program = factories.ProgramFactory()
+    self.controls = [factories.ControlFactory() for _ in range(3)]
+    factories.RelationshipFactory(source=self.program,
+                                  destination=self.controls[0])
+    factories.RelationshipFactory(source=self.controls[1],
+                                  destination=self.program)
+
+  def _expected_ids(self, object_type, related_type, related_ids):
+    query = RelationshipHelper.get_ids_related_to(
+        object_type, related_type, related_ids)
+    return {row[0] for row in query}
+
+  def test_related_ids_match_union(self):
+    """Adjacency lookups return the same ids as the union query."""
+    with app.test_request_context():
+      self.assertEqual(
+          RelationshipHelper.get_related_ids(
+              "Control", "Program", [self.program.id]),
+          self._expected_ids("Control", "Program", [self.program.id]),
+      )
+      control_ids = [control.id for control in self.controls]
+      self.assertEqual(
+          RelationshipHelper.get_related_ids("Program", "Control",
+                                             control_ids),
+          self._expected_ids("Program", "Control", control_ids),
+      )
+
+  def test_adjacency_invalidation(self):
+    """New relationships are visible in cached lookups after a flush."""
+    with app.test_request_context():
+      self.assertEqual(
+          get_adjacency().get_ids_related_to(
+              "Control", "Program", [self.program.id]),
+          {self.controls[0].id, self.controls[1].id},
+      )
+      db.session.add(factories.RelationshipFactory.build(
+          source=self.program, destination=self.controls[2]))
+      db.session.flush()
+      self.assertEqual(
+          get_adjacency().get_ids_related_to(
+              "Control", "Program", [self.program.id]),
+          {control.id for control in self.controls},
+      )
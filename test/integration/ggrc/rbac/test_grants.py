@@ -0,0 +1,104 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for materialised permission grants."""
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models import all_models
+from ggrc.rbac import context_query_filter
+from ggrc.rbac import grants
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@mock.patch.object(settings, "PERMISSION_GRANTS_TABLE_THRESHOLD", 1)
+class TestGrants(TestCase):
+  """Test filters with long lists of granted ids."""
+
+  def setUp(self):
+    super(TestGrants, self).setUp()
+    self.controls = [factories.ControlFactory() for _ in range(3)]
+    self.user_id = factories.PersonFactory().id
+    # The grant tables are not emptied with the other tables.
+    for table in (grants.generations_table, grants.sources_table,
+                  grants.ids_table):
+      db.session.execute(table.delete())
+    db.session.commit()
+    patcher = mock.patch.object(grants, "get_current_user_id",
+                                return_value=self.user_id)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _query_ids(self, filter_):
+    query = db.session.query(all_models.Control.id).filter(filter_)
+    return set(id_ for id_, in query)
+
+  def _count_grants(self):
+    return db.session.query(grants.ids_table).count()
+
+  def _grant_list(self, kind, action, ids):
+    permissions = {action: {"Control": {kind: ids}}}
+    grants.store_grants(self.user_id, permissions)
+    grant_list = grants.GrantList(kind, [(action, "Control")],
+                                  permissions.get(grants.GENERATION_KEY))
+    grant_list.extend(ids)
+    return grant_list
+
+  def test_short_list(self):
+    """Short lists are filtered with a plain IN list."""
+    ids = [control.id for control in self.controls[:2]]
+    with mock.patch.object(settings, "PERMISSION_GRANTS_TABLE_THRESHOLD", 2):
+      grant_list = self._grant_list(grants.RESOURCES, "read", ids)
+      filter_ = grants.in_grants(all_models.Control.id, grant_list)
+    self.assertEqual(self._query_ids(filter_), set(ids))
+    self.assertNotIn("permission_grant", str(filter_))
+    self.assertEqual(self._count_grants(), 0)
+
+  def test_long_list(self):
+    """Long lists are stored once and filtered with a semi-join."""
+    ids = [control.id for control in self.controls[:2]]
+    grant_list = self._grant_list(grants.RESOURCES, "read", ids)
+    self.assertEqual(self._count_grants(), 2)
+    filter_ = grants.in_grants(all_models.Control.id, grant_list)
+    self.assertIn("permission_grant_ids", str(filter_))
+    self.assertEqual(self._query_ids(filter_), set(ids))
+
+    with mock.patch.object(grants, "_write_lists") as write_lists:
+      self._grant_list(grants.RESOURCES, "read", ids)
+    self.assertFalse(write_lists.called)
+
+  def test_changed_grants(self):
+    """Changed grants replace the stored lists of the user."""
+    self._grant_list(grants.RESOURCES, "read", [self.controls[0].id, 0])
+    ids = [control.id for control in self.controls[1:]]
+    grant_list = self._grant_list(grants.RESOURCES, "read", ids)
+    self.assertEqual(self._count_grants(), 2)
+    filter_ = grants.in_grants(all_models.Control.id, grant_list)
+    self.assertEqual(self._query_ids(filter_), set(ids))
+
+  def test_stale_generation(self):
+    """Lists of other generations are filtered with a plain IN list."""
+    ids = [control.id for control in self.controls[:2]]
+    self._grant_list(grants.RESOURCES, "read", ids)
+    grant_list = grants.GrantList(grants.RESOURCES, [("read", "Control")],
+                                  "stale")
+    grant_list.extend(ids)
+    filter_ = grants.in_grants(all_models.Control.id, grant_list)
+    self.assertNotIn("permission_grant", str(filter_))
+    self.assertEqual(self._query_ids(filter_), set(ids))
+
+  def test_context_filter(self):
+    """Context filters keep the NULL context with long context lists."""
+    contexts = [factories.ContextFactory() for _ in range(2)]
+    self.controls[0].context = contexts[0]
+    self.controls[1].context = contexts[1]
+    db.session.commit()
+    grant_list = self._grant_list(
+        grants.CONTEXTS, "read", [None, contexts[0].id, contexts[1].id])
+    filter_ = context_query_filter(all_models.Control.context_id, grant_list)
+    self.assertIn("permission_grant_ids", str(filter_))
+    self.assertEqual(self._query_ids(filter_),
+                     set(control.id for control in self.controls))
@@ -5,8 +5,12 @@
 
 import json
 
+import mock
+
 from ggrc import db
 from ggrc import models
+from ggrc.rbac import permissions
+from ggrc.services.common import Resource
 from integration.ggrc import services
 
 
@@ -211,3 +215,106 @@ class TestCollectionPost(services.TestCase):
     relationships = models.Relationship.eager_query().all()
     self.assertEqual(len(relationships), 3)  # This should be 2
     rel1 = relationships[0]
+
+  def test_post_relationships_no_result(self):
+    """Test relationship collection post without serialized results."""
+    db.session.add(models.Policy(id=144, title="hello"))
+    db.session.add(models.Policy(id=233, title="world"))
+    db.session.add(models.Policy(id=377, title="bye"))
+    db.session.commit()
+
+    self.client.get("/login")
+    data = json.dumps([{
+        "relationship": {
+            "source": {"id": 144, "type": "Policy"},
+            "destination": {"id": destination_id, "type": "Policy"},
+            "context": None,
+        },
+    } for destination_id in (233, 377)])
+    response = self.client.post(
+        "/api/relationships?__no_result",
+        content_type='application/json',
+        data=data,
+        headers=self.headers(),
+    )
+
+    self.assert200(response)
+    self.assertEqual(response.json, [[201, {}], [201, {}]])
+    relationships = models.Relationship.query.filter_by(source_id=144).all()
+    self.assertEqual({233, 377}, {rel.destination_id for rel in relationships})
+
+  def test_post_permission_checked_once(self):
+    """Test that create permissions are checked once per type and context."""
+    db.session.add(models.Policy(id=144, title="hello"))
+    db.session.add(models.Policy(id=233, title="world"))
+    db.session.add(models.Policy(id=377, title="bye"))
+    db.session.commit()
+
+    self.client.get("/login")
+    data = json.dumps([{
+        "relationship": {
+            "source": {"id": 144, "type": "Policy"},
+            "destination": {"id": destination_id, "type": "Policy"},
+            "context": None,
+        },
+    } for destination_id in (233, 377)])
+    with mock.patch.object(permissions, "is_allowed_create_for",
+                           wraps=permissions.is_allowed_create_for) as check:
+      response = self.client.post(
+          "/api/relationships",
+          content_type='application/json',
+          data=data,
+          headers=self.headers(),
+      )
+
+    self.assert200(response)
+    self.assertEqual(check.call_count, 1)
+
+  def test_post_assessment_templates(self):
+    """Test that definitions are set on their own assessment templates."""
+    self._post_assessment_templates(("first", "second"))
+
+  def test_post_autoflushed_templates(self):
+    """Test that autoflushed definitions are set on their templates."""
+
+    def autoflush(sender, obj=None, src=None, service=None):
+      # pylint: disable=unused-argument
+      models.CustomAttributeDefinition.query.count()
+
+    Resource.model_posted.connect(autoflush, models.AssessmentTemplate)
+    try:
+      self._post_assessment_templates(("first", "second", "third"))
+    finally:
+      Resource.model_posted.disconnect(autoflush, models.AssessmentTemplate)
+
+  def _post_assessment_templates(self, titles):
+    """Post assessment templates with a definition named after each."""
+    self.client.get("/login")
+    data = json.dumps([{
+        "assessment_template": {
+            "title": title,
+            "default_people": {"assessors": "Object Owners",
+                               "verifiers": "Object Owners"},
+            "custom_attribute_definitions": [{
+                "title": "{} attribute".format(title),
+                "attribute_type": "Text",
+            }],
+            "context": None,
+        },
+    } for title in titles])
+    response = self.client.post(
+        "/api/assessment_templates",
+        content_type='application/json',
+        data=data,
+        headers=self.headers(),
+    )
+
+    self.assert200(response)
+    self.assertEqual(models.AssessmentTemplate.query.count(), len(titles))
+    for template in models.AssessmentTemplate.query:
+      definitions = models.CustomAttributeDefinition.query.filter_by(
+          definition_type="assessment_template",
+          definition_id=template.id,
+      ).all()
+      self.assertEqual(["{} attribute".format(template.title)],
+                       [definition.title for definition in definitions])
@@ -275,3 +275,13 @@ class TestServices(services.TestCase):
     )
     self.assertStatus(response, 304)
     self.assertIn("Etag", response.headers)
+
+  def test_collection_get_fields(self):
+    """Only the requested fields are returned for a collection."""
+    mock1 = self.mock_model(foo="baz", code="c1")
+    response = self.client.get(
+        self.mock_url() + "?__fields=id,foo",
+        headers=self.headers(("Accept", "application/json")))
+    self.assert200(response)
+    objects = response.json["test_model_collection"]["test_model"]
+    self.assertEqual([{"id": mock1.id, "foo": "baz"}], objects)
@@ -584,3 +584,53 @@ class TestAdvancedQueryAPI(TestCase):
     response_single_post = json.loads(self._post(data_list).data)
 
     self.assertEqual(response_multiple_posts, response_single_post)
+
+  def test_relevant_previous(self):
+    """Relevant filter on __previous__ works for any type of previous query."""
+    program_query = {
+        "object_name": "Program",
+        "filters": {
+            "expression": {
+                "left": "title",
+                "op": {"name": "="},
+                "right": "Cat ipsum 1",
+            },
+        },
+    }
+    relevant_query = {
+        "object_name": "Regulation",
+        "type": "ids",
+        "filters": {
+            "expression": {
+                "object_name": "__previous__",
+                "op": {"name": "relevant"},
+                "ids": ["0"],
+            },
+        },
+    }
+    regulation_ids = None
+    for query_type in ("values", "ids", "count"):
+      program_query["type"] = query_type
+      response = json.loads(self._post([program_query, relevant_query]).data)
+      ids = response[1]["Regulation"]["ids"]
+      self.assertEqual(len(ids), 16)
+      if regulation_ids is not None:
+        self.assertEqual(set(ids), regulation_ids)
+      regulation_ids = set(ids)
+
+  def test_repeated_queries(self):
+    """Repeated queries in one POST return the same results."""
+    data = {
+        "object_name": "Regulation",
+        "type": "ids",
+        "filters": {
+            "expression": {
+                "left": "title",
+                "op": {"name": "~"},
+                "right": "1",
+            },
+        },
+    }
+    response = json.loads(self._post([data, data, data]).data)
+    self.assertEqual(response[0], response[1])
+    self.assertEqual(response[0], response[2])
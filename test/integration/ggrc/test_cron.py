@@ -0,0 +1,74 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for nightly cron job runs."""
+
+import datetime
+
+import mock
+
+from ggrc import cron
+from ggrc.app import app
+from ggrc.models.cron_job_run import CronJobRun
+from integration.ggrc import TestCase
+
+
+@cron.batched
+def count_to_three(cursor=None):
+  """Batched job that counts in batches of one."""
+  count_to_three.calls.append(cursor)
+  cursor = (cursor or 0) + 1
+  return cursor if cursor < 3 else None
+
+
+def failing_job():
+  raise ValueError("failing job")
+
+
+class TestCron(TestCase):
+  """Test running cron jobs with run records."""
+
+  def setUp(self):
+    super(TestCron, self).setUp()
+    count_to_three.calls = []
+    self.run_date = datetime.date(2016, 9, 9)
+
+  def _get_run(self, job):
+    return cron.get_run(cron.get_job_name(job), self.run_date)
+
+  def test_batched_job(self):
+    """A batched job continues from its cursor after the time budget."""
+    with app.test_request_context():
+      self.assertFalse(cron.run_job(
+          count_to_three, self._get_run(count_to_three), time_budget=0))
+      run = self._get_run(count_to_three)
+      self.assertEqual((run.status, run.cursor), ("Paused", {"value": 1}))
+
+      self.assertTrue(cron.run_job(count_to_three, run))
+      run = self._get_run(count_to_three)
+    self.assertEqual(count_to_three.calls, [None, 1, 2])
+    self.assertEqual((run.status, run.cursor, run.attempts),
+                     ("Success", None, 1))
+
+  def test_failing_job(self):
+    """Failures are recorded on the run."""
+    with app.test_request_context():
+      with self.assertRaises(ValueError):
+        cron.run_job(failing_job, self._get_run(failing_job))
+      run = self._get_run(failing_job)
+    self.assertEqual(run.status, "Failure")
+    self.assertIn("failing job", run.error)
+
+  def test_nightly_endpoint(self):
+    """The endpoint runs due jobs once per day."""
+    with mock.patch("ggrc.extensions.get_module_contributions",
+                    return_value=[count_to_three, failing_job]):
+      self.client.get("/nightly_cron_endpoint")
+      self.client.get("/nightly_cron_endpoint")
+    runs = {run.name: run for run in CronJobRun.query}
+    self.assertEqual(runs[cron.get_job_name(count_to_three)].status,
+                     "Success")
+    self.assertEqual(count_to_three.calls, [None, 1, 2])
+    failed_run = runs[cron.get_job_name(failing_job)]
+    self.assertEqual((failed_run.status, failed_run.attempts),
+                     ("Failure", 2))
@@ -0,0 +1,56 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for cached page bootstrap resources."""
+
+import re
+
+from integration.ggrc import TestCase
+from integration.ggrc.models.factories import \
+    CustomAttributeDefinitionFactory as CAD
+
+
+class TestBootstrap(TestCase):
+  """Tests for bootstrap resources referenced by pages."""
+
+  def setUp(self):
+    super(TestBootstrap, self).setUp()
+    self.client.get("/login")
+
+  def _get_script_urls(self):
+    response = self.client.get("/dashboard")
+    self.assert200(response)
+    return re.findall(r'src="(/bootstrap/[0-9a-f]+\.js)"', response.data)
+
+  def test_bootstrap_scripts(self):
+    """Pages reference bootstrap scripts that set the definitions."""
+    urls = self._get_script_urls()
+    self.assertEqual(len(urls), 2)
+    responses = [self.client.get(url) for url in urls]
+    for response in responses:
+      self.assert200(response)
+      self.assertIn("max-age", response.headers["Cache-Control"])
+    self.assertTrue(responses[0].data.startswith("GGRC.custom_attr_defs = "))
+    self.assertTrue(responses[1].data.startswith("GGRC.model_attr_defs = "))
+    self.assert404(self.client.get("/bootstrap/0123456789abcdef.js"))
+
+  def test_custom_attribute_version(self):
+    """Changing custom attribute definitions changes the resource url."""
+    custom_attr_url, model_attr_url = self._get_script_urls()
+    self.assertEqual(self._get_script_urls(),
+                     [custom_attr_url, model_attr_url])
+
+    CAD(definition_type="control", title="bootstrap CA")
+
+    new_custom_attr_url, new_model_attr_url = self._get_script_urls()
+    self.assertNotEqual(new_custom_attr_url, custom_attr_url)
+    self.assertEqual(new_model_attr_url, model_attr_url)
+    self.assertIn("bootstrap CA", self.client.get(new_custom_attr_url).data)
+
+  def test_many_versions(self):
+    """Resources with an unchanged version stay available."""
+    _, model_attr_url = self._get_script_urls()
+    for i in range(10):
+      CAD(definition_type="control", title="bootstrap CA {}".format(i))
+      self._get_script_urls()
+    self.assert200(self.client.get(model_attr_url))
@@ -5,6 +5,8 @@
 Test Program Creator role
 """
 
+from flask import json
+
 from integration.ggrc import TestCase
 from ggrc.models import get_model
 from ggrc.models import all_models
@@ -243,3 +245,59 @@ class TestCreator(TestCase):
     self.api.set_user(self.users["creator"])
     check(obj_1, 0)
     check(obj_2, 1)
+
+  def _own_sections(self, count, owned):
+    """Generate sections as admin and give the creator the owned ones."""
+    self.api.set_user(self.users["admin"])
+    sections = [self.generator.generate(all_models.Section, "section", {
+        "section": {"title": "Section {}".format(i), "context": None},
+    })[1] for i in range(count)]
+    for section in sections[:owned]:
+      self.api.post(all_models.ObjectOwner, {"object_owner": {
+          "person": {
+              "id": self.users['creator'].id,
+              "type": "Person",
+          }, "ownable": {
+              "type": "Section",
+              "id": section.id,
+          }, "context": None}})
+    return sections
+
+  def test_revision_collection_access(self):
+    """Check that revisions of many objects are filtered together."""
+    sections = self._own_sections(4, 2)
+    self.api.set_user(self.users["creator"])
+    response = self.api.get_query(all_models.Revision,
+                                  "resource_type=Section")
+    self.assertEqual(response.status_code, 200)
+    revisions = response.json['revisions_collection']['revisions']
+    self.assertEqual(
+        set(revision["resource_id"] for revision in revisions),
+        set(section.id for section in sections[:2]),
+    )
+
+  def test_revision_fields_access(self):
+    """Check that revisions are filtered with a fields projection."""
+    self._own_sections(4, 2)
+    self.api.set_user(self.users["creator"])
+    response = self.api.get_query(all_models.Revision,
+                                  "resource_type=Section&__fields=id")
+    self.assertEqual(response.status_code, 200)
+    revisions = response.json['revisions_collection']['revisions']
+    self.assertEqual(len(revisions), 2)
+    self.assertEqual(set(revisions[0]), {"id"})
+
+  def test_query_api_access(self):
+    """Check that the query api only returns objects the creator can read."""
+    sections = self._own_sections(4, 2)
+    self.api.set_user(self.users["creator"])
+    response = self.api.tc.post(
+        "/query",
+        data=json.dumps([{"object_name": "Section", "type": "ids"}]),
+        headers={"Content-Type": "application/json"},
+    )
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(
+        set(json.loads(response.data)[0]["Section"]["ids"]),
+        set(section.id for section in sections[:2]),
+    )
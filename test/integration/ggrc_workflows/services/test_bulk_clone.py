@@ -0,0 +1,88 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for set based cloning of workflows and task groups."""
+
+from ggrc.models.revision import Revision
+from ggrc_workflows.models import TaskGroup
+from ggrc_workflows.models import TaskGroupObject
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc_workflows.generator import WorkflowsGenerator
+
+
+class TestBulkClone(TestCase):
+  """Test cloning of task groups with their tasks and objects."""
+
+  def setUp(self):
+    super(TestBulkClone, self).setUp()
+    self.generator = WorkflowsGenerator()
+    self.controls = [factories.ControlFactory() for _ in range(3)]
+    _, self.workflow = self.generator.generate_workflow({
+        "title": "cloned workflow",
+        "task_groups": [{
+            "title": "task group {}".format(i),
+            "task_group_tasks": [{"title": "task {}".format(j)}
+                                 for j in range(i + 1)],
+            "task_group_objects": self.controls[:i + 1],
+        } for i in range(2)],
+    })
+
+  @staticmethod
+  def _get_content(workflow):
+    task_groups = TaskGroup.query.filter_by(workflow_id=workflow.id)
+    return sorted(
+        (task_group.title,
+         sorted(task.title for task in task_group.task_group_tasks),
+         sorted((tgo.object_type, tgo.object_id)
+                for tgo in task_group.task_group_objects))
+        for task_group in task_groups
+    )
+
+  def test_workflow_clone(self):
+    """Task groups, tasks and objects are copied into a new workflow."""
+    _, clone = self.generator.generate_workflow({
+        "clone": self.workflow.id,
+        "clone_tasks": True,
+        "clone_objects": True,
+    })
+    self.assertEqual(self._get_content(clone),
+                     self._get_content(self.workflow))
+
+    task_groups = TaskGroup.query.filter_by(workflow_id=clone.id).all()
+    for task_group in task_groups:
+      self.assertEqual(task_group.slug, "TASKGROUP-{}".format(task_group.id))
+      self.assertEqual(task_group.context_id, clone.context_id)
+      for task in task_group.task_group_tasks:
+        self.assertEqual(task.slug, "TASK-{}".format(task.id))
+        self.assertFalse(task.object_approval)
+      for tgo in task_group.task_group_objects:
+        self.assertEqual(tgo.status, TaskGroupObject.default_status())
+    self.assertEqual(Revision.query.filter(
+        Revision.resource_type == "TaskGroup",
+        Revision.resource_id.in_([tg.id for tg in task_groups]),
+    ).count(), 2)
+
+  def test_workflow_clone_without_children(self):
+    """Only task groups are copied without clone options."""
+    _, clone = self.generator.generate_workflow({"clone": self.workflow.id})
+    self.assertEqual(self._get_content(clone), [
+        ("task group 0", [], []),
+        ("task group 1", [], []),
+    ])
+
+  def test_task_group_clone(self):
+    """Tasks and objects are copied into a cloned task group."""
+    source = TaskGroup.query.filter_by(
+        workflow_id=self.workflow.id, title="task group 1").one()
+    _, clone = self.generator.generate_task_group(self.workflow, {
+        "clone": source.id,
+        "clone_tasks": True,
+        "clone_objects": True,
+    })
+    self.assertEqual(
+        sorted(task.title for task in clone.task_group_tasks),
+        ["task 0", "task 1"])
+    self.assertEqual(
+        sorted(tgo.object_id for tgo in clone.task_group_objects),
+        sorted(control.id for control in self.controls[:2]))
@@ -0,0 +1,93 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the closure of objects mapped to cycle tasks."""
+
+from ggrc import db
+from ggrc.models.relationship import Relationship
+from ggrc_workflows.models import CycleTaskGroupObjectTask
+from ggrc_workflows.models import WorkflowObjectClosure
+from ggrc_workflows.models import relationship_helper
+from ggrc_workflows.services import object_closure
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc_workflows.generator import WorkflowsGenerator
+
+
+class TestObjectClosure(TestCase):
+  """Test maintenance of workflow object closure rows."""
+
+  def setUp(self):
+    super(TestObjectClosure, self).setUp()
+    self.generator = WorkflowsGenerator()
+    self.controls = [factories.ControlFactory() for _ in range(2)]
+    _, self.workflow = self.generator.generate_workflow({
+        "title": "one time closure workflow",
+        "task_groups": [{
+            "title": "closure task group",
+            "task_group_tasks": [{}],
+            "task_group_objects": self.controls,
+        }],
+    })
+    _, self.cycle = self.generator.generate_cycle(self.workflow)
+    self.task = CycleTaskGroupObjectTask.query.filter_by(
+        cycle_id=self.cycle.id).one()
+
+  def _get_closure_rows(self):
+    return {(row.workflow_id, row.cycle_id, row.cycle_task_group_id,
+             row.object_type, row.object_id)
+            for row in WorkflowObjectClosure.query.filter_by(
+                cycle_task_id=self.task.id)}
+
+  def _get_related_ids(self, object_type, related_type, related_ids):
+    query = relationship_helper.get_ids_related_to(
+        object_type, related_type, related_ids)
+    return {id_ for id_, in query}
+
+  def test_cycle_build(self):
+    """Objects mapped while building a cycle are found through the closure."""
+    self.assertEqual(self._get_closure_rows(), {
+        (self.workflow.id, self.cycle.id, self.task.cycle_task_group_id,
+         "Control", control.id)
+        for control in self.controls
+    })
+    control_ids = {control.id for control in self.controls}
+    self.assertEqual(
+        self._get_related_ids("Control", "Workflow", [self.workflow.id]),
+        control_ids)
+    self.assertEqual(
+        self._get_related_ids("Control", "Cycle", [self.cycle.id]),
+        control_ids)
+    self.assertEqual(
+        self._get_related_ids("CycleTaskGroup", "Control",
+                              [self.controls[0].id]),
+        {self.task.cycle_task_group_id})
+
+  def test_relationship_changes(self):
+    """Removed mappings are removed from the closure on flush."""
+    relationship = Relationship.query.filter_by(
+        source_type="CycleTaskGroupObjectTask",
+        source_id=self.task.id,
+        destination_type="Control",
+        destination_id=self.controls[0].id,
+    ).one()
+    db.session.delete(relationship)
+    db.session.commit()
+    self.assertEqual(
+        self._get_related_ids("Workflow", "Control", [self.controls[0].id]),
+        set())
+    self.assertEqual(
+        self._get_related_ids("Workflow", "Control", [self.controls[1].id]),
+        {self.workflow.id})
+
+  def test_consistency_check(self):
+    """The nightly check restores rows changed outside of the session."""
+    expected = self._get_closure_rows()
+    db.session.execute(WorkflowObjectClosure.__table__.delete())
+    db.session.commit()
+    self.assertEqual(self._get_closure_rows(), set())
+
+    cursor = object_closure.check_workflow_object_closure()
+    self.assertEqual(cursor, self.task.id)
+    self.assertEqual(self._get_closure_rows(), expected)
+    self.assertIsNone(object_closure.check_workflow_object_closure(cursor))
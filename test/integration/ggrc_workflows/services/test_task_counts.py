@@ -0,0 +1,63 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for per person task counters."""
+
+from freezegun import freeze_time
+
+from ggrc import db
+from ggrc_workflows.models import Cycle
+from ggrc_workflows.models import CycleTaskGroupObjectTask
+from ggrc_workflows.models import UserTaskCount
+from ggrc_workflows.models import Workflow
+from ggrc_workflows.services import task_counts
+from integration.ggrc import TestCase
+from integration.ggrc_workflows.generator import WorkflowsGenerator
+
+
+class TestTaskCounts(TestCase):
+  """Test maintenance of user task counts."""
+
+  def setUp(self):
+    super(TestTaskCounts, self).setUp()
+    self.generator = WorkflowsGenerator()
+    _, self.workflow = self.generator.generate_workflow({
+        "title": "weekly thingy",
+        "frequency": "weekly",
+        "task_groups": [{
+            "title": "weekly task group",
+            "task_group_tasks": [{
+                "title": "weekly task {}".format(i),
+                "relative_end_day": 1,
+                "relative_end_month": None,
+                "relative_start_day": 5,
+                "relative_start_month": None,
+            } for i in range(2)],
+        }],
+    })
+
+  def _get_cycle_tasks(self):
+    return db.session.query(CycleTaskGroupObjectTask).join(
+        Cycle).join(Workflow).filter(Workflow.id == self.workflow.id).all()
+
+  def _get_stored_count(self, person_id):
+    row = UserTaskCount.query.get(person_id)
+    return [row.task_count, row.overdue_count]
+
+  def test_counts_follow_task_changes(self):
+    """Counts are updated with task statuses and overdue days."""
+    with freeze_time("2016-6-10 13:00:00"):  # Friday, 6/10/2016
+      self.generator.activate_workflow(self.workflow)
+      cycle_tasks = self._get_cycle_tasks()
+      person_id = cycle_tasks[0].contact_id
+      self.assertEqual(self._get_stored_count(person_id), [2, 0])
+      self.assertEqual(task_counts.get_task_count(person_id), [2, 0])
+
+      self.generator.modify_object(cycle_tasks[0], {"status": "Verified"})
+      self.assertEqual(self._get_stored_count(person_id), [1, 0])
+
+    with freeze_time("2016-6-20 13:00:00"):
+      # Stale counts are not used before the nightly job.
+      self.assertEqual(task_counts.get_task_count(person_id), [1, 1])
+      task_counts.refresh_all_task_counts()
+      self.assertEqual(self._get_stored_count(person_id), [1, 1])
@@ -12,6 +12,7 @@ from ggrc_workflows.models import Cycle
 from ggrc_workflows.models import CycleTaskGroupObjectTask
 from ggrc_workflows.models import CycleTaskGroup
 from ggrc_workflows.models import Workflow
+from ggrc_workflows.services.status_rollup import get_status_rollup
 from integration.ggrc import TestCase
 from integration.ggrc_workflows.generator import WorkflowsGenerator
 from integration.ggrc.api_helper import Api
@@ -246,3 +247,47 @@ class TestWorkflowCycleStatePropagantion(TestCase):
       self.assertEqual(first_ct.status, "Declined")
       self.assertEqual(second_ct.status, "Finished")
       self.assertEqual(ctg.status, "InProgress")
+
+  def test_weekly_state_transitions_cycle(self):
+    "Test that cycle status follows the status of its task groups"
+    _, wf = self.generator.generate_workflow(self.weekly_wf)
+
+    with freeze_time("2016-6-10 13:00:00"):  # Friday, 6/10/2016
+      self.generator.activate_workflow(wf)
+
+      cycle = db.session.query(Cycle).join(Workflow).filter(
+          Workflow.id == wf.id).one()
+      cycle_tasks = db.session.query(CycleTaskGroupObjectTask).join(
+          Cycle).join(Workflow).filter(Workflow.id == wf.id).all()
+      first_ct, second_ct = cycle_tasks
+
+      self.generator.modify_object(first_ct, {"status": "InProgress"})
+      cycle = db.session.query(Cycle).get(cycle.id)
+      self.assertEqual(cycle.status, "InProgress")
+
+      self.generator.modify_object(first_ct, {"status": "Finished"})
+      cycle = db.session.query(Cycle).get(cycle.id)
+      self.assertEqual(cycle.status, "InProgress")
+
+      self.generator.modify_object(second_ct, {"status": "Finished"})
+      cycle = db.session.query(Cycle).get(cycle.id)
+      self.assertEqual(cycle.status, "Finished")
+
+  def test_rollup_after_deleted_task(self):
+    "Test that deleting a cycle task drops the counter of its task group"
+    _, wf = self.generator.generate_workflow(self.weekly_wf)
+
+    with freeze_time("2016-6-10 13:00:00"):  # Friday, 6/10/2016
+      self.generator.activate_workflow(wf)
+
+      ctg = db.session.query(CycleTaskGroup).join(
+          Cycle).join(Workflow).filter(Workflow.id == wf.id).one()
+      first_ct, second_ct = db.session.query(CycleTaskGroupObjectTask).join(
+          Cycle).join(Workflow).filter(Workflow.id == wf.id).all()
+      rollup = get_status_rollup()
+      self.assertEqual(rollup.get_parent_status(first_ct, ctg), "Assigned")
+
+      db.session.delete(second_ct)
+      db.session.flush()
+      first_ct.status = "Finished"
+      self.assertEqual(rollup.get_parent_status(first_ct, ctg), "Finished")
@@ -0,0 +1,29 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for caching of stub representations."""
+
+import unittest
+
+from mock import MagicMock
+
+from ggrc import app  # noqa
+from ggrc.builder import stubs
+from ggrc.models import all_models
+from ggrc.services.common import CACHE_EXPIRY_COLLECTION
+
+
+class TestStubCache(unittest.TestCase):
+  """Test adding stubs to memcache."""
+
+  def test_add_with_expiry(self):
+    """Stubs are added with an expiry and skipped when blocked."""
+    client = MagicMock()
+    client.get_multi.return_value = {"DeleteOp:stub:controls:2": "DeleteOp"}
+    stubs._add_stubs_to_cache(client, all_models.Control, {
+        1: {"type": "Control", "id": 1},
+        2: {"type": "Control", "id": 2},
+    })
+    client.add_multi.assert_called_once_with(
+        {"stub:controls:1": {"type": "Control", "id": 1}},
+        CACHE_EXPIRY_COLLECTION)
@@ -0,0 +1,71 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for compact resource id lists in permissions."""
+
+import unittest
+
+from ggrc.rbac import resource_ids
+
+
+class TestResourceIds(unittest.TestCase):
+  """Tests for resource id encoding and grant collection."""
+
+  def test_encode_decode(self):
+    """Resource ids survive run-length encoding."""
+    ids = [1, 2, 3, 7, 9, 10]
+    self.assertEqual(resource_ids.encode(ids), [1, 3, 7, 1, 9, 2])
+    self.assertEqual(resource_ids.decode(resource_ids.encode(ids)), ids)
+    self.assertEqual(resource_ids.encode([]), [])
+
+  def test_contains(self):
+    ids = [2, 4, 8]
+    self.assertTrue(resource_ids.contains(ids, 4))
+    self.assertFalse(resource_ids.contains(ids, 5))
+    self.assertFalse(resource_ids.contains(ids, 9))
+    self.assertFalse(resource_ids.contains([], 1))
+
+  def test_shared_grants(self):
+    """Actions with the same grants share one sorted list."""
+    grants = resource_ids.ResourceGrants()
+    grants.add("Control", 5, ["read", "update"])
+    grants.add("Control", 3, ["read", "update"])
+    grants.add("Control", 5, ["read"])
+    grants.add("Control", 1, ["read"])
+    grants.add("Audit", 2, ["read", "update"])
+    permissions = {"read": {"Control": {"contexts": [1]}}}
+    grants.store(permissions)
+
+    self.assertEqual(permissions["read"]["Control"],
+                     {"contexts": [1], "resources": [1, 3, 5]})
+    self.assertEqual(permissions["update"]["Control"]["resources"], [3, 5])
+    self.assertIs(permissions["read"]["Audit"]["resources"],
+                  permissions["update"]["Audit"]["resources"])
+
+  def test_encode_permissions(self):
+    """Shared lists stay shared and the original is not modified."""
+    shared = [1, 2, 3]
+    permissions = {
+        "__user": "user@example.com",
+        "read": {"Control": {"resources": shared, "contexts": [None]}},
+        "update": {"Control": {"resources": shared}},
+    }
+    encoded = resource_ids.encode_permissions(permissions)
+    self.assertEqual(encoded["read"]["Control"],
+                     {"resource_ranges": [1, 3], "contexts": [None]})
+    self.assertIs(encoded["read"]["Control"]["resource_ranges"],
+                  encoded["update"]["Control"]["resource_ranges"])
+    self.assertIs(permissions["read"]["Control"]["resources"], shared)
+
+    decoded = resource_ids.decode_permissions(encoded)
+    self.assertEqual(decoded, permissions)
+    self.assertIs(decoded["read"]["Control"]["resources"],
+                  decoded["update"]["Control"]["resources"])
+
+  def test_decode_plain_lists(self):
+    """Plain lists of previously cached permissions are sorted on decode."""
+    permissions = {"read": {"Control": {"resources": [5, 1, 5, 3]}}}
+    decoded = resource_ids.decode_permissions(permissions)
+    resources = decoded["read"]["Control"]["resources"]
+    self.assertEqual(resources, [1, 3, 5])
+    self.assertTrue(resource_ids.contains(resources, 5))
@@ -144,3 +144,18 @@ class TestUtilsFunctions(TestCase):
               "<script>>alert(2)<<script>/<script>s<script>c<script>r<script>"
               "i<script>p<script>t<script>>")
     self.assertEqual(clean(nested), "alert(2)")
+
+  def test_html_cleaner_cache(self):
+    """Cleaning is skipped for plain text and cached for markup."""
+    cleaner = utils.html_cleaner
+    cleaner._clean_values.clear()  # pylint: disable=protected-access
+    self.assertEqual(cleaner.clean("a > b"), "a > b")
+    self.assertEqual(cleaner.clean("a\r\nb"), "a\nb")
+    self.assertEqual(len(cleaner._clean_values), 1)
+
+    self.assertEqual(cleaner.clean("<b>a</b> &amp; b<script>"),
+                     "<b>a</b> & b")
+    self.assertIn("<b>a</b> & b", cleaner._clean_values)
+
+    self.assertEqual(cleaner.clean_all(["<i>x</i>", None, "<i>x</i>"]),
+                     ["<i>x</i>", None, "<i>x</i>"])
@@ -0,0 +1,65 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for JSON encoders."""
+
+import datetime
+import json
+import unittest
+
+from ggrc import utils
+from ggrc.utils import encoders
+
+
+class TestEncoders(unittest.TestCase):
+  """Tests for the JSON encoders."""
+
+  def setUp(self):
+    self.value = {
+        "datetime": datetime.datetime(2016, 9, 8, 12, 30, 15),
+        "date": datetime.date(2016, 9, 8),
+        "timedelta": datetime.timedelta(hours=1, minutes=2),
+        "set": {1},
+        "list": [1, "a", None, 1.5],
+    }
+    self.expected = {
+        "datetime": "2016-09-08T12:30:15",
+        "date": "2016-09-08",
+        "timedelta": "01:02:00",
+        "set": [1],
+        "list": [1, "a", None, 1.5],
+    }
+
+  def test_stdlib_encoder(self):
+    """The standard library encoder handles values unsupported by JSON."""
+    encoder = encoders.get_encoder("json")
+    self.assertEqual(json.loads(encoder.dumps(self.value)), self.expected)
+    self.assertEqual(encoder.dumps(self.value, sort_keys=True),
+                     json.dumps(self.expected, sort_keys=True))
+    self.assertEqual("".join(encoder.iterencode(self.value)),
+                     encoder.dumps(self.value))
+
+  def test_iterencode_chunks(self):
+    """Long lists are encoded in pages of items."""
+    value = {"collection": {"objects": [self.value] * 250, "empty": {}}}
+    for name in ("json", "simplejson"):
+      try:
+        encoder = encoders.get_encoder(name)
+      except ImportError:
+        continue
+      chunks = list(encoder.iterencode(value))
+      self.assertEqual("".join(chunks), encoder.dumps(value))
+      self.assertLessEqual(len(chunks), 10)
+
+  def test_unsupported_value(self):
+    with self.assertRaises(TypeError):
+      utils.as_json({"value": object()})
+
+  def test_publish_value(self):
+    """Only datetimes are converted when publishing."""
+    for key, value in self.value.items():
+      published = encoders.publish_value(value)
+      if key in ("datetime", "date"):
+        self.assertEqual(published, self.expected[key])
+      else:
+        self.assertIs(published, value)
@@ -0,0 +1,64 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for request profiling."""
+
+import unittest
+
+import flask
+import sqlalchemy
+
+from ggrc.utils import benchmarks
+from ggrc.utils import profiling
+
+
+class TestRequestProfile(unittest.TestCase):
+  """Tests for collecting request profiles."""
+
+  def setUp(self):
+    # pylint: disable=protected-access
+    self.app = flask.Flask("profiling_test")
+    self.engine = sqlalchemy.create_engine("sqlite://")
+    sqlalchemy.event.listen(self.engine, "before_cursor_execute",
+                            profiling._before_cursor_execute)
+    sqlalchemy.event.listen(self.engine, "after_cursor_execute",
+                            profiling._after_cursor_execute)
+
+  def test_span_tree(self):
+    """Benchmark blocks and SQL statements are recorded in the span tree."""
+    with self.app.test_request_context("/api/programs",
+                                       headers={profiling.PROFILE_HEADER: 1}):
+      profiling.start_request()
+      with benchmarks.ProfilingBenchmark("outer"):
+        self.engine.execute("select 1")
+        with benchmarks.ProfilingBenchmark("inner"):
+          self.engine.execute("select 2")
+          self.engine.execute("select 3")
+          profiling.count_memcache_call()
+      profile = profiling.get_profile()
+      response = profiling.finish_request(self.app.response_class())
+
+    trace = profile.as_dict()
+    self.assertEqual(trace["name"], "GET /api/programs?")
+    outer = trace["children"][0]
+    inner = outer["children"][0]
+    self.assertEqual((outer["name"], outer["sql_count"]), ("outer", 1))
+    self.assertEqual((inner["name"], inner["sql_count"]), ("inner", 2))
+    self.assertEqual(inner["memcache_count"], 1)
+    self.assertEqual(profile.root.totals()[0], 3)
+
+    server_timing = response.headers["Server-Timing"]
+    self.assertIn('sql;dur=', server_timing)
+    self.assertIn('desc="3 queries"', server_timing)
+    self.assertIn('memcache;desc="1 calls"', server_timing)
+    self.assertIn('desc="inner"', server_timing)
+
+  def test_not_profiled(self):
+    """Requests that are not sampled get no profile."""
+    with self.app.test_request_context("/api/programs"):
+      profiling.start_request()
+      with benchmarks.ProfilingBenchmark("outer"):
+        self.engine.execute("select 1")
+      self.assertIsNone(profiling.get_profile())
+      response = profiling.finish_request(self.app.response_class())
+    self.assertNotIn("Server-Timing", response.headers)
@@ -0,0 +1,72 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for routing reads to a replica."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import flask
+
+from ggrc.utils import replica
+
+
+class TestReplicaRouting(unittest.TestCase):
+  """Tests for sessions with a replica in a second SQLite file."""
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.app = flask.Flask("replica_test")
+    self.app.config.update({
+        "SQLALCHEMY_DATABASE_URI":
+            "sqlite:///" + os.path.join(self.tmp_dir, "primary.db"),
+        "SQLALCHEMY_REPLICA_DATABASE_URI":
+            "sqlite:///" + os.path.join(self.tmp_dir, "replica.db"),
+        "REPLICA_MAX_LAG": 0,
+    })
+    self.db = replica.RoutingSQLAlchemy(self.app)
+
+    class Item(self.db.Model):
+      __tablename__ = "items"
+      id = self.db.Column(self.db.Integer, primary_key=True)
+      name = self.db.Column(self.db.String)
+    self.item_model = Item
+
+    for bind, name in ((None, "primary"), (replica.REPLICA_BIND, "replica")):
+      engine = self.db.get_engine(self.app, bind)
+      self.db.Model.metadata.create_all(engine)
+      engine.execute(Item.__table__.insert(), {"id": 1, "name": name})
+
+  def tearDown(self):
+    self.db.session.remove()
+    shutil.rmtree(self.tmp_dir)
+
+  def _get_name(self):
+    return self.db.session.query(self.item_model.name).filter_by(id=1).scalar()
+
+  def test_routing(self):
+    """Only reads inside use_replica go to the replica."""
+    with self.app.app_context():
+      self.assertEqual(self._get_name(), "primary")
+      with replica.use_replica():
+        self.assertEqual(self._get_name(), "replica")
+      self.assertEqual(self._get_name(), "primary")
+
+  def test_pin_after_write(self):
+    """Sessions that have written anything only read from the primary."""
+    with self.app.app_context(), replica.use_replica():
+      self.db.session.add(self.item_model(id=2, name="new"))
+      self.db.session.flush()
+      self.assertEqual(self._get_name(), "primary")
+      self.db.session.commit()
+      self.assertEqual(self._get_name(), "primary")
+
+  def test_lag(self):
+    """Lagging replicas are not used."""
+    # pylint: disable=protected-access
+    with self.app.app_context(), replica.use_replica():
+      self.assertEqual(self.db.get_replica_lag(self.app), 0)
+      self.db._replica_lag = 5
+      self.assertEqual(self._get_name(), "primary")
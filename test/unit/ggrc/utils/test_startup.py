@@ -0,0 +1,32 @@
+# Copyright (C) 2016 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for startup step timing."""
+
+import unittest
+
+from ggrc.utils import startup
+
+
+class TestStartup(unittest.TestCase):
+  """Tests for recording startup steps."""
+
+  def test_run_step(self):
+    """Steps return their results and are listed in the report."""
+    def sample_startup_step(value):
+      return value * 2
+
+    self.assertEqual(startup.run_step(sample_startup_step, 21), 42)
+    self.assertIn("sample_startup_step",
+                  [name for name, _ in startup.get_steps()])
+    self.assertIn("sample_startup_step", startup.format_report())
+
+  def test_failed_step(self):
+    """Failing steps are recorded too."""
+    def failing_startup_step():
+      raise ValueError()
+
+    with self.assertRaises(ValueError):
+      startup.run_step(failing_startup_step)
+    self.assertIn("failing_startup_step",
+                  [name for name, _ in startup.get_steps()])
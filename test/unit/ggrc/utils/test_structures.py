@@ -93,3 +93,18 @@ class TestCaseInsensitiveDefDict(unittest.TestCase):
         sorted(self.ci_dict.lower_items()),
         sorted([("hello", "World"), ("foo", "BAR")])
     )
+
+
+class TestLRUCache(unittest.TestCase):
+
+  def test_eviction(self):
+    """Least recently used items are evicted first."""
+    cache = structures.LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    self.assertEqual(cache.get("a"), 1)
+    cache["c"] = 3
+    self.assertEqual(len(cache), 2)
+    self.assertIn("a", cache)
+    self.assertIn("c", cache)
+    self.assertIsNone(cache.get("b"))